@@ -0,0 +1,100 @@
+"""
+Sync vs async read endpoints under an ASGI server.
+
+Drives the project's ASGI application in-process the way uvicorn does (one event loop,
+concurrent connections) and compares the synchronous viewsets (/tasks/) with the
+async-native views (/async/tasks/) at the same concurrency.
+
+Usage (from the backend directory):
+    python -m benchmarks.async_reads --requests 400 --concurrency 50
+"""
+import argparse
+import asyncio
+import threading
+import time
+import tracemalloc
+from .common import setup_django, seed_tasks, summarize
+
+
+async def asgi_get(application, path, token):
+    """
+    Perform a GET request against an ASGI application without a network server.
+
+    Returns:
+        int: The response status code.
+    """
+    path, _, query_string = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': query_string.encode(),
+        'root_path': '',
+        'headers': [(b'host', b'localhost'), (b'authorization', f'Token {token}'.encode())],
+        'client': ('127.0.0.1', 50000),
+        'server': ('localhost', 80),
+    }
+    messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+    status = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.Event().wait()
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            status.append(message['status'])
+
+    await application(scope, receive, send)
+    return status[0]
+
+
+async def run_scenario(application, path, token, total_requests, concurrency):
+    semaphore = asyncio.Semaphore(concurrency)
+    durations = []
+    peak_threads = threading.active_count()
+
+    async def one_request():
+        nonlocal peak_threads
+        async with semaphore:
+            start = time.perf_counter()
+            status = await asgi_get(application, path, token)
+            durations.append(time.perf_counter() - start)
+            peak_threads = max(peak_threads, threading.active_count())
+            assert status == 200, f'{path} answered {status}'
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - start
+    _, peak_memory = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    summarize(path, durations, elapsed)
+    print(f"{'':<40} peak_memory_kb={peak_memory / 1024:.0f}  peak_threads={peak_threads}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=400)
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    tokens = seed_tasks(num_tasks=args.tasks)
+
+    from django.core.asgi import get_asgi_application
+    application = get_asgi_application()
+
+    for path in ('/tasks/', '/async/tasks/', '/tasks/?sort_by=due_date&limit=50', '/async/tasks/?sort_by=due_date&limit=50'):
+        asyncio.run(run_scenario(application, path, tokens['admin'], args.requests, args.concurrency))
+
+
+if __name__ == '__main__':
+    main()
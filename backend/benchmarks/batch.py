@@ -0,0 +1,87 @@
+"""
+The startup requests of the front-end, one by one and in one /batch/ call.
+
+Each round sends the same dozen reads (users, task lists under several filters,
+comments) through the WSGI handler, as separate requests then as one batch,
+sequential and parallel. Measured in process, so the saving shown is the
+server side one (middleware, authentication, request parsing); the network
+round trips saved by a batch come on top.
+
+Usage (from the backend directory):
+    python -m benchmarks.batch --rounds 50
+"""
+import argparse
+import json
+import time
+from .common import setup_django, seed_tasks, summarize
+
+PATHS = [
+    '/users/',
+    '/tasks/',
+    '/tasks/?overdue=true',
+    '/tasks/?due_within_days=7',
+    '/tasks/?completed=true',
+    '/tasks/?sort_by=priority',
+    '/tasks/?sort_by=due_date&sort_dir=desc',
+    '/tasks/?comment_summary=true',
+    '/tasks/stats/',
+    '/tasks/workload/',
+    '/task-comments/?task_id=1',
+    '/task-comments/?task_id=2',
+]
+
+
+def call(handler, environ):
+    statuses = []
+    body = b''.join(handler(environ, lambda status, headers: statuses.append(status)))
+    assert statuses[0].startswith('200'), (statuses[0], body[:200])
+    return body
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=50)
+    parser.add_argument('--tasks', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    tokens = seed_tasks(num_tasks=args.tasks)
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+
+    settings.ALLOWED_HOSTS = ['*']
+    # every round must run its queries, not reuse the cached totals and workload of the previous one
+    settings.LIST_COUNT_CACHE_SECONDS = settings.WORKLOAD_CACHE_SECONDS = 0
+    factory = RequestFactory(HTTP_AUTHORIZATION=f"Token {tokens['admin']}")
+    handler = WSGIHandler()
+
+    def one_by_one():
+        for path in PATHS:
+            call(handler, factory.get(path).environ)
+
+    def batch(parallel):
+        data = json.dumps({'parallel': parallel, 'requests': [{'path': path} for path in PATHS]})
+        body = call(handler, factory.post('/batch/', data, content_type='application/json').environ)
+        assert all(item['status'] == 200 for item in json.loads(body)['responses'])
+
+    scenarios = [
+        (f'{len(PATHS)} separate requests', one_by_one),
+        ('1 batch, sequential', lambda: batch(False)),
+        ('1 batch, parallel', lambda: batch(True)),
+    ]
+    for _, run in scenarios:
+        run()  # warm-up
+    for label, run in scenarios:
+        durations = []
+        start = time.perf_counter()
+        for _ in range(args.rounds):
+            round_start = time.perf_counter()
+            run()
+            durations.append(time.perf_counter() - round_start)
+        summarize(label, durations, time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Identical concurrent list requests, with and without single-flight coalescing.
+
+Each round fires the same /tasks/ request from --concurrency threads at once
+(a team dashboard loading) through the WSGI handler, as a threaded worker
+serves them. Without coalescing every thread runs the queries and the
+serializer, with it the followers share the response of the first one.
+
+Usage (from the backend directory):
+    python -m benchmarks.coalescing --rounds 20 --concurrency 20
+"""
+import argparse
+import threading
+import time
+from .common import setup_django, seed_tasks, summarize
+
+
+def run_scenario(label, handler, environ, rounds, concurrency):
+    durations = []
+    lock = threading.Lock()
+
+    def one_request(barrier):
+        barrier.wait()
+        start = time.perf_counter()
+        statuses = []
+        b''.join(handler(dict(environ), lambda status, headers: statuses.append(status)))
+        with lock:
+            durations.append(time.perf_counter() - start)
+        assert statuses[0].startswith('200'), statuses[0]
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        barrier = threading.Barrier(concurrency)
+        threads = [threading.Thread(target=one_request, args=(barrier,)) for _ in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    summarize(label, durations, time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--rounds', type=int, default=20)
+    parser.add_argument('--concurrency', type=int, default=20)
+    parser.add_argument('--tasks', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    tokens = seed_tasks(num_tasks=args.tasks)
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+    from utils.singleflight import flights
+
+    settings.ALLOWED_HOSTS = ['*']
+    environ = RequestFactory(HTTP_AUTHORIZATION=f"Token {tokens['admin']}").get('/tasks/?sort_by=due_date&limit=50').environ
+    handler = WSGIHandler()
+    run_scenario('warm-up', handler, environ, 2, args.concurrency)
+
+    for label, wait_seconds in (('without coalescing', 0), ('with coalescing', 2)):
+        settings.COALESCE_WAIT_SECONDS = wait_seconds
+        flights.metrics.clear()
+        run_scenario(label, handler, environ, args.rounds, args.concurrency)
+        print(f"{'':<40} " + "  ".join(f"{name}={count}" for name, count in sorted(flights.metrics.items())))
+
+
+if __name__ == '__main__':
+    main()
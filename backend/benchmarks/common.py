@@ -0,0 +1,124 @@
+"""
+Shared helpers for the benchmark scripts.
+
+Every benchmark runs against a throw-away SQLite database seeded with fake data,
+so the development database (db.sqlite3) is never touched.
+"""
+import os
+import random
+import statistics
+import tempfile
+from datetime import timedelta
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_management_system.settings")
+
+
+def setup_django(database_name=None):
+    """
+    Configure Django against a temporary SQLite database and create its tables.
+
+    Args:
+        database_name (str): Optional path of the database file, a temporary file is used by default.
+
+    Returns:
+        str: The path of the benchmark database.
+    """
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    if database_name is None:
+        database_name = os.path.join(tempfile.mkdtemp(prefix='tms-bench-'), 'bench.sqlite3')
+    settings.DATABASES['default']['NAME'] = database_name
+    # the benchmarks measure the endpoints, not the rate limit of their single token
+    settings.REST_FRAMEWORK['DEFAULT_THROTTLE_CLASSES'] = []
+    django.setup()
+    call_command('migrate', verbosity=0)
+    return database_name
+
+
+def seed_tasks(num_users=50, num_tasks=2000, max_assignees=3, comments_per_task=1):
+    """
+    Seed the benchmark database with users, tasks, assignees and comments.
+
+    Args:
+        num_users (int): The number of team members to create.
+        num_tasks (int): The number of tasks to create.
+        max_assignees (int): The maximum number of assignees of a task.
+        comments_per_task (int): The number of comments of each task.
+
+    Returns:
+        dict: The tokens of an admin, a manager and a team member keyed by role.
+    """
+    from django.contrib.auth.hashers import make_password
+    from django.utils import timezone
+    from rest_framework.authtoken.models import Token
+    from core.models import UserProfile
+    from task_manager.models import Task, TaskComment
+
+    random.seed(8)
+    # hash the shared password once, hashing it per user dominates the seeding time
+    password = make_password('bench')
+    admin = UserProfile.objects.create(username='bench_admin', email='bench_admin@bench.com', password=password, role='admin')
+    manager = UserProfile.objects.create(username='bench_manager', email='bench_manager@bench.com', password=password, role='manager')
+    members = [
+        UserProfile.objects.create(username=f'bench_member_{i}', email=f'bench_member_{i}@bench.com', password=password, role='team_member')
+        for i in range(num_users)
+    ]
+
+    today = timezone.now().date()
+    Task.objects.bulk_create([
+        Task(
+            task_name=f'bench_task_{i}',
+            task_description='benchmark task',
+            task_due_date=today + timedelta(days=random.randint(-30, 90)),
+            task_creator=manager,
+            priority=random.choice([1, 2, 3]),
+            completed=random.random() < 0.3,
+        )
+        for i in range(num_tasks)
+    ], batch_size=1000)
+
+    through = Task.task_assignee.through
+    task_ids = list(Task.objects.values_list('task_id', flat=True))
+    through.objects.bulk_create([
+        through(task_id=task_id, userprofile_id=member.id)
+        for task_id in task_ids
+        for member in random.sample(members, random.randint(0, max_assignees))
+    ], batch_size=1000)
+    TaskComment.objects.bulk_create([
+        TaskComment(task_id_id=task_id, comment_creator=random.choice(members), comment='benchmark comment')
+        for task_id in task_ids
+        for _ in range(comments_per_task)
+    ], batch_size=1000)
+
+    return {
+        'admin': Token.objects.get(user=admin).key,
+        'manager': Token.objects.get(user=manager).key,
+        'team_member': Token.objects.get(user=members[0]).key,
+    }
+
+
+def summarize(label, durations, total_seconds=None):
+    """
+    Print the latency summary of a benchmark run.
+
+    Args:
+        label (str): The name of the measured scenario.
+        durations (list): The measured durations in seconds.
+        total_seconds (float): Optional wall clock time of the whole run, used for the throughput.
+
+    Returns:
+        dict: The computed statistics.
+    """
+    durations = sorted(durations)
+    stats = {
+        'count': len(durations),
+        'mean_ms': statistics.mean(durations) * 1000,
+        'p50_ms': durations[len(durations) // 2] * 1000,
+        'p99_ms': durations[min(len(durations) - 1, int(len(durations) * 0.99))] * 1000,
+    }
+    if total_seconds:
+        stats['req_per_s'] = len(durations) / total_seconds
+    print(f"{label:<40} " + "  ".join(f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in stats.items()))
+    return stats
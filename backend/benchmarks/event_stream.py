@@ -0,0 +1,73 @@
+"""
+Idle connection capacity of the task event stream.
+
+Opens many concurrent /events/tasks/ streams on one event loop, reports the memory
+held per idle connection and the time needed to fan one event out to all of them.
+
+Usage (from the backend directory):
+    python -m benchmarks.event_stream --connections 5000
+"""
+import argparse
+import asyncio
+import threading
+import time
+import tracemalloc
+from .common import setup_django, seed_tasks
+
+
+async def run(connections, token):
+    from task_manager.events import TaskEvent, broker
+    from task_manager.streams import task_event_stream
+
+    disconnect = asyncio.Event()
+    delivered = 0
+    all_delivered = asyncio.Event()
+
+    async def receive():
+        await disconnect.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        nonlocal delivered
+        if b'event: task.updated' in message.get('body', b''):
+            delivered += 1
+            if delivered == connections:
+                all_delivered.set()
+
+    scope = {'type': 'http', 'method': 'GET', 'path': '/events/tasks/', 'query_string': f'token={token}'.encode(), 'headers': []}
+
+    tracemalloc.start()
+    baseline, _ = tracemalloc.get_traced_memory()
+    start = time.perf_counter()
+    streams = [asyncio.ensure_future(task_event_stream(scope, receive, send)) for _ in range(connections)]
+    while len(broker._subscriptions) < connections:
+        await asyncio.sleep(0.05)
+    connect_seconds = time.perf_counter() - start
+    held, _ = tracemalloc.get_traced_memory()
+
+    start = time.perf_counter()
+    broker.publish(TaskEvent('task.updated', set(), {'task_id': 1}))
+    await all_delivered.wait()
+    fan_out_seconds = time.perf_counter() - start
+    tracemalloc.stop()
+
+    print(f"connections={connections}  threads={threading.active_count()}  connect_s={connect_seconds:.2f}")
+    print(f"memory_per_idle_connection_kb={(held - baseline) / connections / 1024:.1f}")
+    print(f"fan_out_ms={fan_out_seconds * 1000:.1f}")
+
+    disconnect.set()
+    await asyncio.gather(*streams)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--connections', type=int, default=5000)
+    args = parser.parse_args()
+
+    setup_django()
+    tokens = seed_tasks(num_users=1, num_tasks=1)
+    asyncio.run(run(args.connections, tokens['admin']))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Per-request cost of the middleware stack on the API routes.
+
+Serves the same requests through a WSGI handler built with the former full
+middleware stack on every route, then with the path prefix dispatcher
+(utils/middleware.py) that only runs the session / CSRF / messages /
+clickjacking middleware for the admin and the API documentation.
+A cheap detail route makes the middleware share of the time visible.
+
+Usage (from the backend directory):
+    python -m benchmarks.middleware --requests 2000
+"""
+import argparse
+import time
+from .common import setup_django, seed_tasks, summarize
+
+FULL_STACK = [
+    "django.middleware.security.SecurityMiddleware",
+    "django.contrib.sessions.middleware.SessionMiddleware",
+    "django.middleware.common.CommonMiddleware",
+    "django.middleware.csrf.CsrfViewMiddleware",
+    "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "django.contrib.messages.middleware.MessageMiddleware",
+    "django.middleware.clickjacking.XFrameOptionsMiddleware",
+]
+
+
+def run_scenarios(path, handlers, environ, total_requests):
+    """
+    Serve a request through each handler in turn, so drift affects every stack alike.
+    """
+    statuses = []
+
+    def start_response(status, headers):
+        statuses.append(status.split()[0])
+
+    durations = {label: [] for label, _ in handlers}
+    for _ in range(total_requests):
+        for label, handler in handlers:
+            request_start = time.perf_counter()
+            b''.join(handler(dict(environ), start_response))
+            durations[label].append(time.perf_counter() - request_start)
+    for label, _ in handlers:
+        summarize(f'{path} {label} ({statuses[0]})', durations[label])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    tokens = seed_tasks(num_tasks=200)
+
+    from django.conf import settings
+    from django.core.handlers.wsgi import WSGIHandler
+    from django.test import RequestFactory
+    from django.test.utils import override_settings
+    from task_manager.models import Task
+
+    settings.ALLOWED_HOSTS = ['*']
+    task_id = Task.objects.values_list('task_id', flat=True).first()
+    factory = RequestFactory(HTTP_AUTHORIZATION=f"Token {tokens['admin']}")
+    paths = (f'/tasks/{task_id}/', '/tasks/?limit=1')
+
+    with override_settings(MIDDLEWARE=FULL_STACK):
+        full_handler = WSGIHandler()
+    handlers = (('full stack', full_handler), ('prefix dispatcher', WSGIHandler()))
+    for path in paths:
+        run_scenarios(path, handlers, factory.get(path).environ, args.requests)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""
+Cold start time of a worker: a fresh interpreter importing the WSGI / ASGI
+application and the URLconf, which is what scaling up a worker pays before
+its first request.
+
+Run it on two checkouts (or before and after a change) to compare them.
+--block makes packages unimportable, to measure a deployment where an optional
+package of this environment is not installed (e.g. --block coreapi,coreschema).
+
+Usage (from the backend directory):
+    python -m benchmarks.startup --runs 10
+"""
+import argparse
+from utils.importtime import ENTRY_POINTS, profile_startup
+from .common import summarize
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=10)
+    parser.add_argument('--block', default='', help='Comma separated packages made unimportable.')
+    args = parser.parse_args()
+    blocked = [name for name in args.block.split(',') if name]
+
+    for entry in sorted(ENTRY_POINTS):
+        # one warm-up run so every run reads the bytecode cache
+        profile_startup(entry, blocked=blocked)
+        durations, module_counts = [], set()
+        for _ in range(args.runs):
+            modules, elapsed = profile_startup(entry, blocked=blocked)
+            durations.append(elapsed)
+            module_counts.add(len(modules))
+        summarize(f'{entry} cold start', durations)
+        print(f"{'':<40} modules={max(module_counts)}")
+
+
+if __name__ == '__main__':
+    main()
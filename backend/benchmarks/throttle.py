@@ -0,0 +1,56 @@
+"""
+Per-request cost of the token bucket throttle (utils/throttling.py), in microseconds.
+
+Measures the UPSERT of one bucket in a single process, then with several
+worker processes hammering the same SQLite store at once, as the workers of a
+host do. The buckets are written to a temporary file.
+
+Usage (from the backend directory):
+    python -m benchmarks.throttle --requests 20000 --workers 4
+"""
+import argparse
+import multiprocessing
+import os
+import statistics
+import tempfile
+import time
+from .common import setup_django
+from utils.throttling import BucketStore
+
+
+def take_many(path, total_requests, keys):
+    store = BucketStore(path)
+    durations = []
+    for i in range(total_requests):
+        start = time.perf_counter()
+        store.take(f'token:{i % keys}:task.list', 600, 10)
+        durations.append(time.perf_counter() - start)
+    return durations
+
+
+def report(label, durations):
+    durations = sorted(durations)
+    print(
+        f"{label:<40} count={len(durations)}  mean_us={statistics.mean(durations) * 1e6:.1f}  "
+        f"p50_us={durations[len(durations) // 2] * 1e6:.1f}  p99_us={durations[int(len(durations) * 0.99)] * 1e6:.1f}"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--requests', type=int, default=20000)
+    parser.add_argument('--workers', type=int, default=4)
+    parser.add_argument('--keys', type=int, default=100, help='Number of distinct buckets.')
+    args = parser.parse_args()
+
+    setup_django()
+    path = os.path.join(tempfile.mkdtemp(prefix='tms-bench-'), 'throttle.sqlite3')
+    take_many(path, 1000, args.keys)  # warm-up, creates the store
+    report('1 process', take_many(path, args.requests, args.keys))
+    with multiprocessing.Pool(args.workers) as pool:
+        results = pool.starmap(take_many, [(path, args.requests, args.keys)] * args.workers)
+    report(f'{args.workers} processes, shared store', [duration for durations in results for duration in durations])
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,10 @@
 from django.contrib import admin
+from utils.admin import ScalableModelAdmin
 from .models import UserProfile
 
 @admin.register(UserProfile)
-class ContactAdmin(admin.ModelAdmin):
-    list_display = ('id', 'username', 'role', 'email')
\ No newline at end of file
+class ContactAdmin(ScalableModelAdmin):
+    list_display = ('id', 'username', 'role', 'email')
+    list_filter = ('role',)
+    search_fields = ('username__exact', 'email__exact')
+    search_id_fields = ('id',)
@@ -13,6 +13,14 @@ get_user_list_schema = openapi.Schema(
                                 'email': openapi.Schema(type=openapi.TYPE_STRING),
                                 'role': openapi.Schema(type=openapi.TYPE_STRING),
                                 'date_joined': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+                                'tasks': openapi.Schema(
+                                    type=openapi.TYPE_OBJECT,
+                                    description='Only with tasks=true.',
+                                    properties={
+                                        'created_tasks': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                                        'assigned_tasks': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_OBJECT)),
+                                    },
+                                ),
                             },
                         ),
                     },
@@ -76,4 +84,44 @@ create_user_request_schema = user_creation_response_schema = openapi.Schema(
         'password': openapi.Schema(type=openapi.TYPE_STRING),
         'date_joined': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
     },
-)
\ No newline at end of file
+)
+
+batch_request_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    required=['requests'],
+    properties={
+        'requests': openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                required=['path'],
+                properties={
+                    'id': openapi.Schema(type=openapi.TYPE_STRING, description='Echoed in the response, the position of the request by default.'),
+                    'method': openapi.Schema(type=openapi.TYPE_STRING, description='GET (default), POST, PATCH or DELETE.'),
+                    'path': openapi.Schema(type=openapi.TYPE_STRING, description='The API path with its query string, e.g. /tasks/?overdue=true.'),
+                    'body': openapi.Schema(type=openapi.TYPE_OBJECT, description='The JSON body of the request.'),
+                },
+            ),
+        ),
+        'parallel': openapi.Schema(type=openapi.TYPE_BOOLEAN, description='Run the requests on a thread pool, when they are all GET requests.'),
+    },
+)
+
+
+batch_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'responses': openapi.Schema(
+            type=openapi.TYPE_ARRAY,
+            items=openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'id': openapi.Schema(type=openapi.TYPE_STRING),
+                    'status': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    'headers': openapi.Schema(type=openapi.TYPE_OBJECT),
+                    'body': openapi.Schema(type=openapi.TYPE_OBJECT),
+                },
+            ),
+        ),
+    },
+)
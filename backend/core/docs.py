@@ -0,0 +1,44 @@
+"""
+API documentation of the core views, set on the viewset methods when the OpenAPI schema
+is generated (see task_management_system/schema.py), so serving requests never imports drf-yasg.
+"""
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema
+from utils.swagger import NoSortSearchInspector
+from .custom_schemas import *
+from .views import UserViewSet, BatchView
+
+
+swagger_auto_schema(
+    responses={
+        200: get_user_list_schema,
+        403: error_403_schema,
+    },
+    manual_parameters=[
+        openapi.Parameter('id', openapi.IN_QUERY, description='Search User by user_id.', type=openapi.TYPE_INTEGER),
+        openapi.Parameter('tasks', openapi.IN_QUERY, description='Option to show associated tasks for each user.', type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('tasks_limit', openapi.IN_QUERY, description='Maximum number of created and of assigned tasks shown per user with tasks=true, among the tasks visible to the requesting user.', type=openapi.TYPE_INTEGER),
+        openapi.Parameter('count', openapi.IN_QUERY, description='Total in meta.pagination.count [Option: exact (default), estimate, false]', type=openapi.TYPE_STRING),
+    ],
+    filter_inspectors=[NoSortSearchInspector],
+    manual_operation=False,
+    operation_description='Retrieve all user profiles or a single profile based on the provided user ID.',
+)(UserViewSet.list)
+
+
+swagger_auto_schema(
+    request_body=create_user_request_schema,
+    responses={
+        201: create_user_reponse_schema,
+    }
+)(UserViewSet.create)
+
+
+swagger_auto_schema(
+    request_body=batch_request_schema,
+    responses={
+        200: batch_response_schema,
+    },
+    operation_description='Run up to BATCH_MAX_REQUESTS API calls in one round trip and return all their responses, in order.',
+)(BatchView.post)
+
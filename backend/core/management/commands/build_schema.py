@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+from task_management_system.schema import build_schema
+
+
+class Command(BaseCommand):
+    """
+    Build the OpenAPI schema once, at deploy time, into OPENAPI_SCHEMA_DIR.
+
+    The swagger UI then loads the built file instead of introspecting every
+    viewset on each hit (see task_management_system/schema.py).
+    """
+    help = 'Build the OpenAPI schema served by /swagger.json.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output-dir', help='Directory of the schema (default: OPENAPI_SCHEMA_DIR).')
+
+    def handle(self, *args, **options):
+        path = build_schema(options['output_dir'])
+        self.stdout.write(self.style.SUCCESS(f'OpenAPI schema written to {path}.'))
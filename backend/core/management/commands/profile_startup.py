@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand
+from utils.importtime import ENTRY_POINTS, profile_startup, group_by_package
+
+
+class Command(BaseCommand):
+    """
+    Report what a worker imports before serving its first request, and what each import costs.
+
+    The entry point is imported in a fresh interpreter with `-X importtime`
+    (see utils/importtime.py), the report groups the self time by top-level package
+    and lists the modules with the highest cumulative time.
+    """
+    help = 'Profile the import time of the WSGI / ASGI entry points.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--entry', choices=sorted(ENTRY_POINTS), default='wsgi', help='Entry point to profile (default: wsgi).')
+        parser.add_argument('--no-urlconf', action='store_true', help='Do not import the URLconf, which the first request does.')
+        parser.add_argument('--limit', type=int, default=15, help='Number of packages and modules listed (default: 15).')
+
+    def handle(self, *args, **options):
+        modules, elapsed = profile_startup(options['entry'], load_urlconf=not options['no_urlconf'])
+        limit = options['limit']
+        total_us = sum(self_us for _, self_us, _, _ in modules)
+
+        self.stdout.write(f"{options['entry']}: {len(modules)} modules imported in {total_us / 1000:.1f} ms, process started in {elapsed * 1000:.0f} ms\n")
+        self.stdout.write(f"{'package':<40} {'self ms':>9} {'modules':>8}")
+        for package, self_us, count in group_by_package(modules)[:limit]:
+            self.stdout.write(f"{package:<40} {self_us / 1000:>9.1f} {count:>8}")
+
+        self.stdout.write(f"\n{'module':<60} {'cumulative ms':>14}")
+        for module, _, cumulative_us, depth in sorted(modules, key=lambda row: -row[2])[:limit]:
+            self.stdout.write(f"{'  ' * min(depth, 4) + module:<60} {cumulative_us / 1000:>14.1f}")
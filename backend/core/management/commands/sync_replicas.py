@@ -0,0 +1,43 @@
+import sqlite3
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from utils.db_routing import PRIMARY_DB_ALIAS, get_replica_aliases
+
+
+class Command(BaseCommand):
+    """
+    Copy the primary SQLite database into every configured replica file.
+
+    Meant for local development and testing of the read replica routing, where the
+    replicas are plain SQLite files instead of streaming replicas.
+    """
+    help = 'Copy the primary SQLite database into the configured replica databases.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('aliases', nargs='*', help='Replica aliases to sync (default: all replicas).')
+
+    def handle(self, *args, **options):
+        aliases = options['aliases'] or get_replica_aliases()
+        if not aliases:
+            raise CommandError('No replica configured, set DATABASE_REPLICAS first.')
+
+        primary = settings.DATABASES[PRIMARY_DB_ALIAS]
+        if primary['ENGINE'] != 'django.db.backends.sqlite3':
+            raise CommandError('sync_replicas only supports SQLite databases.')
+
+        for alias in aliases:
+            if alias not in get_replica_aliases():
+                raise CommandError(f'"{alias}" is not a configured replica.')
+            replica = settings.DATABASES[alias]
+            if replica['ENGINE'] != 'django.db.backends.sqlite3':
+                raise CommandError(f'Replica "{alias}" is not a SQLite database.')
+
+            # the backup API gives a consistent snapshot even while the primary is being written
+            source = sqlite3.connect(primary['NAME'])
+            target = sqlite3.connect(replica['NAME'])
+            try:
+                source.backup(target)
+            finally:
+                target.close()
+                source.close()
+            self.stdout.write(self.style.SUCCESS(f'Replica "{alias}" synced from "{PRIMARY_DB_ALIAS}".'))
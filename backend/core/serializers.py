@@ -1,6 +1,5 @@
 from rest_framework import serializers
 from . models import UserProfile
-from task_manager.models import Task
 from task_manager.serializers import TaskSerializer
 
 class UserSerializer(serializers.ModelSerializer):
@@ -9,13 +8,12 @@ class UserSerializer(serializers.ModelSerializer):
 
     Inherits from ModelSerializer class.
     """
-	# tasks = serializers.SerializerMethodField()
+	tasks = serializers.SerializerMethodField()
 	user_id = serializers.IntegerField(source='id', required=False)
 
 	class Meta:
 		model = UserProfile
-		fields = ['user_id', 'username', 'email', 'role', 'password', 'date_joined']
-		# fields = ['user_id', 'username', 'email', 'role', 'password', 'date_joined', 'tasks']
+		fields = ['user_id', 'username', 'email', 'role', 'password', 'date_joined', 'tasks']
 		extra_kwargs = {
 			'password': {'write_only': True}
 		}
@@ -24,6 +22,7 @@ class UserSerializer(serializers.ModelSerializer):
 	def get_tasks(self, user):
 		"""
 		Retrieve the tasks associated with the user.
+		The tasks come from the 'user_tasks' context, loaded for the whole page by get_user_tasks.
 
 		Args:
 			user (UserProfile): The user instance for which to retrieve tasks.
@@ -31,32 +30,27 @@ class UserSerializer(serializers.ModelSerializer):
 		Returns:
 			dict: A dictionary containing the created tasks and assigned tasks for the user.
 		"""
-		created_tasks = Task.objects.filter(task_creator=user)
-		assigned_tasks = Task.objects.filter(task_assignee=user)
-		created_tasks_data = TaskSerializer(created_tasks, many=True).data
-		assigned_tasks_data = TaskSerializer(assigned_tasks, many=True).data
+		if 'user_tasks' not in self.context:
+			return None
+		user_tasks = self.context['user_tasks'].get(user.id, {'created_tasks': [], 'assigned_tasks': []})
 		tasks = {
-			'created_tasks': created_tasks_data,
-			'assigned_tasks': assigned_tasks_data
+			'created_tasks': TaskSerializer(user_tasks['created_tasks'], many=True).data,
+			'assigned_tasks': TaskSerializer(user_tasks['assigned_tasks'], many=True).data
 		}
 		return tasks
 
-	# def to_representation(self, instance):
-	# 	"""
-    #     Convert the instance into a representation suitable for serialization. For the purpose
-    #     of accessing tasks associated with each user optionally through parameter in request.
-
-    #     Args:
-    #         instance (UserProfile): The user instance to represent.
-
-    #     Returns:
-    #         dict: The serialized representation of the user instance, optionally excluding the 'tasks' field.
-    #     """
-	# 	request = self.context.get('request')
-	# 	show_tasks = request and hasattr(request, 'query_params') and request.query_params.get('tasks', '').lower() == 'true'
-
-	# 	data = super().to_representation(instance)
-	# 	if not show_tasks:
-	# 		data.pop('tasks', None)
-	# 	return data
-	
\ No newline at end of file
+	def to_representation(self, instance):
+		"""
+		Convert the instance into a representation suitable for serialization. The tasks of the user
+		are only included when the view loaded them in the 'user_tasks' context (?tasks=true).
+
+		Args:
+			instance (UserProfile): The user instance to represent.
+
+		Returns:
+			dict: The serialized representation of the user instance, optionally excluding the 'tasks' field.
+		"""
+		data = super().to_representation(instance)
+		if 'user_tasks' not in self.context:
+			data.pop('tasks', None)
+		return data
@@ -1,5 +1,7 @@
-from django.db.models.signals import post_save
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
+from utils.pagination import bump_count_version
 from . models import UserProfile
 from rest_framework.authtoken.models import Token
 from django.contrib.auth import get_user_model
@@ -39,4 +41,13 @@ def set_superuser_role(sender, instance, created, **kwargs):
     """
     if created and instance.is_superuser:
         instance.role = 'admin'
-        instance.save()
\ No newline at end of file
+        instance.save()
+
+@receiver(post_save, sender=UserProfile, weak=False)
+@receiver(post_delete, sender=UserProfile, weak=False)
+def invalidate_cached_user_counts(sender, **kwargs):
+    """
+    Signal receiver function invalidating the cached user list totals, now and once the transaction commits.
+    """
+    bump_count_version(UserProfile._meta.db_table)
+    transaction.on_commit(lambda: bump_count_version(UserProfile._meta.db_table))
@@ -1,9 +1,16 @@
 from . models import UserProfile
 from rest_framework.test import APIClient
-from rest_framework.test import APITestCase
+from rest_framework.test import APITestCase, APITransactionTestCase
 from rest_framework import status
 import json
 from rest_framework.authtoken.models import Token
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from task_manager.models import Task
+from django.core.management import call_command
+from django.test import override_settings
+from io import StringIO
+import tempfile
 
 class UserTestCase(APITestCase):
     """
@@ -179,3 +186,181 @@ class UserTestCase(APITestCase):
 
         response = self.client.get(self.url+f'?id={5}')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class UserTasksTestCase(APITestCase):
+    """
+    Test suite for the user list with tasks (?tasks=true)
+    """
+    def setUp(self):
+        self.client = APIClient()
+        admin_user = UserProfile.objects.create_user(username='admin_1', email = "admin_1@wow.com", password='admin_password', role="admin")
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=admin_user).key)
+
+        self.managers = [UserProfile.objects.create(username=f"manager_{i}", email=f"manager_{i}@example.com", role="manager") for i in range(3)]
+        self.member = UserProfile.objects.create(username="member", email="member@example.com", role="team_member")
+        for manager in self.managers:
+            for i in range(3):
+                task = Task.objects.create(task_name=f'{manager.username}_task_{i}', task_creator=manager)
+                task.task_assignee.set([self.member])
+
+    def get_users(self, query):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/users/' + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {user['attributes']['username']: user['attributes'] for user in response.json()['data']}, len(queries)
+
+    def test_get_users_with_tasks(self):
+        """
+        Success: Test the created and assigned tasks of each user are listed
+        """
+        users, _ = self.get_users('?tasks=true')
+        self.assertEqual([task['task_name'] for task in users['manager_0']['tasks']['created_tasks']], ['manager_0_task_0', 'manager_0_task_1', 'manager_0_task_2'])
+        self.assertEqual(users['manager_0']['tasks']['assigned_tasks'], [])
+        self.assertEqual(len(users['member']['tasks']['assigned_tasks']), 9)
+        self.assertEqual(users['member']['tasks']['assigned_tasks'][0]['task_assignee'], [self.member.id])
+        self.assertNotIn('tasks', self.get_users('')[0]['member'])
+
+    def test_user_tasks_queries_do_not_grow_with_users(self):
+        """
+        Success: Test the tasks of a page of users are loaded with a constant number of queries
+        """
+        _, queries = self.get_users('?tasks=true')
+        for i in range(3, 8):
+            manager = UserProfile.objects.create(username=f"manager_{i}", email=f"manager_{i}@example.com", role="manager")
+            task = Task.objects.create(task_name=f'manager_{i}_task', task_creator=manager)
+            task.task_assignee.set([self.member])
+        _, more_queries = self.get_users('?tasks=true')
+        self.assertEqual(more_queries, queries)
+
+    def test_tasks_limit(self):
+        """
+        Edge: Test tasks_limit caps the created and assigned tasks of each user, and must be a positive integer
+        """
+        users, _ = self.get_users('?tasks=true&tasks_limit=2')
+        self.assertEqual(len(users['manager_1']['tasks']['created_tasks']), 2)
+        self.assertEqual(len(users['member']['tasks']['assigned_tasks']), 2)
+
+        response = self.client.get('/users/?tasks=true&tasks_limit=0')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_managers_see_the_tasks_they_created(self):
+        """
+        Success: Test managers only get the tasks they created, whoever created or is assigned them
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=self.managers[1]).key)
+        users, _ = self.get_users('?tasks=true&tasks_limit=2')
+        self.assertEqual(users['manager_0']['tasks']['created_tasks'], [])
+        self.assertEqual([task['task_name'] for task in users['manager_1']['tasks']['created_tasks']], ['manager_1_task_0', 'manager_1_task_1'])
+        self.assertEqual([task['task_name'] for task in users['member']['tasks']['assigned_tasks']], ['manager_1_task_0', 'manager_1_task_1'])
+
+
+class SchemaTestCase(APITestCase):
+    """
+    Test suite for the prebuilt OpenAPI schema
+    """
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_override = override_settings(OPENAPI_SCHEMA_DIR=directory.name)
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+
+    def test_built_schema_is_served_with_caching_headers(self):
+        """
+        Success: Test /swagger.json redirects to the built schema, served as immutable and revalidated by ETag
+        """
+        call_command('build_schema', stdout=StringIO())
+        response = self.client.get('/swagger.json')
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        self.assertRegex(response['Location'], r'^/swagger/openapi-[0-9a-f]{16}\.json$')
+
+        response = self.client.get(response['Location'])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['Cache-Control'], 'public, max-age=31536000, immutable')
+        schema = json.loads(b''.join(response.streaming_content))
+        self.assertIn('/tasks/', schema['paths'])
+
+        response = self.client.get(response.wsgi_request.path, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(self.client.get('/swagger/openapi-unknown.json').status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_schema_not_built(self):
+        """
+        Error: Test the schema is only generated live in DEBUG when it was not built
+        """
+        response = self.client.get('/swagger.json')
+        self.assertEqual(response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        with override_settings(DEBUG=True):
+            response = self.client.get('/swagger.json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('/tasks/', response.json()['paths'])
+
+
+class BatchTestCase(APITestCase):
+    """
+    Test suite for the batch endpoint
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.url = '/batch/'
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=self.manager_user).key)
+        Task.objects.create(task_name='test_task', task_creator=self.manager_user)
+
+    def post_batch(self, data):
+        return self.client.post(self.url, json.dumps(data), content_type='application/json')
+
+    def test_batch_runs_sub_requests(self):
+        """
+        Success: Test reads and writes run in order through the API views, authenticated once for the whole batch
+        """
+        data = {'requests': [
+            {'id': 'users', 'path': '/users/'},
+            {'id': 'create', 'method': 'POST', 'path': '/tasks/', 'body': {'task_name': 'new_task'}},
+            {'id': 'tasks', 'path': '/tasks/?sort_by=id&sort_dir=desc'},
+        ]}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_batch(data)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(sum('authtoken_token' in query['sql'] for query in queries.captured_queries), 1)
+
+        responses = response.json()['responses']
+        self.assertEqual([(item['id'], item['status']) for item in responses], [('users', 200), ('create', 201), ('tasks', 200)])
+        self.assertEqual(responses[0]['body']['data'][0]['attributes']['username'], 'manager_1')
+        self.assertEqual(responses[2]['body']['data'][0]['attributes']['task_name'], 'new_task')
+        self.assertEqual(responses[2]['headers']['Content-Type'], 'application/vnd.api+json')
+
+    def test_batch_sub_request_errors(self):
+        """
+        Error: Test an invalid batch is rejected, failing sub-requests only fail their own response
+        """
+        for data in ({'requests': []}, {'requests': [{'path': 'tasks/'}]}, {'requests': [{'path': '/tasks/', 'method': 'PUT'}]}, [{'path': '/tasks/'}] * 21):
+            self.assertEqual(self.post_batch(data).status_code, status.HTTP_400_BAD_REQUEST, data)
+
+        response = self.post_batch([{'path': '/missing/'}, {'path': '/batch/'}, {'path': '/async/tasks/'}, {'path': '/tasks/?due_within_days=-1'}, {'path': '/tasks/'}])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([item['status'] for item in response.json()['responses']], [404, 400, 400, 400, 200])
+
+        self.client.credentials()
+        self.assertEqual(self.post_batch([{'path': '/tasks/'}]).status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class ParallelBatchTestCase(APITransactionTestCase):
+    """
+    Test suite for the read-only batches run on a thread pool, committed data being visible to the pool threads
+    """
+    def test_parallel_read_only_batch(self):
+        """
+        Edge: Test the sub-requests of a read-only batch run on several threads and keep their order
+        """
+        manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        for i in range(3):
+            Task.objects.create(task_name=f'test_task_{i}', task_creator=manager_user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=manager_user).key)
+        data = {'parallel': True, 'requests': [{'id': i, 'path': f'/tasks/?limit=1&offset={i}'} for i in range(3)]}
+        response = self.client.post('/batch/', json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        names = [item['body']['data'][0]['attributes']['task_name'] for item in response.json()['responses']]
+        self.assertEqual(names, ['test_task_0', 'test_task_1', 'test_task_2'])
+
@@ -6,20 +6,19 @@ from rest_framework.response import Response
 from . models import UserProfile
 from rest_framework.mixins import ListModelMixin
 from rest_framework import viewsets, status
-from rest_framework.pagination import LimitOffsetPagination
+from utils.pagination import CachedCountPagination
 from rest_framework.permissions import IsAuthenticated, AllowAny
 from . permissions import IsAdmin, IsManager
 from rest_framework.exceptions import PermissionDenied
 from rest_framework.serializers import ValidationError
-from drf_yasg.utils import swagger_auto_schema
-from . custom_schemas import *
-from drf_yasg.inspectors import CoreAPICompatInspector
-
-class NoSortSearchInspector(CoreAPICompatInspector):
-    def get_filter_parameters(self, filter_backend):
-        return []
-
-class UserViewSet(ListModelMixin, viewsets.GenericViewSet):
+from utils.mixins import ReplicaReadMixin, RateLimitHeadersMixin, CoalescedReadMixin
+from task_manager.queries import get_user_tasks
+from django.http import HttpResponse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.views import APIView
+from utils.batch import parse_sub_requests, run_batch
+
+class UserViewSet(RateLimitHeadersMixin, CoalescedReadMixin, ReplicaReadMixin, ListModelMixin, viewsets.GenericViewSet):
         """
         Create or view user profile(s).
         
@@ -40,7 +39,7 @@ class UserViewSet(ListModelMixin, viewsets.GenericViewSet):
         parser_classes = [JSONParser]
         queryset = UserProfile.objects.all()
         serializer_class = UserSerializer
-        pagination_class = LimitOffsetPagination
+        pagination_class = CachedCountPagination
 
         http_method_names = ['get', 'post']
 
@@ -64,26 +63,53 @@ class UserViewSet(ListModelMixin, viewsets.GenericViewSet):
                 return super().get_permissions()
         
         
-        @swagger_auto_schema(
-            responses={
-                200: get_user_list_schema,
-                403: error_403_schema,
-            },
-            manual_parameters=[
-                openapi.Parameter('id', openapi.IN_QUERY, description='Search User by user_id.', type=openapi.TYPE_INTEGER),
-                openapi.Parameter('tasks', openapi.IN_QUERY, description='Option to show associated tasks for each user.', type=openapi.TYPE_BOOLEAN),
-            ],
-            filter_inspectors=[NoSortSearchInspector],
-            manual_operation=False,
-            operation_description='Retrieve all user profiles or a single profile based on the provided user ID.',
-        )
+        def get_coalescing_scope(self, request):
+            """
+            Admins see the same users and tasks, their identical requests share one response.
+            Managers only see the tasks they created (?tasks=true), each has a scope of their own.
+
+            Args:
+                request (Request): The HTTP request object.
+
+            Returns:
+                str: The visibility scope.
+            """
+            if request.user.role == 'admin':
+                return 'admin'
+            return super().get_coalescing_scope(request)
+
+        def get_user_serializer_context(self, request, users):
+            """
+            Build the serializer context of a list of users, with their tasks when 'tasks' is true.
+
+            Args:
+                request (HttpRequest): The request object.
+                users (list): The users about to be serialized.
+
+            Returns:
+                dict: The serializer context.
+
+            Raises:
+                ValidationError: If 'tasks_limit' is not a positive integer.
+            """
+            context = self.get_serializer_context()
+            if str(request.query_params.get('tasks')).lower() == 'true':
+                tasks_limit = request.query_params.get('tasks_limit')
+                if tasks_limit is not None:
+                    if not tasks_limit.isdigit() or int(tasks_limit) < 1:
+                        raise ValidationError("tasks_limit must be a positive integer.")
+                    tasks_limit = int(tasks_limit)
+                context['user_tasks'] = get_user_tasks([user.id for user in users], request.user, tasks_limit)
+            return context
+
         def list(self, request, *args, **kwargs):
             """
             List user profiles.
 
             Retrieve all user profiles or a single profile based on the provided user ID.
             Pass 'id' as a query parameter to get a single profile.
-            Pass 'tasks' as true to include associated tasks information.
+            Pass 'tasks' as true to include associated tasks information, loaded for the whole page
+            in a constant number of queries, and 'tasks_limit' to cap the tasks shown per user.
 
             Args:
                 request (HttpRequest): The request object.
@@ -103,7 +129,7 @@ class UserViewSet(ListModelMixin, viewsets.GenericViewSet):
                         if not user:
                             raise ValidationError("User not found.")
                         else:
-                            serializer = self.get_serializer(user)
+                            serializer = self.get_serializer(user, context=self.get_user_serializer_context(request, [user]))
                             return Response(serializer.data)
                     else:
                         queryset = self.get_queryset()
@@ -111,7 +137,7 @@ class UserViewSet(ListModelMixin, viewsets.GenericViewSet):
                     raise PermissionDenied("You are not authorized to view user information.")
                 page = self.paginate_queryset(queryset)
                 if page is not None:
-                    serializer = self.get_serializer(page, many=True)
+                    serializer = self.get_serializer(page, many=True, context=self.get_user_serializer_context(request, page))
                 return self.get_paginated_response(serializer.data)
             except ValidationError as e:
                 return Response({"result": "error", "message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
@@ -120,12 +146,6 @@ class UserViewSet(ListModelMixin, viewsets.GenericViewSet):
             except Exception as e:
                 return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             
-        @swagger_auto_schema(
-                request_body=create_user_request_schema,
-                responses={
-                    201: create_user_reponse_schema,
-                }
-        )
         def create(self, request):
             """
             Create a new user profile.
@@ -152,4 +172,46 @@ class UserViewSet(ListModelMixin, viewsets.GenericViewSet):
             except JSONDecodeError as e:
                 return Response({"result": "error","message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status= status.HTTP_400_BAD_REQUEST)
             except Exception as e:
-                    return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
\ No newline at end of file
+                    return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+class BatchView(RateLimitHeadersMixin, APIView):
+        """
+        Run many API calls in one HTTP round trip (see utils/batch.py).
+
+        post:
+        Run the sub-requests of the body through the API, as the authenticated user, and return all their responses.
+
+        Attributes:
+            permission_classes (list): The list of permission classes applied to this view.
+            parser_classes (list): The list of parser classes used for request parsing.
+            renderer_classes (list): The renderers of the errors of the batch itself, the sub-responses keep their own rendering.
+            batchable (bool): A batch cannot be called from a batch.
+        """
+        permission_classes = [IsAuthenticated]
+        parser_classes = [JSONParser]
+        renderer_classes = [JSONRenderer]
+        batchable = False
+
+        def post(self, request):
+            """
+            Run the sub-requests of a batch, in order, or in parallel for read-only batches with "parallel": true.
+
+            Args:
+                request (HttpRequest): The request object.
+
+            Returns:
+                HttpResponse: The responses of the sub-requests, in their order, whatever their status.
+
+            Raises:
+                ValidationError: If the batch is empty, too long or holds an invalid sub-request.
+            """
+            try:
+                sub_requests = parse_sub_requests(request.data)
+                parallel = isinstance(request.data, dict) and request.data.get('parallel') is True
+                content = run_batch(request, sub_requests, parallel=parallel)
+                return HttpResponse(content, content_type='application/json')
+            except ValidationError as e:
+                return Response({"result": "error", "message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
+            except Exception as e:
+                return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -0,0 +1,7 @@
+from django.contrib import admin
+from . import models
+
+@admin.register(models.Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('job_id', 'name', 'status', 'attempts', 'run_after', 'created_by', 'created', 'modified')
+    list_filter = ('status', 'name')
@@ -0,0 +1,46 @@
+from drf_yasg import openapi
+
+
+job_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'job_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+        'name': openapi.Schema(type=openapi.TYPE_STRING),
+        'status': openapi.Schema(type=openapi.TYPE_STRING, enum=['queued', 'running', 'succeeded', 'failed']),
+        'result': openapi.Schema(type=openapi.TYPE_OBJECT),
+        'error': openapi.Schema(type=openapi.TYPE_STRING),
+        'attempts': openapi.Schema(type=openapi.TYPE_INTEGER),
+        'max_attempts': openapi.Schema(type=openapi.TYPE_INTEGER),
+        'run_after': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+        'created': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+        'modified': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME),
+    },
+)
+
+get_job_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'data': openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'type': openapi.Schema(type=openapi.TYPE_STRING),
+                'id': openapi.Schema(type=openapi.TYPE_STRING),
+                'attributes': job_schema,
+            },
+        ),
+    },
+)
+
+job_accepted_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'data': openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'result': openapi.Schema(type=openapi.TYPE_STRING),
+                'job': job_schema,
+                'status_code': openapi.Schema(type=openapi.TYPE_INTEGER),
+            },
+        ),
+    },
+)
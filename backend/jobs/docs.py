@@ -0,0 +1,15 @@
+"""
+API documentation of the jobs views, set on the viewset methods when the OpenAPI schema
+is generated (see task_management_system/schema.py), so serving requests never imports drf-yasg.
+"""
+from drf_yasg.utils import swagger_auto_schema
+from .custom_schemas import *
+from .views import JobViewSet
+
+
+swagger_auto_schema(
+    responses={
+        200: get_job_response_schema,
+    },
+    operation_description="Retrieve a job by id"
+)(JobViewSet.retrieve)
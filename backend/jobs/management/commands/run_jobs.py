@@ -0,0 +1,74 @@
+import os
+import socket
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from jobs.worker import claim_jobs, requeue_stale_jobs, run_job
+
+
+def _run_job_in_thread(job):
+    try:
+        return run_job(job)
+    finally:
+        connection.close()  # every pool thread holds its own database connection
+
+
+class Command(BaseCommand):
+    """
+    Worker running the queued jobs with a pool of threads, until interrupted.
+
+    Several workers can run at the same time, on one or more hosts, against the same database.
+    """
+    help = 'Run the queued background jobs.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=None, help='Jobs run concurrently (default: JOB_WORKERS).')
+        parser.add_argument('--once', action='store_true', help='Run the jobs ready now and exit, instead of polling forever.')
+
+    def handle(self, *args, **options):
+        workers = options['workers'] or settings.JOB_WORKERS
+        if workers < 1:
+            raise CommandError('--workers must be positive.')
+        worker_id = f'{socket.gethostname()}:{os.getpid()}'
+
+        if workers == 1:
+            # no pool: the jobs run in this thread, one at a time
+            self.run_inline(worker_id, options['once'])
+            return
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            running = {}
+            try:
+                while True:
+                    requeue_stale_jobs()
+                    for job in claim_jobs(worker_id, workers - len(running)):
+                        running[pool.submit(_run_job_in_thread, job)] = job
+                    if not running:
+                        if options['once']:
+                            break
+                        time.sleep(settings.JOB_POLL_SECONDS)
+                        continue
+                    done, _ = wait(running, timeout=settings.JOB_POLL_SECONDS, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        self.report(running.pop(future), future.result())
+            except KeyboardInterrupt:
+                self.stdout.write('Stopping, waiting for the running jobs.')
+                wait(running)
+
+    def run_inline(self, worker_id, once):
+        try:
+            while True:
+                requeue_stale_jobs()
+                jobs = claim_jobs(worker_id, 1)
+                if jobs:
+                    self.report(jobs[0], run_job(jobs[0]))
+                elif once:
+                    return
+                else:
+                    time.sleep(settings.JOB_POLL_SECONDS)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
+
+    def report(self, job, status):
+        self.stdout.write(f'Job {job.job_id} ({job.name}): {status}.')
@@ -0,0 +1,58 @@
+from django.db import models
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from django_extensions.db.models import TimeStampedModel
+
+
+class Job(TimeStampedModel, models.Model):
+    """
+    Represents a unit of background work, queued by the API and run by the run_jobs worker.
+
+    Fields:
+        job_id (BigAutoField): The unique identifier for the job.
+        name (CharField): The name the job handler is registered under (see jobs.registry).
+        payload (JSONField): The arguments of the handler.
+        status (CharField): queued, running, succeeded or failed.
+        result (JSONField): The value returned by the handler once succeeded.
+        error (TextField): The error of the last failed attempt.
+        attempts (PositiveIntegerField): The number of attempts started so far.
+        max_attempts (PositiveIntegerField): The number of attempts before the job is failed.
+        run_after (DateTimeField): The job is not picked before this time, used for the retry backoff.
+        locked_by (CharField): The worker running the job.
+        locked_at (DateTimeField): When the worker picked the job.
+        created_by (ForeignKey): The user who queued the job.
+    """
+    class Meta:
+        verbose_name = 'Job'
+        verbose_name_plural = 'Jobs'
+        ordering = ["job_id"]
+        indexes = [
+            models.Index(fields=['status', 'run_after'], name='job_queue_idx'),
+        ]
+
+    QUEUED = 'queued'
+    RUNNING = 'running'
+    SUCCEEDED = 'succeeded'
+    FAILED = 'failed'
+    STATUS_CHOICES = (
+            (QUEUED, 'Queued'),
+            (RUNNING, 'Running'),
+            (SUCCEEDED, 'Succeeded'),
+            (FAILED, 'Failed'),
+    )
+
+    job_id = models.BigAutoField(primary_key=True)
+    name = models.CharField(max_length=100, verbose_name="Name")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Payload")
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default=QUEUED, verbose_name="Status")
+    result = models.JSONField(null=True, blank=True, verbose_name="Result")
+    error = models.TextField(null=True, blank=True, verbose_name="Error")
+    attempts = models.PositiveIntegerField(default=0, verbose_name="Attempts")
+    max_attempts = models.PositiveIntegerField(default=3, verbose_name="Max Attempts")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Run After")
+    locked_by = models.CharField(max_length=100, null=True, blank=True, verbose_name="Locked By")
+    locked_at = models.DateTimeField(null=True, blank=True, verbose_name="Locked At")
+    created_by = models.ForeignKey(get_user_model(), on_delete=models.SET_NULL, null=True, blank=True, related_name='jobs', verbose_name="Created By")
+
+    def __str__(self):
+        return f'{self.name} #{self.job_id} ({self.status})'
@@ -0,0 +1,81 @@
+"""
+Job handlers and the API used to queue jobs.
+
+A handler is a function taking the Job and returning a JSON serialisable result,
+registered under a name with the register decorator:
+
+    @register('tasks.export')
+    def export_tasks(job):
+        ...
+
+    enqueue('tasks.export', {'completed': 'true'}, user=request.user)
+"""
+from django.conf import settings
+from .models import Job
+
+_handlers = {}
+
+
+class PermanentJobError(Exception):
+    """
+    Raised by a handler when retrying cannot help (invalid payload, missing user...), the job is failed at once.
+    """
+
+
+def register(name):
+    """
+    Decorator registering a job handler under a name.
+
+    Args:
+        name (str): The name jobs are queued with.
+
+    Returns:
+        callable: The decorator.
+    """
+    def decorator(handler):
+        if name in _handlers and _handlers[name] is not handler:
+            raise ValueError(f'A job handler is already registered as "{name}".')
+        _handlers[name] = handler
+        return handler
+    return decorator
+
+
+def get_handler(name):
+    """
+    Retrieve the handler registered under a name.
+
+    Args:
+        name (str): The job name.
+
+    Returns:
+        callable: The handler.
+
+    Raises:
+        PermanentJobError: If no handler is registered under this name.
+    """
+    try:
+        return _handlers[name]
+    except KeyError:
+        raise PermanentJobError(f'No job handler registered as "{name}".')
+
+
+def enqueue(name, payload=None, user=None, max_attempts=None):
+    """
+    Queue a job for the run_jobs worker.
+
+    Args:
+        name (str): The name of the registered handler.
+        payload (dict): The JSON serialisable arguments of the handler.
+        user (User): The user queuing the job, the only one allowed to see it besides admins.
+        max_attempts (int): The number of attempts before the job is failed, defaults to JOB_MAX_ATTEMPTS.
+
+    Returns:
+        Job: The queued job.
+    """
+    get_handler(name)
+    return Job.objects.create(
+        name=name,
+        payload=payload or {},
+        created_by=user,
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
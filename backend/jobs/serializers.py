@@ -0,0 +1,23 @@
+from .models import Job
+from rest_framework_json_api import serializers
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the Job model, read only: jobs are queued by the endpoints doing the work.
+
+    Fields:
+        job_id (BigAutoField): The unique identifier for the job.
+        name (CharField): The name of the job handler.
+        status (CharField): queued, running, succeeded or failed.
+        result (JSONField): The result of the job once succeeded.
+        error (TextField): The error of the last failed attempt.
+        attempts (PositiveIntegerField): The number of attempts started so far.
+        max_attempts (PositiveIntegerField): The number of attempts before the job is failed.
+        run_after (DateTimeField): The job is not picked before this time.
+    """
+
+    class Meta:
+        model = Job
+        fields = ['job_id', 'name', 'status', 'result', 'error', 'attempts', 'max_attempts', 'run_after', 'created', 'modified']
+        read_only_fields = fields
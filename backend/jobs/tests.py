@@ -0,0 +1,118 @@
+from core.models import UserProfile
+from .models import Job
+from .registry import PermanentJobError, register, enqueue
+from .worker import claim_jobs, run_job, requeue_stale_jobs
+from rest_framework.test import APIClient
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+from datetime import timedelta
+from io import StringIO
+
+calls = []
+
+
+@register('tests.echo')
+def echo(job):
+    calls.append(job.job_id)
+    return {'echo': job.payload}
+
+
+@register('tests.flaky')
+def flaky(job):
+    calls.append(job.job_id)
+    if job.attempts < 2:
+        raise RuntimeError('temporary failure')
+    return {'attempts': job.attempts}
+
+
+@register('tests.invalid')
+def invalid(job):
+    raise PermanentJobError('invalid payload')
+
+
+class JobTestCase(APITestCase):
+    """
+    Test suite for the background job queue and worker
+    """
+    def setUp(self):
+        calls.clear()
+        self.client = APIClient()
+        self.user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.token = Token.objects.get(user=self.user)
+        other_user = UserProfile.objects.create_user(username='manager_2', email = "manager_2@wow.com", password='manager_password', role="manager")
+        self.other_token = Token.objects.get(user=other_user)
+
+    def test_run_jobs_runs_queued_jobs(self):
+        '''
+        Success: Test the worker command runs the queued jobs in order and stores their result
+        '''
+        first = enqueue('tests.echo', {'value': 1}, user=self.user)
+        second = enqueue('tests.echo', {'value': 2}, user=self.user)
+        call_command('run_jobs', '--once', '--workers', '1', stdout=StringIO())
+        self.assertEqual(calls, [first.job_id, second.job_id])
+        first.refresh_from_db()
+        self.assertEqual(first.status, Job.SUCCEEDED)
+        self.assertEqual(first.result, {'echo': {'value': 1}})
+        self.assertEqual(first.attempts, 1)
+
+    @override_settings(JOB_RETRY_BACKOFF_SECONDS=60)
+    def test_failed_attempt_is_retried_with_backoff(self):
+        '''
+        Success: Test a failing job is queued again after a growing delay, then succeeds
+        '''
+        job = enqueue('tests.flaky', user=self.user)
+        self.assertEqual(run_job(claim_jobs('worker', 1)[0]), Job.QUEUED)
+        job.refresh_from_db()
+        self.assertIn('temporary failure', job.error)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=50))
+
+        # not picked before the backoff is over
+        self.assertEqual(claim_jobs('worker', 1), [])
+        Job.objects.filter(job_id=job.job_id).update(run_after=timezone.now())
+        self.assertEqual(run_job(claim_jobs('worker', 1)[0]), Job.SUCCEEDED)
+        job.refresh_from_db()
+        self.assertEqual(job.result, {'attempts': 2})
+
+    def test_job_fails_after_max_attempts_or_permanent_error(self):
+        '''
+        Error: Test a job is failed once its attempts are used and at once on a permanent error
+        '''
+        flaky_job = enqueue('tests.flaky', user=self.user, max_attempts=1)
+        invalid_job = enqueue('tests.invalid', user=self.user)
+        for job in claim_jobs('worker', 2):
+            self.assertEqual(run_job(job), Job.FAILED)
+        invalid_job.refresh_from_db()
+        self.assertEqual((invalid_job.status, invalid_job.attempts, invalid_job.error), (Job.FAILED, 1, 'invalid payload'))
+        self.assertEqual(Job.objects.get(job_id=flaky_job.job_id).status, Job.FAILED)
+
+        with self.assertRaises(PermanentJobError):
+            enqueue('tests.unknown')
+
+    def test_stale_running_job_is_queued_again(self):
+        '''
+        Edge: Test a job left running by a dead worker is queued again after the lock timeout
+        '''
+        job = enqueue('tests.echo', user=self.user)
+        claim_jobs('dead-worker', 1)
+        self.assertEqual(requeue_stale_jobs(), 0)
+        Job.objects.filter(job_id=job.job_id).update(locked_at=timezone.now() - timedelta(hours=1))
+        self.assertEqual(requeue_stale_jobs(), 1)
+        self.assertEqual(Job.objects.get(job_id=job.job_id).status, Job.QUEUED)
+
+    def test_job_status_endpoint(self):
+        '''
+        Success: Test a job is visible to the user who queued it only
+        '''
+        job = enqueue('tests.echo', user=self.user)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.token.key)
+        response = self.client.get(f'/jobs/{job.job_id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['attributes']['status'], Job.QUEUED)
+
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.other_token.key)
+        response = self.client.get(f'/jobs/{job.job_id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
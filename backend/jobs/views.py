@@ -0,0 +1,59 @@
+from .models import Job
+from .serializers import JobSerializer
+from rest_framework import viewsets, status
+from rest_framework.mixins import RetrieveModelMixin
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from django.urls import reverse
+from utils.mixins import RateLimitHeadersMixin
+
+
+def job_accepted_response(job):
+    """
+    Build the 202 Accepted response of an endpoint that queued a job.
+
+    Args:
+        job (Job): The queued job.
+
+    Returns:
+        Response: The HTTP response containing the job, with its status URL in the Location header.
+    """
+    return Response(
+        {"result": "success", "job": JobSerializer(job).data, "status_code": status.HTTP_202_ACCEPTED},
+        status=status.HTTP_202_ACCEPTED,
+        headers={'Location': reverse('job-detail', args=[job.job_id])},
+    )
+
+
+class JobViewSet(RateLimitHeadersMixin, RetrieveModelMixin, viewsets.GenericViewSet):
+    """
+    A ViewSet for following the background jobs queued by the API.
+
+    retrieve: Retrieve the status, and once finished the result or the error, of a job.
+
+    Attributes:
+        permission_classes (list): The list of permission classes applied to this ViewSet.
+        serializer_class (Serializer): The serializer class used for job serialization.
+        http_method_names (list): The allowed HTTP methods for this ViewSet.
+    """
+    permission_classes = [IsAuthenticated]
+    serializer_class = JobSerializer
+    http_method_names = ['get']
+
+    def get_queryset(self):
+        """
+        Restrict the jobs to the ones queued by the user, admins see every job.
+
+        Returns:
+            QuerySet: The jobs visible to the user.
+        """
+        if getattr(self, 'swagger_fake_view', False):
+            return Job.objects.none()  # schema generation, no request user
+        user = self.request.user
+        if user.role == 'admin':
+            return Job.objects.all()
+        return Job.objects.filter(created_by=user)
+
+    def retrieve(self, request, *args, **kwargs):
+        # defined here so its API documentation (docs.py) is not set on the mixin method
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,104 @@
+"""
+Claiming and running queued jobs, used by the run_jobs management command.
+
+Jobs are claimed with a conditional UPDATE (status still 'queued'), so several
+workers can poll the same table without running a job twice. A job whose worker
+died is queued again once its lock is older than JOB_LOCK_TIMEOUT_SECONDS.
+"""
+import traceback
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Job
+from .registry import PermanentJobError, get_handler
+
+
+def claim_jobs(worker_id, limit):
+    """
+    Lock up to limit jobs ready to run for a worker.
+
+    Args:
+        worker_id (str): The identifier of the claiming worker.
+        limit (int): The maximum number of jobs to claim.
+
+    Returns:
+        list: The claimed jobs, in queue order.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        job_ids = list(
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status=Job.QUEUED, run_after__lte=now)
+            .order_by('run_after', 'job_id')
+            .values_list('job_id', flat=True)[:limit]
+        )
+        Job.objects.filter(job_id__in=job_ids, status=Job.QUEUED).update(
+            status=Job.RUNNING, locked_by=worker_id, locked_at=now, attempts=F('attempts') + 1, modified=now,
+        )
+    return list(Job.objects.filter(job_id__in=job_ids, status=Job.RUNNING, locked_by=worker_id, locked_at=now).order_by('run_after', 'job_id'))
+
+
+def requeue_stale_jobs():
+    """
+    Queue again the running jobs whose worker stopped without finishing them,
+    or fail them if they used all their attempts.
+
+    Returns:
+        int: The number of jobs queued again or failed.
+    """
+    stale = Job.objects.filter(status=Job.RUNNING, locked_at__lt=timezone.now() - timedelta(seconds=settings.JOB_LOCK_TIMEOUT_SECONDS))
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status=Job.FAILED, error='The worker running the job stopped.', locked_by=None, locked_at=None,
+    )
+    return failed + stale.update(status=Job.QUEUED, locked_by=None, locked_at=None)
+
+
+def get_retry_delay(attempts):
+    """
+    Compute the exponential backoff before the next attempt.
+
+    Args:
+        attempts (int): The number of attempts already made.
+
+    Returns:
+        timedelta: JOB_RETRY_BACKOFF_SECONDS doubled for every attempt after the first one.
+    """
+    return timedelta(seconds=settings.JOB_RETRY_BACKOFF_SECONDS * 2 ** (attempts - 1))
+
+
+def _release(job, **fields):
+    # only the worker still holding the lock records the outcome
+    Job.objects.filter(job_id=job.job_id, status=Job.RUNNING, locked_by=job.locked_by).update(
+        locked_by=None, locked_at=None, modified=timezone.now(), **fields,
+    )
+
+
+def run_job(job):
+    """
+    Run a claimed job and record its outcome. The handler runs in a transaction,
+    a failed attempt leaves nothing behind for the retry.
+
+    Args:
+        job (Job): A job claimed by claim_jobs.
+
+    Returns:
+        str: The status of the job after the attempt.
+    """
+    try:
+        handler = get_handler(job.name)
+        with transaction.atomic():
+            result = handler(job)
+    except PermanentJobError as e:
+        _release(job, status=Job.FAILED, error=str(e))
+        return Job.FAILED
+    except Exception:
+        error = traceback.format_exc()
+        if job.attempts >= job.max_attempts:
+            _release(job, status=Job.FAILED, error=error)
+            return Job.FAILED
+        _release(job, status=Job.QUEUED, error=error, run_after=timezone.now() + get_retry_delay(job.attempts))
+        return Job.QUEUED
+    _release(job, status=Job.SUCCEEDED, result=result, error=None)
+    return Job.SUCCEEDED
@@ -13,4 +13,18 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "task_management_system.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+# imported once the apps are loaded
+from task_manager.streams import TASK_EVENTS_PATH, task_event_stream
+
+
+async def application(scope, receive, send):
+    """
+    Route the long-lived task event stream to its dedicated ASGI application,
+    everything else to Django.
+    """
+    if scope['type'] == 'http' and scope['path'] == TASK_EVENTS_PATH:
+        await task_event_stream(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
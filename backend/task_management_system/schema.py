@@ -0,0 +1,165 @@
+"""
+OpenAPI schema of the API, built once by `python manage.py build_schema`.
+
+Generating the schema introspects every viewset and the custom schema modules,
+far too slow for each hit of the documentation. build_schema writes it to
+OPENAPI_SCHEMA_DIR as openapi-<digest>.json, the file name changing with the
+content, and points the 'current' file at it. /swagger.json redirects to the
+current version, which is served with immutable caching headers. Without a
+built schema, the schema is generated live in DEBUG only.
+
+drf-yasg and the docs modules of the apps (the swagger_auto_schema overrides of
+their views) are only imported by the documentation endpoints and build_schema,
+never by a worker serving the API.
+"""
+import hashlib
+import os
+from functools import lru_cache
+from pathlib import Path
+from django.conf import settings
+from django.http import FileResponse, Http404, HttpResponseNotModified, JsonResponse
+from django.shortcuts import redirect
+from django.utils.module_loading import autodiscover_modules
+from django.views.decorators.http import require_GET
+from rest_framework import status
+from rest_framework.permissions import AllowAny
+
+CURRENT_FILE = 'current'
+
+
+@lru_cache(maxsize=None)
+def get_schema_view():
+    """
+    Build the Swagger/OpenAPI schema view on first use, importing drf-yasg and the docs modules of the apps.
+
+    Returns:
+        type: The drf-yasg schema view class.
+    """
+    from drf_yasg import inspectors, openapi  # noqa: F401
+    from drf_yasg.views import get_schema_view as get_drf_yasg_schema_view
+
+    # drf_yasg.inspectors reads the inspector settings (utils.swagger) on import, it must come before the docs modules
+    autodiscover_modules('docs')
+    api_info = openapi.Info(
+        title="Task Manager API Documentation",
+        default_version='v1',
+        description="Documentation for the API endpoints for the Task Manager System Project.",
+        contact=openapi.Contact(email="tawhidwasik08@gmail.com"),
+        license=openapi.License(name="MIT License"),
+    )
+    schema_view = get_drf_yasg_schema_view(api_info, public=True, permission_classes=(AllowAny,))
+    schema_view.api_info = api_info
+    return schema_view
+
+
+def build_schema(directory=None):
+    """
+    Generate the OpenAPI schema and write it to a file named after its digest.
+
+    Args:
+        directory (Path): Where to write the schema, defaults to OPENAPI_SCHEMA_DIR.
+
+    Returns:
+        Path: The schema file.
+    """
+    from drf_yasg.codecs import OpenAPICodecJson
+
+    directory = Path(directory or settings.OPENAPI_SCHEMA_DIR)
+    directory.mkdir(parents=True, exist_ok=True)
+    schema_view = get_schema_view()
+    schema = schema_view.generator_class(schema_view.api_info).get_schema(request=None, public=True)
+    content = OpenAPICodecJson(validators=[]).encode(schema)
+    path = directory / f'openapi-{hashlib.sha256(content).hexdigest()[:16]}.json'
+    if not path.exists():
+        path.write_bytes(content)
+    # replace the pointer atomically, a request never reads a half written name
+    pointer = directory / f'{CURRENT_FILE}.tmp'
+    pointer.write_text(path.name)
+    os.replace(pointer, directory / CURRENT_FILE)
+    return path
+
+
+def get_schema_file():
+    """
+    Find the schema file built last.
+
+    Returns:
+        Path: The schema file, or None when no schema was built.
+    """
+    directory = Path(settings.OPENAPI_SCHEMA_DIR)
+    try:
+        name = (directory / CURRENT_FILE).read_text().strip()
+    except FileNotFoundError:
+        return None
+    path = directory / name
+    return path if path.is_file() else None
+
+
+@require_GET
+def schema_json(request):
+    """
+    Redirect to the current version of the built schema, or generate the schema live in DEBUG.
+
+    Args:
+        request (HttpRequest): The request object.
+
+    Returns:
+        HttpResponse: The redirect, the live schema, or a 503 error when no schema was built.
+    """
+    path = get_schema_file()
+    if path is not None:
+        response = redirect('schema-file', name=path.name)
+        response['Cache-Control'] = 'no-cache'
+        return response
+    if settings.DEBUG:
+        return get_schema_view().without_ui(cache_timeout=0)(request, format='.json')
+    return JsonResponse(
+        {"result": "error", "message": "The API schema was not built, run `python manage.py build_schema`.", "status_code": status.HTTP_503_SERVICE_UNAVAILABLE},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
+@require_GET
+def schema_file(request, name):
+    """
+    Serve a built schema file. Its name changes with its content, so it is cached for good.
+
+    Args:
+        request (HttpRequest): The request object.
+        name (str): The name of the schema file.
+
+    Returns:
+        FileResponse: The schema file.
+
+    Raises:
+        Http404: If the schema file does not exist.
+    """
+    path = Path(settings.OPENAPI_SCHEMA_DIR) / name
+    if not name.startswith('openapi-') or not path.is_file():
+        raise Http404("Unknown schema version.")
+    etag = f'"{path.stem.removeprefix("openapi-")}"'
+    if request.headers.get('If-None-Match') == etag:
+        response = HttpResponseNotModified()
+    else:
+        response = FileResponse(path.open('rb'), content_type='application/json')
+    response['ETag'] = etag
+    response['Cache-Control'] = 'public, max-age=31536000, immutable'
+    return response
+
+
+def swagger_ui(request):
+    """
+    Render the swagger UI, which loads the schema from /swagger.json.
+
+    Args:
+        request (HttpRequest): The request object.
+
+    Returns:
+        HttpResponse: The swagger UI page.
+    """
+    return _get_swagger_ui_view()(request)
+
+
+@lru_cache(maxsize=None)
+def _get_swagger_ui_view():
+    return get_schema_view().with_ui('swagger', cache_timeout=0)
@@ -1,6 +1,9 @@
 from pathlib import Path
 from dotenv import load_dotenv
+from importlib.util import find_spec
+import getpass
 import os
+import tempfile
 load_dotenv()
 
 
@@ -33,6 +36,8 @@ SWAGGER_SETTINGS = {
         }
     },
     "DEFAULT_MODEL_RENDERING": "example",
+    # the UI loads the prebuilt schema instead of generating it (see task_management_system/schema.py)
+    'SPEC_URL': 'schema-json',
     'DEFAULT_FIELD_INSPECTORS': [
         'drf_yasg.inspectors.CamelCaseJSONFilter',
         'drf_yasg.inspectors.InlineSerializerInspector',
@@ -43,6 +48,14 @@ SWAGGER_SETTINGS = {
         'drf_yasg.inspectors.SimpleFieldInspector',
         'drf_yasg.inspectors.StringDefaultFieldInspector',
     ],
+    # CoreAPICompatInspector needs coreapi, which is not installed
+    'DEFAULT_FILTER_INSPECTORS': [
+        'utils.swagger.OperationParametersInspector',
+    ],
+    'DEFAULT_PAGINATOR_INSPECTORS': [
+        'drf_yasg.inspectors.DjangoRestResponsePagination',
+        'utils.swagger.OperationParametersInspector',
+    ],
 }
 
 
@@ -56,30 +69,42 @@ INSTALLED_APPS = [
     "django.contrib.messages",
     "django.contrib.staticfiles",
     "django_extensions",
-    "django_filters",
     "rest_framework",
     "rest_framework.authtoken",
     "core",
     "task_manager",
-    "drf_yasg"
+    "jobs",
 ]
 
+# drf-yasg is only imported when the API documentation is requested (see task_management_system/schema.py),
+# listing it in INSTALLED_APPS would import it in every worker at startup: its templates and static files are added by path
+DRF_YASG_DIR = Path(find_spec("drf_yasg").origin).parent
+
 MIDDLEWARE = [
     "django.middleware.security.SecurityMiddleware",
-    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
+    "utils.middleware.PathPrefixMiddleware",
+]
+
+# The API authenticates with tokens only: the session, CSRF, messages and clickjacking middleware
+# only run for the browser facing routes (see utils/middleware.py)
+FULL_STACK_PATH_PREFIXES = ["/admin/", "/swagger"]
+FULL_STACK_MIDDLEWARE = [
+    "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
+# the admin checks only look for its middleware in MIDDLEWARE, it runs in FULL_STACK_MIDDLEWARE
+SILENCED_SYSTEM_CHECKS = ["admin.E408", "admin.E409", "admin.E410"]
 
 ROOT_URLCONF = "task_management_system.urls"
 
 TEMPLATES = [
     {
         "BACKEND": "django.template.backends.django.DjangoTemplates",
-        "DIRS": [],
+        "DIRS": [DRF_YASG_DIR / "templates"],
         "APP_DIRS": True,
         "OPTIONS": {
             "context_processors": [
@@ -105,6 +130,32 @@ DATABASES = {
     }
 }
 
+# Read replicas, space separated aliases e.g. DATABASE_REPLICAS="replica_1 replica_2".
+# Locally each replica is a SQLite file kept in sync with `python manage.py sync_replicas`.
+DATABASE_REPLICAS = os.environ.get("DATABASE_REPLICAS", default="").split()
+
+for replica_alias in DATABASE_REPLICAS:
+    DATABASES[replica_alias] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": BASE_DIR / f"db_{replica_alias}.sqlite3",
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["utils.db_routing.PrimaryReplicaRouter"]
+
+# Seconds a user keeps reading from the primary database after a mutation (read-your-writes).
+REPLICA_STICKY_SECONDS = int(os.environ.get("REPLICA_STICKY_SECONDS", default=5))
+
+# Cache shared by every worker process: read-your-writes pins, list totals, workload.
+# The database by default (table created by the migrations), CACHE_BACKEND / CACHE_LOCATION
+# switch to e.g. "django.core.cache.backends.redis.RedisCache" / "redis://127.0.0.1:6379".
+CACHES = {
+    "default": {
+        "BACKEND": os.environ.get("CACHE_BACKEND", default="django.core.cache.backends.db.DatabaseCache"),
+        "LOCATION": os.environ.get("CACHE_LOCATION", default="task_manager_cache"),
+    }
+}
+
 
 # Password validation
 # https://docs.djangoproject.com/en/4.2/ref/settings/#auth-password-validators
@@ -141,6 +192,7 @@ USE_TZ = True
 # https://docs.djangoproject.com/en/4.2/howto/static-files/
 
 STATIC_URL = "static/"
+STATICFILES_DIRS = [DRF_YASG_DIR / "static"]
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/4.2/ref/settings/#default-auto-field
@@ -164,7 +216,6 @@ REST_FRAMEWORK = {
     'DEFAULT_FILTER_BACKENDS': (
         'rest_framework_json_api.filters.QueryParameterValidationFilter',
         'rest_framework_json_api.filters.OrderingFilter',
-        'rest_framework_json_api.django_filters.DjangoFilterBackend',
         'rest_framework.filters.SearchFilter',
     ),
     'SEARCH_PARAM': 'filter[search]',
@@ -173,5 +224,58 @@ REST_FRAMEWORK = {
     ),
     'TEST_REQUEST_DEFAULT_FORMAT': 'vnd.api+json',
     'DEFAULT_PAGINATION_CLASS': 'rest_framework.pagination.LimitOffsetPagination',
-    'PAGE_SIZE': 10
-}
\ No newline at end of file
+    'PAGE_SIZE': 10,
+    # token buckets per token (or client address) and view action, see utils/throttling.py
+    'DEFAULT_THROTTLE_CLASSES': [
+        'utils.throttling.TokenBucketThrottle',
+    ],
+    'DEFAULT_THROTTLE_RATES': {
+        'user': os.environ.get("THROTTLE_USER_RATE", default="600/min"),
+        'anon': os.environ.get("THROTTLE_ANON_RATE", default="60/min"),
+    },
+}
+
+# Longest an identical concurrent read request waits for the response of the first one (see utils/singleflight.py)
+COALESCE_WAIT_SECONDS = float(os.environ.get("COALESCE_WAIT_SECONDS", default=2))
+
+# SQLite file of the throttle token buckets, shared by the workers of a host, in a directory only its user can read
+THROTTLE_DB_PATH = os.environ.get("THROTTLE_DB_PATH", default=os.path.join(tempfile.gettempdir(), f"task-manager-{getpass.getuser()}", "throttle.sqlite3"))
+
+# Server-Sent Events stream of task changes (ASGI only, see task_manager/streams.py)
+TASK_EVENTS_BUFFER_SIZE = int(os.environ.get("TASK_EVENTS_BUFFER_SIZE", default=100))
+TASK_EVENTS_HEARTBEAT_SECONDS = int(os.environ.get("TASK_EVENTS_HEARTBEAT_SECONDS", default=15))
+
+# Days the delta-sync tombstones are kept, older sync tokens get a 410 and must do a full sync
+TASK_TOMBSTONE_RETENTION_DAYS = int(os.environ.get("TASK_TOMBSTONE_RETENTION_DAYS", default=30))
+
+# Completed tasks untouched for this many days are moved to the archive tables by `python manage.py archive_tasks`
+TASK_ARCHIVE_AFTER_DAYS = int(os.environ.get("TASK_ARCHIVE_AFTER_DAYS", default=365))
+TASK_ARCHIVE_BATCH_SIZE = int(os.environ.get("TASK_ARCHIVE_BATCH_SIZE", default=500))
+
+# Background jobs, run by `python manage.py run_jobs` (see jobs/worker.py)
+JOB_WORKERS = int(os.environ.get("JOB_WORKERS", default=4))
+JOB_POLL_SECONDS = float(os.environ.get("JOB_POLL_SECONDS", default=1))
+JOB_MAX_ATTEMPTS = int(os.environ.get("JOB_MAX_ATTEMPTS", default=3))
+JOB_RETRY_BACKOFF_SECONDS = int(os.environ.get("JOB_RETRY_BACKOFF_SECONDS", default=10))
+JOB_LOCK_TIMEOUT_SECONDS = int(os.environ.get("JOB_LOCK_TIMEOUT_SECONDS", default=600))
+
+# Due-date reminders, written by `python manage.py schedule_reminders` (see task_manager/reminders.py)
+TASK_REMINDER_WINDOW_DAYS = int(os.environ.get("TASK_REMINDER_WINDOW_DAYS", default=1))
+TASK_REMINDER_INTERVAL_SECONDS = int(os.environ.get("TASK_REMINDER_INTERVAL_SECONDS", default=300))
+TASK_REMINDER_BATCH_SIZE = int(os.environ.get("TASK_REMINDER_BATCH_SIZE", default=500))
+
+# Above this many rows EstimatedCountPaginator (utils/pagination.py) trusts the row estimate instead of COUNT(*)
+ESTIMATED_COUNT_THRESHOLD = int(os.environ.get("ESTIMATED_COUNT_THRESHOLD", default=100000))
+
+# Seconds the exact totals of the paginated lists are cached (CachedCountPagination), writes invalidate them sooner
+LIST_COUNT_CACHE_SECONDS = int(os.environ.get("LIST_COUNT_CACHE_SECONDS", default=300))
+
+# Seconds the assignee workload (/tasks/workload/) is cached per visibility scope
+WORKLOAD_CACHE_SECONDS = int(os.environ.get("WORKLOAD_CACHE_SECONDS", default=30))
+
+# Most sub-requests of one /batch/ call, and threads running its read-only sub-requests in parallel (see utils/batch.py)
+BATCH_MAX_REQUESTS = int(os.environ.get("BATCH_MAX_REQUESTS", default=20))
+BATCH_MAX_WORKERS = int(os.environ.get("BATCH_MAX_WORKERS", default=4))
+
+# Directory of the OpenAPI schema written by `python manage.py build_schema` and served by /swagger.json
+OPENAPI_SCHEMA_DIR = os.environ.get("OPENAPI_SCHEMA_DIR", default=BASE_DIR / "openapi")
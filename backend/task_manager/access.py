@@ -0,0 +1,175 @@
+"""
+Who can see, comment on, edit or delete a task, checked once per request.
+
+The rules are those of the task list (get_visible_tasks): admins see every
+task, managers the tasks they created and team members the tasks assigned to
+them. Creators are compared by id, never loaded. Whether the user is assigned
+to a task is one EXISTS query on the (task, user) unique index of the
+assignments, memoized for the rest of the request; filter() checks many tasks
+at once, with one query for all their assignments when the rule needs them.
+TaskAccess.for_request keeps one instance per request, shared by the view and
+its helpers. The lists need no per-task check, they are filtered in SQL (see
+queries.py).
+"""
+from .models import Task
+
+
+def _get_key(task):
+    # archived tasks keep their assignees in their own table
+    model = type(task) if hasattr(task, 'task_assignee') else Task
+    return model.task_assignee.through, getattr(task, 'task_id', task)
+
+
+class TaskAccess:
+    """
+    The task permissions of a user, see the module documentation.
+
+    Attributes:
+        user (User): The user whose permissions are checked.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._assigned = {}
+        self._pending = ()
+
+    @classmethod
+    def for_request(cls, request):
+        """
+        Get the TaskAccess of the user of a request, created on first use.
+
+        Args:
+            request (Request): The HTTP request object, authenticated.
+
+        Returns:
+            TaskAccess: The TaskAccess of the request.
+        """
+        http_request = getattr(request, '_request', request)
+        access = getattr(http_request, 'task_access', None)
+        if access is None or access.user != request.user:
+            access = http_request.task_access = cls(request.user)
+        return access
+
+    @property
+    def role(self):
+        return getattr(self.user, 'role', None)
+
+    def is_creator(self, task):
+        return task.task_creator_id == self.user.pk
+
+    def prefetch(self, tasks):
+        """
+        Check the assignments of the user to many tasks with one query.
+
+        Args:
+            tasks (iterable): The tasks, or their ids.
+
+        Returns:
+            None.
+        """
+        task_ids = {}
+        for through, task_id in {_get_key(task) for task in tasks} - set(self._assigned):
+            task_ids.setdefault(through, []).append(task_id)
+        for through, ids in task_ids.items():
+            assigned = set(through.objects.filter(userprofile_id=self.user.pk, task_id__in=ids).values_list('task_id', flat=True))
+            for task_id in ids:
+                self._assigned[through, task_id] = task_id in assigned
+
+    def is_assignee(self, task):
+        """
+        Check if the user is assigned to a task, memoized.
+
+        Args:
+            task (Task or int): The task, or its id.
+
+        Returns:
+            bool: True if the user is assigned to the task.
+        """
+        key = _get_key(task)
+        if key not in self._assigned and self._pending:
+            # the first assignment needed by filter() checks those of all its tasks
+            pending, self._pending = self._pending, ()
+            self.prefetch(pending)
+        if key not in self._assigned:
+            through, task_id = key
+            self._assigned[key] = through.objects.filter(task_id=task_id, userprofile_id=self.user.pk).exists()
+        return self._assigned[key]
+
+    def can_see(self, task):
+        """
+        Check if the task is in the task list of the user (see get_visible_tasks).
+        """
+        if self.role == 'admin':
+            return True
+        elif self.role == 'manager':
+            return self.is_creator(task)
+        elif self.role == 'team_member':
+            return self.is_assignee(task)
+        return False
+
+    def can_comment(self, task):
+        """
+        Check if the user can comment on the task: admins, the manager who created it and its assignees.
+        """
+        return self.can_edit(task) or self.is_assignee(task)
+
+    def can_edit(self, task):
+        """
+        Check if the user can change the task and its assignees: admins and the manager who created it.
+        """
+        return self.role == 'admin' or self.role == 'manager' and self.is_creator(task)
+
+    def can_delete(self, task):
+        """
+        Check if the user can delete the task: its creator, when an admin or a manager.
+        """
+        return self.role in ('admin', 'manager') and self.is_creator(task)
+
+    def can_see_comment(self, comment):
+        """
+        Check if the user can read a comment: its creator, and the users who can see its task.
+        """
+        return self.can_edit_comment(comment) or self.can_see(comment.task_id)
+
+    def can_edit_comment(self, comment):
+        """
+        Check if the user can change a comment: its creator only.
+        """
+        return comment.comment_creator_id == self.user.pk
+
+    def can_delete_comment(self, comment):
+        """
+        Check if the user can delete a comment: its creator and admins.
+        """
+        return self.role == 'admin' or self.can_edit_comment(comment)
+
+    def filter(self, tasks, check):
+        """
+        Keep the tasks passing a check, e.g. access.filter(tasks, access.can_edit).
+        The assignments are checked with one query for all the tasks, and only if the check needs them.
+
+        Args:
+            tasks (iterable): The tasks.
+            check (callable): A check of this TaskAccess, taking a task.
+
+        Returns:
+            list: The tasks passing the check, in the same order.
+        """
+        tasks = list(tasks)
+        self._pending = tasks
+        try:
+            return [task for task in tasks if check(task)]
+        finally:
+            self._pending = ()
+
+    def filter_commentable(self, tasks):
+        """
+        Keep the tasks the user can comment on, checked with at most one query.
+
+        Args:
+            tasks (iterable): The tasks.
+
+        Returns:
+            list: The tasks the user can comment on, in the same order.
+        """
+        return self.filter(tasks, self.can_comment)
@@ -1,9 +1,109 @@
-from django.contrib import admin
-from . import models
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.contrib.auth import get_user_model
+from utils.admin import ScalableModelAdmin
+from . import bulk, models
+
+
+class TaskActionForm(ActionForm):
+    """
+    Action bar of the task changelist, with the values some bulk actions need.
+    """
+    priority = forms.TypedChoiceField(choices=[('', '---------')] + list(models.Task.PRIORITY_CHOICES), coerce=int, required=False)
+    days = forms.IntegerField(required=False, help_text='Days to shift the due dates by, negative to move them earlier.')
+    user_id = forms.IntegerField(required=False, label='User id')
+
+
+def _get_action_value(modeladmin, request, name):
+    try:
+        value = TaskActionForm.base_fields[name].clean(request.POST.get(name))
+    except forms.ValidationError:
+        value = None
+    if value in (None, ''):
+        modeladmin.message_user(request, f'Fill in a valid "{name}" to run this action.', messages.ERROR)
+        return None
+    return value
+
+
+def _get_action_user(modeladmin, request):
+    user_id = _get_action_value(modeladmin, request, 'user_id')
+    if user_id is None:
+        return None
+    user = get_user_model().objects.filter(id=user_id).first()
+    if user is None:
+        modeladmin.message_user(request, f'No user with id {user_id}.', messages.ERROR)
+    return user
+
+
+@admin.action(description='Mark selected tasks as completed')
+def mark_completed(modeladmin, request, queryset):
+    modeladmin.message_user(request, f'{bulk.set_completed(queryset, True)} task(s) marked as completed.')
+
+
+@admin.action(description='Mark selected tasks as not completed')
+def mark_incomplete(modeladmin, request, queryset):
+    modeladmin.message_user(request, f'{bulk.set_completed(queryset, False)} task(s) marked as not completed.')
+
+
+@admin.action(description='Set the priority of selected tasks')
+def set_priority(modeladmin, request, queryset):
+    priority = _get_action_value(modeladmin, request, 'priority')
+    if priority is not None:
+        modeladmin.message_user(request, f'{bulk.set_priority(queryset, priority)} task(s) updated.')
+
+
+@admin.action(description='Shift the due dates of selected tasks')
+def shift_due_dates(modeladmin, request, queryset):
+    days = _get_action_value(modeladmin, request, 'days')
+    if days is not None:
+        modeladmin.message_user(request, f'{bulk.shift_due_dates(queryset, days)} due date(s) shifted by {days} day(s).')
+
+
+@admin.action(description='Reassign the creator of selected tasks')
+def set_creator(modeladmin, request, queryset):
+    user = _get_action_user(modeladmin, request)
+    if user is not None:
+        modeladmin.message_user(request, f'{bulk.set_creator(queryset, user)} task(s) reassigned to {user}.')
+
+
+@admin.action(description='Add an assignee to selected tasks')
+def add_assignee(modeladmin, request, queryset):
+    user = _get_action_user(modeladmin, request)
+    if user is not None:
+        modeladmin.message_user(request, f'{user} assigned to {bulk.add_assignee(queryset, user)} task(s).')
+
+
+@admin.action(description='Remove an assignee from selected tasks')
+def remove_assignee(modeladmin, request, queryset):
+    user = _get_action_user(modeladmin, request)
+    if user is not None:
+        modeladmin.message_user(request, f'{user} removed from {bulk.remove_assignee(queryset, user)} task(s).')
+
+
+@admin.action(description='Delete the comments of selected tasks')
+def purge_comments(modeladmin, request, queryset):
+    modeladmin.message_user(request, f'{bulk.purge_comments(queryset)} comment(s) deleted.')
+
+
+@admin.action(description='Delete selected comments (set-based)')
+def delete_comments(modeladmin, request, queryset):
+    modeladmin.message_user(request, f'{bulk.delete_comments(queryset)} comment(s) deleted.')
+
 
 @admin.register(models.Task)
-class TaskAdmin(admin.ModelAdmin):
+class TaskAdmin(ScalableModelAdmin):
     list_display = ('task_id', 'task_name', 'task_description', 'task_due_date', 'task_creator', 'display_assignees', 'priority', 'created', 'modified')
+    list_select_related = ('task_creator',)
+    list_filter = ('completed', 'priority')
+    search_fields = ('task_name__startswith', 'task_creator__username__exact')
+    search_id_fields = ('task_id',)
+    raw_id_fields = ('task_creator', 'task_assignee')
+    action_form = TaskActionForm
+    actions = [mark_completed, mark_incomplete, set_priority, shift_due_dates, set_creator, add_assignee, remove_assignee, purge_comments]
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).prefetch_related('task_assignee')
 
     def display_assignees(self, obj):
         assignees = obj.task_assignee.all()
@@ -14,5 +114,44 @@ class TaskAdmin(admin.ModelAdmin):
 
 
 @admin.register(models.TaskComment)
-class TaskCommentAdmin(admin.ModelAdmin):
+class TaskCommentAdmin(ScalableModelAdmin):
     list_display = ('comment_id', 'task_id', 'comment_creator', 'comment')
+    list_select_related = ('task_id', 'comment_creator')
+    search_fields = ('comment_creator__username__exact',)
+    search_id_fields = ('comment_id', 'task_id')
+    raw_id_fields = ('task_id', 'comment_creator')
+    actions = [delete_comments]
+
+
+@admin.register(models.TaskTombstone)
+class TaskTombstoneAdmin(ScalableModelAdmin):
+    list_display = ('tombstone_id', 'task_id', 'user', 'reason', 'created')
+    list_select_related = ('user',)
+    list_filter = ('reason',)
+    search_id_fields = ('task_id',)
+    raw_id_fields = ('user',)
+
+
+@admin.register(models.ArchivedTask)
+class ArchivedTaskAdmin(ScalableModelAdmin):
+    list_display = ('task_id', 'task_name', 'task_due_date', 'task_creator', 'priority', 'modified', 'archived')
+    list_select_related = ('task_creator',)
+    search_fields = ('task_creator__username__exact',)
+    search_id_fields = ('task_id',)
+    raw_id_fields = ('task_creator', 'task_assignee')
+
+
+@admin.register(models.ArchivedTaskComment)
+class ArchivedTaskCommentAdmin(ScalableModelAdmin):
+    list_display = ('comment_id', 'task_id', 'comment_creator', 'comment')
+    list_select_related = ('task_id', 'comment_creator')
+    search_id_fields = ('comment_id', 'task_id')
+    raw_id_fields = ('task_id', 'comment_creator')
+
+
+@admin.register(models.TaskReminder)
+class TaskReminderAdmin(ScalableModelAdmin):
+    list_display = ('reminder_id', 'task', 'user', 'due_date', 'created')
+    list_select_related = ('task', 'user')
+    search_id_fields = ('task',)
+    raw_id_fields = ('task', 'user')
@@ -3,4 +3,7 @@ from django.apps import AppConfig
 
 class TaskManagerConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
-    name = "task_manager"
\ No newline at end of file
+    name = "task_manager"
+    def ready(self):
+        import task_manager.signals
+        import task_manager.jobs
@@ -0,0 +1,146 @@
+"""
+Hot/cold archival of completed tasks.
+
+Completed tasks untouched for TASK_ARCHIVE_AFTER_DAYS are moved, with their
+comments and assignee rows, from the Task tables into the ArchivedTask tables
+(their due-date reminders, pointless once completed, are dropped),
+so the hot tables (and every index scan and COUNT(*) on them) only hold the
+tasks still being worked on. Each batch is moved in its own transaction, a
+long archival run never holds locks on the whole table.
+"""
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from .models import Task, TaskComment, TaskReminder, ArchivedTask, ArchivedTaskComment
+from .signals import tasks_bulk_changed
+
+_TASK_FIELDS = ('task_id', 'task_name', 'task_description', 'task_due_date', 'task_creator_id', 'priority', 'completed', 'created', 'modified')
+_COMMENT_FIELDS = ('comment_id', 'task_id_id', 'comment_creator_id', 'comment', 'created', 'modified')
+
+
+def _copy(instance, model, fields, **extra):
+    return model(**{field: getattr(instance, field) for field in fields}, **extra)
+
+
+def _archive_batch(tasks):
+    task_ids = [task.task_id for task in tasks]
+    archived = timezone.now()
+    assignees = Task.task_assignee.through.objects.filter(task_id__in=task_ids)
+    comments = TaskComment.objects.filter(task_id__in=task_ids)
+    reminders = TaskReminder.objects.filter(task_id__in=task_ids)
+
+    ArchivedTask.objects.bulk_create([_copy(task, ArchivedTask, _TASK_FIELDS, archived=archived) for task in tasks])
+    ArchivedTask.task_assignee.through.objects.bulk_create([
+        ArchivedTask.task_assignee.through(archivedtask_id=row.task_id, userprofile_id=row.userprofile_id)
+        for row in assignees
+    ])
+    ArchivedTaskComment.objects.bulk_create([_copy(comment, ArchivedTaskComment, _COMMENT_FIELDS) for comment in comments])
+
+    # raw deletes: the delete signals would record tombstones and publish deletion
+    # events for tasks that are only moving to the archive
+    assignees._raw_delete(assignees.db)
+    comments._raw_delete(comments.db)
+    reminders._raw_delete(reminders.db)
+    Task.objects.filter(task_id__in=task_ids)._raw_delete(Task.objects.db)
+
+
+def _restore_batch(archived_tasks):
+    task_ids = [task.task_id for task in archived_tasks]
+    assignees = ArchivedTask.task_assignee.through.objects.filter(archivedtask_id__in=task_ids)
+    comments = ArchivedTaskComment.objects.filter(task_id__in=task_ids)
+
+    # the restored tasks get a new modification time, so delta-sync clients pick them up again
+    Task.objects.bulk_create([_copy(task, Task, _TASK_FIELDS) for task in archived_tasks])
+    Task.task_assignee.through.objects.bulk_create([
+        Task.task_assignee.through(task_id=row.archivedtask_id, userprofile_id=row.userprofile_id)
+        for row in assignees
+    ])
+    restored_comments = [_copy(comment, TaskComment, _COMMENT_FIELDS) for comment in comments]
+    for comment in restored_comments:
+        comment.update_modified = False  # the comments keep their own modification time
+    TaskComment.objects.bulk_create(restored_comments)
+
+    ArchivedTask.objects.filter(task_id__in=task_ids).delete()
+
+
+def _run_in_batches(queryset, move_batch, batch_size, action):
+    moved = 0
+    while True:
+        with transaction.atomic():
+            batch = list(queryset.select_for_update().order_by('task_id')[:batch_size])
+            if batch:
+                move_batch(batch)
+                # the cached list totals of the hot tables are stale now
+                tasks_bulk_changed.send(sender=Task, task_ids=[task.task_id for task in batch], action=action)
+        moved += len(batch)
+        if len(batch) < batch_size:
+            return moved
+
+
+def archive_tasks(before=None, batch_size=None):
+    """
+    Move the completed tasks last modified before a date to the archive tables.
+
+    Args:
+        before (datetime): Archive the tasks modified before this time, defaults to now minus TASK_ARCHIVE_AFTER_DAYS.
+        batch_size (int): The number of tasks moved per transaction, defaults to TASK_ARCHIVE_BATCH_SIZE.
+
+    Returns:
+        int: The number of archived tasks.
+    """
+    if before is None:
+        before = timezone.now() - timedelta(days=settings.TASK_ARCHIVE_AFTER_DAYS)
+    queryset = Task.objects.filter(completed=True, modified__lt=before)
+    return _run_in_batches(queryset, _archive_batch, batch_size or settings.TASK_ARCHIVE_BATCH_SIZE, 'archived')
+
+
+def restore_tasks(task_ids=None, batch_size=None):
+    """
+    Move archived tasks back to the hot tables, under their original ids.
+
+    Args:
+        task_ids (iterable): The ids of the tasks to restore, defaults to every archived task.
+        batch_size (int): The number of tasks moved per transaction, defaults to TASK_ARCHIVE_BATCH_SIZE.
+
+    Returns:
+        int: The number of restored tasks.
+    """
+    queryset = ArchivedTask.objects.all()
+    if task_ids is not None:
+        queryset = queryset.filter(task_id__in=task_ids)
+    return _run_in_batches(queryset, _restore_batch, batch_size or settings.TASK_ARCHIVE_BATCH_SIZE, 'restored')
+
+
+class QuerySetChain:
+    """
+    Read-only sequence chaining querysets, paginated by LimitOffsetPagination
+    like a single queryset: the items of the first queryset come first.
+
+    Args:
+        *querysets (QuerySet): The querysets to chain.
+    """
+
+    def __init__(self, *querysets):
+        self.querysets = querysets
+        self._counts = None
+
+    def count(self):
+        if self._counts is None:
+            self._counts = [queryset.count() for queryset in self.querysets]
+        return sum(self._counts)
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice) or index.step is not None:
+            raise TypeError('QuerySetChain only supports slices without step.')
+        self.count()
+        start, stop = index.start or 0, index.stop if index.stop is not None else self.count()
+        items = []
+        for queryset, count in zip(self.querysets, self._counts):
+            if start < count and stop > 0:
+                items.extend(queryset[max(start, 0):min(stop, count)])
+            start, stop = start - count, stop - count
+        return items
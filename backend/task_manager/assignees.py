@@ -0,0 +1,69 @@
+"""
+Incremental changes to the assignees of a task.
+
+Replacing the assignees (PATCH task_assignee) validates and reads the whole
+set. Adding or removing some users only reads the requested assignments,
+then inserts or deletes just the missing or existing ones in one statement.
+The m2m_changed signals are sent as RelatedManager.add() / remove() send them,
+with only the assignments actually changed: repeating a change sends nothing.
+The task row is locked for the change, so concurrent changes of the same task
+never count an assignment twice.
+"""
+from django.contrib.auth import get_user_model
+from django.db import router, transaction
+from django.db.models.signals import m2m_changed
+from .models import Task
+
+through = Task.task_assignee.through
+
+
+def _send(action, task, user_ids, using):
+    m2m_changed.send(sender=through, instance=task, action=action, reverse=False, model=get_user_model(), pk_set=user_ids, using=using)
+
+
+def _get_assigned(task, user_ids):
+    return set(through.objects.filter(task_id=task.pk, userprofile_id__in=user_ids).values_list('userprofile_id', flat=True))
+
+
+def add_assignees(task, user_ids):
+    """
+    Assign users to a task, the users already assigned are left alone.
+
+    Args:
+        task (Task): The task.
+        user_ids (list): The ids of existing users.
+
+    Returns:
+        list: The ids of the users newly assigned.
+    """
+    using = router.db_for_write(through, instance=task)
+    with transaction.atomic(using=using):
+        Task.objects.select_for_update().filter(pk=task.pk).exists()
+        added = set(user_ids) - _get_assigned(task, user_ids)
+        if added:
+            _send('pre_add', task, added, using)
+            through.objects.using(using).bulk_create([through(task_id=task.pk, userprofile_id=user_id) for user_id in added])
+            _send('post_add', task, added, using)
+    return sorted(added)
+
+
+def remove_assignees(task, user_ids):
+    """
+    Unassign users from a task, the users not assigned are left alone.
+
+    Args:
+        task (Task): The task.
+        user_ids (list): The ids of the users.
+
+    Returns:
+        list: The ids of the users unassigned.
+    """
+    using = router.db_for_write(through, instance=task)
+    with transaction.atomic(using=using):
+        Task.objects.select_for_update().filter(pk=task.pk).exists()
+        removed = _get_assigned(task, user_ids)
+        if removed:
+            _send('pre_remove', task, removed, using)
+            through.objects.using(using).filter(task_id=task.pk, userprofile_id__in=removed).delete()
+            _send('post_remove', task, removed, using)
+    return sorted(removed)
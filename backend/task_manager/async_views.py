@@ -0,0 +1,297 @@
+"""
+Async-native read endpoints for tasks and task comments.
+
+These views mirror TaskViewSet.list / retrieve and TaskCommentViewSet.list / retrieve
+but are plain Django coroutine views using the async ORM, so under ASGI a request
+waiting on the database does not hold a worker thread. They render the same
+JSON:API documents as the synchronous viewsets, and the details are checked with
+the same TaskAccess rules: a task or comment the user cannot see is not found.
+Each request is taken from the token bucket of the synchronous action it mirrors
+(see utils.throttling), so switching to these endpoints buys no extra requests.
+"""
+from collections import defaultdict
+from functools import wraps
+from asgiref.sync import sync_to_async
+from django.http import JsonResponse
+from django.conf import settings
+from rest_framework import serializers
+from rest_framework.authtoken.models import Token
+from rest_framework.exceptions import Throttled
+from .models import Task, TaskComment
+from .access import TaskAccess
+from utils.pagination import aget_total, get_count_mode, get_pagination_links, get_pagination_meta
+from utils.throttling import throttle_token, get_rate_limit_headers
+from .queries import get_visible_tasks, filter_tasks, get_visible_task_comments, filter_task_comments
+
+JSON_API_CONTENT_TYPE = 'application/vnd.api+json'
+
+_datetime_field = serializers.DateTimeField()
+_date_field = serializers.DateField()
+
+
+def _format_datetime(value):
+    return _datetime_field.to_representation(value) if value is not None else None
+
+
+def _format_date(value):
+    return _date_field.to_representation(value) if value is not None else None
+
+
+def _error_response(detail, status_code, code, **kwargs):
+    error = {"detail": detail, "status": str(status_code)}
+    error.update(kwargs)
+    error["code"] = code
+    return JsonResponse({"errors": [error]}, status=status_code, content_type=JSON_API_CONTENT_TYPE)
+
+
+def _not_authenticated_response():
+    response = _error_response("Authentication credentials were not provided.", 401, "not_authenticated", source={"pointer": "/data"})
+    response['WWW-Authenticate'] = 'Token'
+    return response
+
+
+def _not_found_response():
+    return _error_response("Not found.", 404, "not_found")
+
+
+def _throttled_response(wait):
+    exc = Throttled(wait)
+    response = _error_response(str(exc.detail), 429, exc.default_code, source={"pointer": "/data"})
+    response['Retry-After'] = '%d' % exc.wait
+    return response
+
+
+async def authenticate_token(key):
+    """
+    Resolve an API token to its user using the async ORM.
+
+    Args:
+        key (str): The token key.
+
+    Returns:
+        User: The active user owning the token, or None if the token is invalid.
+    """
+    if not key:
+        return None
+    try:
+        token = await Token.objects.select_related('user').aget(key=key)
+    except Token.DoesNotExist:
+        return None
+    if not token.user.is_active or token.user.role not in ('admin', 'manager', 'team_member'):
+        return None
+    return token.user
+
+
+def _get_token_key(request):
+    keyword, _, key = request.headers.get('Authorization', '').partition(' ')
+    return key.strip() if keyword == 'Token' else None
+
+
+def token_endpoint(endpoint):
+    """
+    Authenticate the requests of an async view with the 'Authorization: Token <key>' header using the async ORM,
+    and rate limit them like TokenBucketThrottle does for the synchronous views.
+
+    Args:
+        endpoint (str): The bucket of the view, "<basename>.<action>" of the synchronous action it mirrors.
+
+    Returns:
+        callable: The decorator, the view is called with the authenticated user after the request.
+    """
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            key = _get_token_key(request)
+            user = await authenticate_token(key)
+            if user is None:
+                return _not_authenticated_response()
+            # the bucket store keeps a connection per thread, it needs no Django thread
+            rate_limit = await sync_to_async(throttle_token, thread_sensitive=False)(key, endpoint)
+            if rate_limit is not None and not rate_limit['allowed']:
+                response = _throttled_response(rate_limit['wait'])
+            else:
+                response = await view(request, user, *args, **kwargs)
+            if rate_limit is not None:
+                for name, value in get_rate_limit_headers(rate_limit).items():
+                    response[name] = value
+            return response
+        return wrapper
+    return decorator
+
+
+def _pagination_params(request):
+    """
+    Read the limit / offset query parameters the same way LimitOffsetPagination does.
+    """
+    def positive_int(value, default):
+        try:
+            value = int(value)
+        except (TypeError, ValueError):
+            return default
+        return value if value >= 0 else default
+
+    limit = positive_int(request.GET.get('limit'), settings.REST_FRAMEWORK['PAGE_SIZE'])
+    offset = positive_int(request.GET.get('offset'), 0)
+    return limit or settings.REST_FRAMEWORK['PAGE_SIZE'], offset
+
+
+async def _get_assignee_ids(task_ids):
+    """
+    Load the assignee ids of many tasks with one query over the assignee through table.
+
+    Args:
+        task_ids (list): The ids of the tasks.
+
+    Returns:
+        dict: The assignee ids of each task, keyed by task id.
+    """
+    assignees = defaultdict(list)
+    # model instances instead of values_list(): Django 4.1 cannot aiterate the values iterables
+    through = Task.task_assignee.through.objects.filter(task_id__in=task_ids).order_by('id')
+    async for row in through.only('task_id', 'userprofile_id').aiterator():
+        assignees[row.task_id].append(row.userprofile_id)
+    return assignees
+
+
+def _task_resource(task, assignee_ids):
+    return {
+        "type": "Task",
+        "id": str(task.task_id),
+        "attributes": {
+            "task_id": task.task_id,
+            "priority": task.priority,
+            "created": _format_datetime(task.created),
+            "modified": _format_datetime(task.modified),
+            "task_name": task.task_name,
+            "task_description": task.task_description,
+            "task_due_date": _format_date(task.task_due_date),
+            "completed": task.completed,
+        },
+        "relationships": {
+            "task_assignee": {
+                "data": [{"type": "UserProfile", "id": str(user_id)} for user_id in assignee_ids],
+                "meta": {"count": len(assignee_ids)},
+            },
+            "task_creator": {
+                "data": {"type": "UserProfile", "id": str(task.task_creator_id)},
+            },
+        },
+    }
+
+
+def _task_comment_resource(comment):
+    return {
+        "type": "TaskComment",
+        "id": str(comment.comment_id),
+        "attributes": {
+            "comment_id": comment.comment_id,
+            "created": _format_datetime(comment.created),
+            "modified": _format_datetime(comment.modified),
+            "comment": comment.comment,
+        },
+        "relationships": {
+            "task_id": {
+                "data": {"type": "Task", "id": str(comment.task_id_id)},
+            },
+            "comment_creator": {
+                "data": {"type": "UserProfile", "id": str(comment.comment_creator_id)},
+            },
+        },
+    }
+
+
+@token_endpoint('task.list')
+async def task_list(request, user):
+    """
+    Retrieve a page of the tasks visible to the user.
+    Supports the same filters, sorting, limit / offset pagination and count modes as TaskViewSet.list.
+
+    Args:
+        request (HttpRequest): The request object.
+        user (User): The user authenticated by token_endpoint.
+
+    Returns:
+        JsonResponse: The JSON:API document with the list of tasks.
+    """
+    try:
+        queryset = filter_tasks(get_visible_tasks(user), request.GET)
+    except serializers.ValidationError as e:
+        return _error_response(str(e.detail[0]), 400, "invalid")
+    limit, offset = _pagination_params(request)
+    count_mode = get_count_mode(request.GET)
+    count = await aget_total(queryset, count_mode)
+    tasks = [task async for task in queryset[offset:offset + limit + 1].aiterator()]
+    has_next = len(tasks) > limit
+    tasks = tasks[:limit]
+    assignees = await _get_assignee_ids([task.task_id for task in tasks])
+    data = [_task_resource(task, assignees[task.task_id]) for task in tasks]
+    return JsonResponse({
+        "links": get_pagination_links(request.build_absolute_uri(), limit, offset, count, has_next),
+        "data": data,
+        "meta": {"pagination": get_pagination_meta(count, count_mode, limit, offset)},
+    }, content_type=JSON_API_CONTENT_TYPE)
+
+
+@token_endpoint('task.retrieve')
+async def task_detail(request, user, pk):
+    """
+    Retrieve the details of a specific task.
+
+    Args:
+        request (HttpRequest): The request object.
+        user (User): The user authenticated by token_endpoint.
+        pk (int): The id of the task.
+
+    Returns:
+        JsonResponse: The JSON:API document with the task, or a 404 error document.
+    """
+    try:
+        task = await Task.objects.aget(task_id=pk)
+    except Task.DoesNotExist:
+        return _not_found_response()
+    if not await sync_to_async(TaskAccess(user).can_see)(task):
+        return _not_found_response()
+    assignees = await _get_assignee_ids([task.task_id])
+    return JsonResponse({"data": _task_resource(task, assignees[task.task_id])}, content_type=JSON_API_CONTENT_TYPE)
+
+
+@token_endpoint('task-comment.list')
+async def task_comment_list(request, user):
+    """
+    Retrieve the task comments visible to the user, as TaskCommentViewSet.list does.
+
+    Args:
+        request (HttpRequest): The request object.
+        user (User): The user authenticated by token_endpoint.
+
+    Returns:
+        JsonResponse: The JSON:API document with the list of task comments.
+    """
+    try:
+        queryset = filter_task_comments(get_visible_task_comments(user), request.GET)
+    except serializers.ValidationError as e:
+        return _error_response(str(e.detail[0]), 400, "invalid")
+    data = [_task_comment_resource(comment) async for comment in queryset.aiterator()]
+    return JsonResponse({"data": data}, content_type=JSON_API_CONTENT_TYPE)
+
+
+@token_endpoint('task-comment.retrieve')
+async def task_comment_detail(request, user, pk):
+    """
+    Retrieve the details of a specific task comment.
+
+    Args:
+        request (HttpRequest): The request object.
+        user (User): The user authenticated by token_endpoint.
+        pk (int): The id of the task comment.
+
+    Returns:
+        JsonResponse: The JSON:API document with the task comment, or a 404 error document.
+    """
+    try:
+        comment = await TaskComment.objects.aget(comment_id=pk)
+    except TaskComment.DoesNotExist:
+        return _not_found_response()
+    if not await sync_to_async(TaskAccess(user).can_see_comment)(comment):
+        return _not_found_response()
+    return JsonResponse({"data": _task_comment_resource(comment)}, content_type=JSON_API_CONTENT_TYPE)
@@ -0,0 +1,142 @@
+"""
+Set-based operations on many tasks at once, used by the admin actions.
+
+Each operation runs a handful of UPDATE / DELETE / INSERT statements whatever
+the number of tasks, instead of saving or deleting the rows one by one. The
+per-row model signals are therefore not sent: every operation bumps `modified`
+itself (delta sync and reminders rely on it) and sends tasks_bulk_changed once,
+for the receivers keeping caches and streams up to date.
+"""
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import DateField, ExpressionWrapper, F
+from django.utils import timezone
+from utils.iterables import chunked
+from .delta_sync import record_tombstones
+from .models import Task, TaskComment
+from .signals import tasks_bulk_changed
+
+BATCH_SIZE = 500
+
+
+def _get_task_ids(queryset):
+    return list(queryset.order_by().values_list('task_id', flat=True))
+
+
+def _touch(task_ids):
+    now = timezone.now()
+    for chunk in chunked(task_ids, BATCH_SIZE):
+        Task.objects.filter(task_id__in=chunk).update(modified=now)
+
+
+def update_tasks(queryset, action, user_ids=None, **fields):
+    """
+    Apply the same field values to every task of a queryset in one UPDATE.
+
+    Args:
+        queryset (QuerySet): The tasks to update.
+        action (str): The name of the operation, sent with tasks_bulk_changed.
+        user_ids (list): The users losing the tasks, sent with tasks_bulk_changed.
+        **fields: The field values, expressions allowed.
+
+    Returns:
+        int: The number of updated tasks.
+    """
+    with transaction.atomic():
+        task_ids = _get_task_ids(queryset)
+        updated = Task.objects.filter(task_id__in=queryset.values('task_id')).update(modified=timezone.now(), **fields)
+    tasks_bulk_changed.send(sender=Task, task_ids=task_ids, action=action, user_ids=user_ids)
+    return updated
+
+
+def set_completed(queryset, completed):
+    """
+    Mark every task of a queryset as completed or not.
+    """
+    return update_tasks(queryset, 'completed' if completed else 'reopened', completed=completed)
+
+
+def set_priority(queryset, priority):
+    """
+    Set the priority of every task of a queryset.
+    """
+    return update_tasks(queryset, 'priority_changed', priority=priority)
+
+
+def shift_due_dates(queryset, days):
+    """
+    Move the due dates of the tasks by a number of days, tasks without due date are left alone.
+    """
+    queryset = queryset.filter(task_due_date__isnull=False)
+    due_date = ExpressionWrapper(F('task_due_date') + timedelta(days=days), output_field=DateField())
+    return update_tasks(queryset, 'due_dates_shifted', task_due_date=due_date)
+
+
+def set_creator(queryset, user):
+    """
+    Hand every task of a queryset over to another creator, the previous creators get delta-sync tombstones.
+    """
+    with transaction.atomic():
+        previous = list(queryset.exclude(task_creator=user).order_by().values_list('task_id', 'task_creator_id'))
+        record_tombstones(previous, 'unassigned')
+        return update_tasks(queryset, 'creator_changed', user_ids=sorted({user_id for _, user_id in previous}), task_creator=user)
+
+
+def add_assignee(queryset, user):
+    """
+    Assign a user to every task of a queryset, skipping the tasks already assigned to the user.
+
+    Returns:
+        int: The number of tasks newly assigned to the user.
+    """
+    through = Task.task_assignee.through
+    with transaction.atomic():
+        task_ids = _get_task_ids(queryset)
+        assigned = set(through.objects.filter(userprofile=user, task_id__in=queryset.values('task_id')).values_list('task_id', flat=True))
+        task_ids = [task_id for task_id in task_ids if task_id not in assigned]
+        through.objects.bulk_create([through(task_id=task_id, userprofile_id=user.pk) for task_id in task_ids], batch_size=BATCH_SIZE, ignore_conflicts=True)
+        _touch(task_ids)
+    tasks_bulk_changed.send(sender=Task, task_ids=task_ids, action='assigned', user=user)
+    return len(task_ids)
+
+
+def remove_assignee(queryset, user):
+    """
+    Unassign a user from every task of a queryset, writing the delta-sync tombstones in bulk.
+
+    Returns:
+        int: The number of tasks the user was removed from.
+    """
+    with transaction.atomic():
+        assignments = Task.task_assignee.through.objects.filter(userprofile=user, task_id__in=queryset.values('task_id'))
+        task_ids = list(assignments.values_list('task_id', flat=True))
+        assignments.delete()
+        record_tombstones([(task_id, user.pk) for task_id in task_ids], 'unassigned')
+        _touch(task_ids)
+    tasks_bulk_changed.send(sender=Task, task_ids=task_ids, action='unassigned', user=user)
+    return len(task_ids)
+
+
+def purge_comments(queryset):
+    """
+    Delete every comment of the tasks of a queryset in one DELETE.
+
+    Returns:
+        int: The number of deleted comments.
+    """
+    return delete_comments(TaskComment.objects.filter(task_id__in=queryset.values('task_id')))
+
+
+def delete_comments(queryset):
+    """
+    Delete the comments of a queryset in one DELETE, without the per-row delete signals.
+
+    Returns:
+        int: The number of deleted comments.
+    """
+    with transaction.atomic():
+        comments = TaskComment.objects.filter(comment_id__in=queryset.values('comment_id'))
+        task_ids = list(comments.order_by().values_list('task_id', flat=True).distinct())
+        deleted = comments._raw_delete(comments.db)
+    tasks_bulk_changed.send(sender=Task, task_ids=task_ids, action='comments_deleted')
+    return deleted
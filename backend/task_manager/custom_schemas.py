@@ -212,3 +212,163 @@ patch_task_comment_request_schema = openapi.Schema(
         'comment': openapi.Schema(type=openapi.TYPE_STRING),
     },
 )
+
+
+get_task_changes_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'data': openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'result': openapi.Schema(type=openapi.TYPE_STRING),
+                'tasks': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=patch_task_update_response_schema.properties['data'].properties['updated_task'],
+                ),
+                'deleted': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(type=openapi.TYPE_INTEGER),
+                ),
+                'next_token': openapi.Schema(type=openapi.TYPE_STRING),
+                'has_more': openapi.Schema(type=openapi.TYPE_BOOLEAN),
+                'status_code': openapi.Schema(type=openapi.TYPE_INTEGER),
+            },
+        ),
+    },
+)
+
+
+_task_counts_properties = {
+    'total': openapi.Schema(type=openapi.TYPE_INTEGER),
+    'open': openapi.Schema(type=openapi.TYPE_INTEGER),
+    'completed': openapi.Schema(type=openapi.TYPE_INTEGER),
+    'overdue': openapi.Schema(type=openapi.TYPE_INTEGER),
+    'by_priority': openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={name: openapi.Schema(type=openapi.TYPE_INTEGER) for name in ('high', 'medium', 'low', 'none')},
+    ),
+}
+
+_user_task_counts_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={'user_id': openapi.Schema(type=openapi.TYPE_INTEGER), **_task_counts_properties},
+)
+
+get_task_stats_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'data': openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'result': openapi.Schema(type=openapi.TYPE_STRING),
+                'stats': openapi.Schema(
+                    type=openapi.TYPE_OBJECT,
+                    properties={
+                        'totals': openapi.Schema(type=openapi.TYPE_OBJECT, properties=_task_counts_properties),
+                        'by_creator': openapi.Schema(type=openapi.TYPE_ARRAY, items=_user_task_counts_schema),
+                        'by_assignee': openapi.Schema(type=openapi.TYPE_ARRAY, items=_user_task_counts_schema),
+                        'by_due_date': openapi.Schema(
+                            type=openapi.TYPE_OBJECT,
+                            properties={
+                                name: openapi.Schema(type=openapi.TYPE_INTEGER)
+                                for name in ('overdue', 'today', 'next_7_days', 'later', 'no_due_date')
+                            },
+                        ),
+                    },
+                ),
+                'status_code': openapi.Schema(type=openapi.TYPE_INTEGER),
+            },
+        ),
+    },
+)
+
+
+get_task_workload_response_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'data': openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={
+                'result': openapi.Schema(type=openapi.TYPE_STRING),
+                'workload': openapi.Schema(
+                    type=openapi.TYPE_ARRAY,
+                    items=openapi.Schema(
+                        type=openapi.TYPE_OBJECT,
+                        properties={
+                            'user_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                            'username': openapi.Schema(type=openapi.TYPE_STRING),
+                            'open': openapi.Schema(type=openapi.TYPE_INTEGER),
+                            'overdue': openapi.Schema(type=openapi.TYPE_INTEGER),
+                            'earliest_due_date': openapi.Schema(type=openapi.TYPE_STRING, format=openapi.FORMAT_DATE),
+                            'by_priority': openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={name: openapi.Schema(type=openapi.TYPE_INTEGER) for name in ('high', 'medium', 'low')},
+                            ),
+                            'by_due_week': openapi.Schema(
+                                type=openapi.TYPE_OBJECT,
+                                properties={name: openapi.Schema(type=openapi.TYPE_INTEGER) for name in ('this_week', 'next_week', 'later', 'no_due_date')},
+                            ),
+                        },
+                    ),
+                ),
+                'status_code': openapi.Schema(type=openapi.TYPE_INTEGER),
+            },
+        ),
+    },
+)
+
+
+bulk_delete_tasks_request_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'task_ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+    },
+    required=['task_ids'],
+)
+
+bulk_assign_tasks_request_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'task_ids': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+        'task_assignee': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+    },
+    required=['task_ids', 'task_assignee'],
+)
+
+import_tasks_request_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'tasks': openapi.Schema(type=openapi.TYPE_ARRAY, items=patch_task_request_schema),
+    },
+    required=['tasks'],
+)
+
+change_task_assignees_request_schema = openapi.Schema(
+    type=openapi.TYPE_OBJECT,
+    properties={
+        'task_assignee': openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+    },
+    required=['task_assignee'],
+)
+
+
+def _change_task_assignees_response_schema(result_key):
+    return openapi.Schema(
+        type=openapi.TYPE_OBJECT,
+        properties={
+            'data': openapi.Schema(
+                type=openapi.TYPE_OBJECT,
+                properties={
+                    'result': openapi.Schema(type=openapi.TYPE_STRING),
+                    'task_id': openapi.Schema(type=openapi.TYPE_INTEGER),
+                    result_key: openapi.Schema(type=openapi.TYPE_ARRAY, items=openapi.Schema(type=openapi.TYPE_INTEGER)),
+                    'status_code': openapi.Schema(type=openapi.TYPE_INTEGER),
+                },
+            ),
+        },
+    )
+
+
+add_task_assignees_response_schema = _change_task_assignees_response_schema('added')
+
+remove_task_assignees_response_schema = _change_task_assignees_response_schema('removed')
@@ -0,0 +1,174 @@
+"""
+Incremental task synchronisation for clients keeping a local copy of their tasks.
+
+A sync token is the high-water mark of what the client has already seen:
+the (modified, task_id) position in the task_modified_idx index, the last
+tombstone id and the time the token was issued. Each sync only reads the rows
+after that mark, so its cost is proportional to the number of changes instead
+of the number of tasks.
+"""
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db.models import Q
+from django.utils import timezone
+from .models import Task, TaskTombstone
+from .queries import get_visible_tasks
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=dt_timezone.utc)
+
+
+class InvalidSyncToken(ValueError):
+    """
+    Raised when a sync token cannot be parsed.
+    """
+
+
+class ExpiredSyncToken(ValueError):
+    """
+    Raised when a sync token is older than the tombstone retention, the client must do a full sync.
+    """
+
+
+class SyncToken:
+    """
+    The position of a client in the task and tombstone change streams.
+
+    Attributes:
+        modified (datetime): The modification time of the last task seen.
+        task_id (int): The id of the last task seen, breaks ties between equal modification times.
+        tombstone_id (int): The id of the last tombstone seen.
+        issued (datetime): When the token was handed out, tombstones younger than that are never purged.
+    """
+
+    def __init__(self, modified=_EPOCH, task_id=0, tombstone_id=0, issued=None):
+        self.modified = modified
+        self.task_id = task_id
+        self.tombstone_id = tombstone_id
+        self.issued = issued
+
+    @classmethod
+    def parse(cls, value):
+        """
+        Parse a token produced by encode.
+
+        Args:
+            value (str): The token, an empty value means a full sync.
+
+        Returns:
+            SyncToken: The parsed token.
+
+        Raises:
+            InvalidSyncToken: If the token is malformed.
+        """
+        if not value:
+            return cls()
+        try:
+            modified, task_id, tombstone_id, issued = (int(part) for part in value.split('.'))
+        except ValueError:
+            raise InvalidSyncToken("Invalid sync token.")
+        if min(modified, task_id, tombstone_id, issued) < 0:
+            raise InvalidSyncToken("Invalid sync token.")
+        return cls(
+            _EPOCH + timedelta(microseconds=modified),
+            task_id,
+            tombstone_id,
+            _EPOCH + timedelta(microseconds=issued),
+        )
+
+    def encode(self):
+        """
+        Encode the token as an opaque string, stamping it with the current time.
+
+        Returns:
+            str: The token.
+        """
+        self.issued = timezone.now()
+        modified = (self.modified - _EPOCH) // timedelta(microseconds=1)
+        issued = (self.issued - _EPOCH) // timedelta(microseconds=1)
+        return f'{modified}.{self.task_id}.{self.tombstone_id}.{issued}'
+
+    @property
+    def is_initial(self):
+        return self.issued is None
+
+
+def get_task_changes(user, token, limit):
+    """
+    Collect the task changes visible to a user since a sync token.
+
+    Args:
+        user (User): The syncing user.
+        token (SyncToken): The position of the client.
+        limit (int): The maximum number of changed tasks to return.
+
+    Returns:
+        tuple: The changed tasks (list), the ids of the tasks to drop (list), the new token (SyncToken)
+            and whether more changes are pending (bool).
+
+    Raises:
+        ExpiredSyncToken: If the tombstones the client needs were already purged.
+    """
+    retention = timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+    if not token.is_initial and token.issued < timezone.now() - retention:
+        raise ExpiredSyncToken("Sync token expired, a full sync is required.")
+
+    # the tombstone high-water mark is taken before the tasks are read: a task deleted after this point
+    # is missing from the tasks, its tombstone is past the mark and is reported by the next sync
+    last_tombstone = TaskTombstone.objects.order_by('-tombstone_id').values_list('tombstone_id', flat=True).first() or 0
+
+    queryset = get_visible_tasks(user, Task.objects.all()).filter(
+        Q(modified__gt=token.modified) | Q(modified=token.modified, task_id__gt=token.task_id)
+    ).order_by('modified', 'task_id').prefetch_related('task_assignee')
+    tasks = list(queryset[:limit + 1])
+    has_more = len(tasks) > limit
+    tasks = tasks[:limit]
+
+    next_token = SyncToken(token.modified, token.task_id, max(token.tombstone_id, last_tombstone))
+    if tasks:
+        next_token.modified, next_token.task_id = tasks[-1].modified, tasks[-1].task_id
+
+    deleted = []
+    # a full sync starts from the current tombstone position, older deletions are irrelevant
+    if not token.is_initial:
+        tombstones = TaskTombstone.objects.filter(tombstone_id__gt=token.tombstone_id, tombstone_id__lte=last_tombstone)
+        if user.role != 'admin':
+            tombstones = tombstones.filter(user=user)
+        else:
+            tombstones = tombstones.filter(reason='deleted')
+        task_ids = tombstones.order_by('tombstone_id').values_list('task_id', flat=True)
+        deleted = list(dict.fromkeys(task_ids))
+
+    return tasks, deleted, next_token, has_more
+
+
+def record_tombstones(task_ids_by_user, reason):
+    """
+    Write the tombstones of tasks leaving the task lists of users, in one statement.
+
+    Args:
+        task_ids_by_user (iterable): (task_id, user_id) pairs.
+        reason (str): 'deleted' or 'unassigned'.
+
+    Returns:
+        None.
+    """
+    TaskTombstone.objects.bulk_create([
+        TaskTombstone(task_id=task_id, user_id=user_id, reason=reason)
+        for task_id, user_id in task_ids_by_user
+    ])
+
+
+def purge_tombstones(before=None):
+    """
+    Delete the tombstones older than the retention period.
+
+    Args:
+        before (datetime): Delete the tombstones created before this time, defaults to now minus TASK_TOMBSTONE_RETENTION_DAYS.
+
+    Returns:
+        int: The number of deleted tombstones.
+    """
+    if before is None:
+        before = timezone.now() - timedelta(days=settings.TASK_TOMBSTONE_RETENTION_DAYS)
+    deleted, _ = TaskTombstone.objects.filter(created__lt=before).delete()
+    return deleted
@@ -0,0 +1,220 @@
+"""
+API documentation of the task_manager views, set on the viewset methods when the OpenAPI schema
+is generated (see task_management_system/schema.py), so serving requests never imports drf-yasg.
+"""
+from drf_yasg import openapi
+from drf_yasg.utils import swagger_auto_schema, no_body
+from jobs.custom_schemas import job_accepted_response_schema
+from utils.swagger import NoSortSearchInspector
+from .custom_schemas import *
+from .views import TaskViewSet, TaskCommentViewSet
+
+
+swagger_auto_schema(
+    responses={
+        200: get_task_response_schema,
+    },
+    manual_parameters=[
+        openapi.Parameter('completed', openapi.IN_QUERY, description='Is task completed', type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('task_assignee_id', openapi.IN_QUERY, description='Search by task assignee id', type=openapi.TYPE_INTEGER),
+        openapi.Parameter('due_date', openapi.IN_QUERY, description='Search by due date[Format: 2023-12-30 (YYYY-MM-DD)]', type=openapi.TYPE_STRING),
+        openapi.Parameter('due_before', openapi.IN_QUERY, description='Tasks due before a date, excluded [Format: 2023-12-30 (YYYY-MM-DD)]', type=openapi.TYPE_STRING),
+        openapi.Parameter('due_after', openapi.IN_QUERY, description='Tasks due after a date, excluded [Format: 2023-12-30 (YYYY-MM-DD)]', type=openapi.TYPE_STRING),
+        openapi.Parameter('overdue', openapi.IN_QUERY, description='Only the open tasks due before today', type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('due_within_days', openapi.IN_QUERY, description='Only the open tasks due from today to today + N days', type=openapi.TYPE_INTEGER),
+        openapi.Parameter('sort_by', openapi.IN_QUERY, description='Sort by [Option: due_date, id, priority] ', type=openapi.TYPE_STRING),
+        openapi.Parameter('sort_dir', openapi.IN_QUERY, description='Direction of sort [Option: desc, asc]', type=openapi.TYPE_STRING),
+        openapi.Parameter('include_archived', openapi.IN_QUERY, description='Also list the archived tasks, after the other tasks', type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('count', openapi.IN_QUERY, description='Total in meta.pagination.count [Option: exact (default), estimate, false]', type=openapi.TYPE_STRING),
+        openapi.Parameter('comment_summary', openapi.IN_QUERY, description='Add the comment_count and last_comment of each task, among the comments visible to the user', type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('include', openapi.IN_QUERY, description='Related resources added to the included section [Option: task_creator, task_assignee]', type=openapi.TYPE_STRING),
+    ],
+    filter_inspectors=[NoSortSearchInspector],
+    manual_operation=False,
+    operation_description='Retrieve all tasks.'
+)(TaskViewSet.list)
+
+
+swagger_auto_schema(
+    responses={
+        200: get_task_response_schema,
+    },
+    manual_parameters=[
+        openapi.Parameter('include_archived', openapi.IN_QUERY, description='Also look up the task in the archived tasks', type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('include', openapi.IN_QUERY, description='Related resources added to the included section [Option: task_creator, task_assignee]', type=openapi.TYPE_STRING),
+    ],
+    operation_description="Retrieve a task by id"
+)(TaskViewSet.retrieve)
+
+
+swagger_auto_schema(
+    request_body=patch_task_request_schema,
+    responses={
+        200: get_task_response_schema,
+    },
+    operation_description="Create a new task by id"
+)(TaskViewSet.create)
+
+
+swagger_auto_schema(
+    request_body=patch_task_request_schema,
+    responses={
+        200: patch_task_update_response_schema,
+    },
+    operation_description="Update a task by id. Only possible by an admin or the manager who created the task."
+)(TaskViewSet.partial_update)
+
+
+swagger_auto_schema(
+    responses={
+        200: get_task_changes_response_schema,
+    },
+    manual_parameters=[
+        openapi.Parameter('since', openapi.IN_QUERY, description='Sync token returned by the previous call, omit it for a full sync.', type=openapi.TYPE_STRING),
+        openapi.Parameter('limit', openapi.IN_QUERY, description='Maximum number of changed tasks to return [Default: 500, Max: 1000]', type=openapi.TYPE_INTEGER),
+    ],
+    filter_inspectors=[NoSortSearchInspector],
+    manual_operation=False,
+    operation_description='Retrieve the tasks created or modified and the ids of the tasks deleted or unassigned since a sync token. '
+                          'Apply "deleted" before "tasks", then call again with "next_token" (immediately while "has_more" is true).'
+)(TaskViewSet.changes)
+
+
+swagger_auto_schema(
+    responses={
+        200: get_task_stats_response_schema,
+    },
+    filter_inspectors=[NoSortSearchInspector],
+    manual_operation=False,
+    operation_description='Retrieve the open, completed, overdue and per priority task counts, in total, per creator and per assignee, '
+                          'and the open tasks per due-date bucket. Admins see every task, managers the tasks they created, '
+                          'team members the tasks assigned to them.'
+)(TaskViewSet.stats)
+
+
+swagger_auto_schema(
+    responses={
+        200: get_task_workload_response_schema,
+    },
+    filter_inspectors=[NoSortSearchInspector],
+    manual_operation=False,
+    operation_description='Retrieve the open tasks of each assignee, per priority and due week (weeks start on Monday), '
+                          'with the overdue tasks and the earliest due date, most loaded first. Managers see the tasks they created, '
+                          'team members their own tasks. Cached for a few seconds.'
+)(TaskViewSet.workload)
+
+
+swagger_auto_schema(
+    request_body=bulk_delete_tasks_request_schema,
+    responses={
+        202: job_accepted_response_schema,
+    },
+    operation_description="Delete tasks in the background, only the tasks created by the user are deleted. Follow the job at /jobs/{job_id}/."
+)(TaskViewSet.bulk_delete)
+
+
+swagger_auto_schema(
+    request_body=bulk_assign_tasks_request_schema,
+    responses={
+        202: job_accepted_response_schema,
+    },
+    operation_description="Assign users to tasks in the background. Follow the job at /jobs/{job_id}/."
+)(TaskViewSet.bulk_assign)
+
+
+swagger_auto_schema(
+    request_body=change_task_assignees_request_schema,
+    responses={
+        200: add_task_assignees_response_schema,
+    },
+    operation_description="Assign users to a task, keeping its current assignees. Only the users not assigned yet are added "
+                          "and returned, sending the same users again changes nothing. Admins, or the manager who created the task."
+)(TaskViewSet.add_assignees)
+
+
+swagger_auto_schema(
+    request_body=change_task_assignees_request_schema,
+    responses={
+        200: remove_task_assignees_response_schema,
+    },
+    operation_description="Unassign users from a task, keeping its other assignees. Only the users assigned are removed "
+                          "and returned, sending the same users again changes nothing. Admins, or the manager who created the task."
+)(TaskViewSet.remove_assignees)
+
+
+swagger_auto_schema(
+    request_body=no_body,
+    responses={
+        202: job_accepted_response_schema,
+    },
+    manual_parameters=[
+        openapi.Parameter('completed', openapi.IN_QUERY, description='Is task completed', type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('task_assignee_id', openapi.IN_QUERY, description='Search by task assignee id', type=openapi.TYPE_INTEGER),
+        openapi.Parameter('due_date', openapi.IN_QUERY, description='Search by due date[Format: 2023-12-30 (YYYY-MM-DD)]', type=openapi.TYPE_STRING),
+        openapi.Parameter('due_before', openapi.IN_QUERY, description='Tasks due before a date, excluded [Format: 2023-12-30 (YYYY-MM-DD)]', type=openapi.TYPE_STRING),
+        openapi.Parameter('due_after', openapi.IN_QUERY, description='Tasks due after a date, excluded [Format: 2023-12-30 (YYYY-MM-DD)]', type=openapi.TYPE_STRING),
+        openapi.Parameter('overdue', openapi.IN_QUERY, description='Only the open tasks due before today', type=openapi.TYPE_BOOLEAN),
+        openapi.Parameter('due_within_days', openapi.IN_QUERY, description='Only the open tasks due from today to today + N days', type=openapi.TYPE_INTEGER),
+        openapi.Parameter('sort_by', openapi.IN_QUERY, description='Sort by [Option: due_date, id, priority] ', type=openapi.TYPE_STRING),
+        openapi.Parameter('sort_dir', openapi.IN_QUERY, description='Direction of sort [Option: desc, asc]', type=openapi.TYPE_STRING),
+    ],
+    filter_inspectors=[NoSortSearchInspector],
+    operation_description="Export the tasks of the task list in the background, the job result holds the tasks. Follow the job at /jobs/{job_id}/."
+)(TaskViewSet.export)
+
+
+swagger_auto_schema(
+    request_body=import_tasks_request_schema,
+    responses={
+        202: job_accepted_response_schema,
+    },
+    operation_description="Create tasks in the background, all or none. Follow the job at /jobs/{job_id}/."
+)(TaskViewSet.import_tasks)
+
+
+swagger_auto_schema(
+    responses={
+        200: get_task_comment_response_schema,
+    },
+    manual_parameters=[
+        openapi.Parameter('include', openapi.IN_QUERY, description='Related resources added to the included section [Option: task_id, task_id.task_creator, task_id.task_assignee, comment_creator]', type=openapi.TYPE_STRING),
+        openapi.Parameter('task_id', openapi.IN_QUERY, description='Only the comments of a task', type=openapi.TYPE_INTEGER),
+    ],
+    filter_inspectors=[NoSortSearchInspector],
+    manual_operation=False,
+    operation_description='Retrieve all task comments.'
+)(TaskCommentViewSet.list)
+
+
+swagger_auto_schema(
+    responses={
+        200: get_task_comment_response_schema,
+    },
+    manual_parameters=[
+        openapi.Parameter('include', openapi.IN_QUERY, description='Related resources added to the included section [Option: task_id, task_id.task_creator, task_id.task_assignee, comment_creator]', type=openapi.TYPE_STRING),
+    ],
+    operation_description="Retrieve a task comment by id."
+)(TaskCommentViewSet.retrieve)
+
+
+swagger_auto_schema(
+    request_body=post_task_comment_request_schema,
+    responses={
+        200: post_task_comment_response_schema,
+    },
+    operation_description="Create a task comment for a task."
+)(TaskCommentViewSet.create)
+
+
+swagger_auto_schema(
+    request_body=patch_task_comment_request_schema,
+    responses={
+        200: post_task_comment_response_schema,
+    },
+    operation_description="Update a task comment for a task."
+)(TaskCommentViewSet.partial_update)
+
+
+swagger_auto_schema(
+    operation_description="Delete a task comment by id. Only possible by comment creator or admin."
+)(TaskCommentViewSet.destroy)
@@ -0,0 +1,171 @@
+"""
+In-process publish / subscribe of task and task comment change events.
+
+Model signals publish events to the broker from any thread, the broker hands
+them to the event loop of every subscribed stream whose user may see the task.
+Each subscription keeps a bounded buffer, a slow client loses its oldest events
+and is told to resynchronise instead of growing memory without limit.
+"""
+import asyncio
+import itertools
+import json
+import threading
+from collections import deque
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+
+
+class TaskEvent:
+    """
+    A change event of a task or of one of its comments.
+
+    Attributes:
+        event_id (int): The sequence number of the event within the process.
+        name (str): The event name, e.g. 'task.updated' or 'comment.created'.
+        audience (frozenset): The ids of the non-admin users allowed to see the event.
+        data (dict): The JSON serializable payload of the event.
+    """
+    _sequence = itertools.count(1)
+
+    def __init__(self, name, audience, data):
+        self.event_id = next(self._sequence)
+        self.name = name
+        self.audience = frozenset(audience)
+        self.data = data
+
+    def is_visible_to(self, user_id, role):
+        return role == 'admin' or user_id in self.audience
+
+    def encode(self):
+        """
+        Encode the event in the text/event-stream wire format.
+
+        Returns:
+            bytes: The encoded event.
+        """
+        payload = json.dumps(self.data, cls=DjangoJSONEncoder)
+        return f'id: {self.event_id}\nevent: {self.name}\ndata: {payload}\n\n'.encode()
+
+
+class Subscription:
+    """
+    The event buffer of one connected stream.
+
+    Events are pushed from any thread and consumed by the event loop that created the subscription.
+    """
+
+    def __init__(self, user_id, role, loop, buffer_size):
+        self.user_id = user_id
+        self.role = role
+        self.dropped = 0
+        self._loop = loop
+        self._buffer = deque(maxlen=buffer_size)
+        self._ready = asyncio.Event()
+
+    def push(self, event):
+        try:
+            self._loop.call_soon_threadsafe(self._append, event)
+        except RuntimeError:
+            pass  # the loop of a disconnected stream is already closed
+
+    def _append(self, event):
+        if len(self._buffer) == self._buffer.maxlen:
+            self.dropped += 1
+        self._buffer.append(event)
+        self._ready.set()
+
+    def wake(self):
+        """
+        Wake up the consumer waiting on the subscription, e.g. when its client disconnected.
+        """
+        self._ready.set()
+
+    async def wait(self, timeout):
+        """
+        Wait until at least one event is buffered.
+
+        Args:
+            timeout (float): The maximum number of seconds to wait.
+
+        Returns:
+            bool: True if events are available, False if the wait timed out.
+        """
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    def drain(self):
+        """
+        Take every buffered event out of the subscription.
+
+        Returns:
+            tuple: The list of events and the number of events dropped since the last drain.
+        """
+        events = list(self._buffer)
+        self._buffer.clear()
+        self._ready.clear()
+        dropped, self.dropped = self.dropped, 0
+        return events, dropped
+
+
+class EventBroker:
+    """
+    Thread safe registry of the subscriptions of the current process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = set()
+
+    def has_subscribers(self):
+        return bool(self._subscriptions)
+
+    def subscribe(self, user, loop=None, buffer_size=None):
+        """
+        Register a new subscription for a user.
+
+        Args:
+            user (User): The connected user.
+            loop (AbstractEventLoop): The event loop consuming the events, defaults to the running loop.
+            buffer_size (int): The maximum number of buffered events, defaults to TASK_EVENTS_BUFFER_SIZE.
+
+        Returns:
+            Subscription: The new subscription.
+        """
+        subscription = Subscription(
+            user.pk,
+            user.role,
+            loop or asyncio.get_running_loop(),
+            buffer_size or settings.TASK_EVENTS_BUFFER_SIZE,
+        )
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event):
+        """
+        Deliver an event to every subscription allowed to see it.
+
+        Args:
+            event (TaskEvent): The event to deliver.
+
+        Returns:
+            int: The number of subscriptions the event was delivered to.
+        """
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        delivered = 0
+        for subscription in subscriptions:
+            if event.is_visible_to(subscription.user_id, subscription.role):
+                subscription.push(event)
+                delivered += 1
+        return delivered
+
+
+broker = EventBroker()
@@ -0,0 +1,97 @@
+"""
+Background job handlers of the task endpoints too heavy to run in the request.
+"""
+from django.contrib.auth import get_user_model
+from jobs.registry import PermanentJobError, register
+from .models import Task
+from .access import TaskAccess
+from .queries import get_visible_tasks, filter_tasks
+from .serializers import TaskSerializer
+
+
+def _get_user(job, roles=None):
+    user = job.created_by
+    if user is None:
+        raise PermanentJobError('The user who queued the job no longer exists.')
+    if roles is not None and user.role not in roles:
+        raise PermanentJobError('The user who queued the job is not allowed to run it.')
+    return user
+
+
+@register('tasks.bulk_delete')
+def bulk_delete_tasks(job):
+    """
+    Delete the tasks of the payload created by the user, like TaskViewSet.destroy would one by one.
+
+    Payload:
+        task_ids (list): The ids of the tasks to delete.
+
+    Returns:
+        dict: The ids of the deleted tasks and of the tasks skipped (missing or not created by the user).
+    """
+    user = _get_user(job, roles=('admin', 'manager'))
+    task_ids = job.payload['task_ids']
+    access = TaskAccess(user)
+    tasks = access.filter(Task.objects.filter(task_id__in=task_ids).only('task_id', 'task_creator_id'), access.can_delete)
+    deleted_ids = [task.task_id for task in tasks]
+    Task.objects.filter(task_id__in=deleted_ids).delete()
+    return {'deleted_task_ids': deleted_ids, 'skipped_task_ids': sorted(set(task_ids) - set(deleted_ids))}
+
+
+@register('tasks.bulk_assign')
+def bulk_assign_tasks(job):
+    """
+    Assign users to the tasks of the payload the user can edit (see TaskAccess.can_edit).
+
+    Payload:
+        task_ids (list): The ids of the tasks.
+        task_assignee (list): The ids of the users to assign.
+
+    Returns:
+        dict: The ids of the updated tasks and of the tasks skipped (missing or not editable by the user).
+    """
+    user = _get_user(job, roles=('admin', 'manager'))
+    task_ids = job.payload['task_ids']
+    access = TaskAccess(user)
+    tasks = access.filter(Task.objects.filter(task_id__in=task_ids), access.can_edit)
+    # one add per assignee from the user side of the relation, instead of one per task
+    for assignee in get_user_model().objects.filter(id__in=job.payload['task_assignee']):
+        assignee.task_assignees.add(*tasks)
+    assigned_ids = sorted(task.task_id for task in tasks)
+    return {'assigned_task_ids': assigned_ids, 'skipped_task_ids': sorted(set(task_ids) - set(assigned_ids))}
+
+
+@register('tasks.export')
+def export_tasks(job):
+    """
+    Export the tasks visible to the user, filtered like the task list.
+
+    Payload:
+        The task list query parameters (completed, task_assignee_id, due_date, due_before, due_after, overdue,
+        due_within_days, sort_by, sort_dir).
+
+    Returns:
+        dict: The exported tasks.
+    """
+    user = _get_user(job)
+    queryset = filter_tasks(get_visible_tasks(user), job.payload).prefetch_related('task_assignee')
+    return {'tasks': TaskSerializer(queryset, many=True).data}
+
+
+@register('tasks.import')
+def import_tasks(job):
+    """
+    Create the tasks of the payload, all or none, with the user as creator.
+
+    Payload:
+        tasks (list): The tasks, in the format accepted by the task creation endpoint.
+
+    Returns:
+        dict: The ids of the created tasks.
+    """
+    user = _get_user(job, roles=('admin', 'manager'))
+    serializer = TaskSerializer(data=job.payload['tasks'], many=True)
+    if not serializer.is_valid():
+        raise PermanentJobError(f'Invalid tasks: {serializer.errors}')
+    tasks = serializer.save(task_creator=user)
+    return {'created_task_ids': [task.task_id for task in tasks]}
@@ -0,0 +1,26 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from task_manager.archive import archive_tasks
+
+
+class Command(BaseCommand):
+    """
+    Move the completed tasks untouched for a while, with their comments and assignees, to the archive tables.
+    """
+    help = 'Archive the completed tasks not modified for TASK_ARCHIVE_AFTER_DAYS days.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Archive the tasks completed and untouched for this many days (default: TASK_ARCHIVE_AFTER_DAYS).')
+        parser.add_argument('--batch-size', type=int, default=None, help='Tasks moved per transaction (default: TASK_ARCHIVE_BATCH_SIZE).')
+
+    def handle(self, *args, **options):
+        days = settings.TASK_ARCHIVE_AFTER_DAYS if options['days'] is None else options['days']
+        if days < 0:
+            raise CommandError('--days cannot be negative.')
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        archived = archive_tasks(timezone.now() - timedelta(days=days), options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{archived} task(s) archived.'))
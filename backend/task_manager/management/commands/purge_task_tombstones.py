@@ -0,0 +1,28 @@
+from datetime import timedelta
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from task_manager.delta_sync import purge_tombstones
+
+
+class Command(BaseCommand):
+    """
+    Delete the delta-sync tombstones older than the retention period.
+
+    Clients holding a sync token older than the retention get a 410 from
+    /tasks/changes/ and fall back to a full sync, so nothing is lost.
+    """
+    help = 'Delete the task tombstones older than TASK_TOMBSTONE_RETENTION_DAYS.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--days', type=int, default=None, help='Retention in days (default: TASK_TOMBSTONE_RETENTION_DAYS).')
+
+    def handle(self, *args, **options):
+        days = options['days']
+        if days is None:
+            days = settings.TASK_TOMBSTONE_RETENTION_DAYS
+        if days < settings.TASK_TOMBSTONE_RETENTION_DAYS:
+            raise CommandError('--days cannot be lower than TASK_TOMBSTONE_RETENTION_DAYS, live sync tokens would miss deletions.')
+
+        deleted = purge_tombstones(timezone.now() - timedelta(days=days))
+        self.stdout.write(self.style.SUCCESS(f'{deleted} tombstone(s) older than {days} day(s) deleted.'))
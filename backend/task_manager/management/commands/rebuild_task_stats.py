@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from task_manager.models import TaskStat
+from task_manager.stats import rebuild_task_stats, TASK_FIELDS
+
+
+def _snapshot():
+    rows = TaskStat.objects.exclude(count=0).values_list('scope', 'user_id', *TASK_FIELDS, 'count')
+    counts = {}
+    for *key, count in rows:
+        counts[tuple(key)] = counts.get(tuple(key), 0) + count
+    return counts
+
+
+class Command(BaseCommand):
+    """
+    Recount the task statistics rollup from the tasks.
+
+    The rollup is kept up to date by the task signals, this reconciles it after
+    writes bypassing them (raw SQL, bulk_create, a restored backup) and reports
+    the counts it corrected.
+    """
+    help = 'Rebuild the task statistics rollup (TaskStat) from scratch.'
+
+    def handle(self, *args, **options):
+        before = _snapshot()
+        written = rebuild_task_stats()
+        after = _snapshot()
+        corrected = sum(1 for key in before.keys() | after.keys() if before.get(key, 0) != after.get(key, 0))
+        self.stdout.write(self.style.SUCCESS(f'{written} task statistic row(s) written, {corrected} count(s) corrected.'))
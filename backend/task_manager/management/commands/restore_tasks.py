@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from task_manager.archive import restore_tasks
+
+
+class Command(BaseCommand):
+    """
+    Move archived tasks, with their comments and assignees, back to the task tables.
+    """
+    help = 'Restore archived tasks by id, or every archived task with --all.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('task_ids', nargs='*', type=int, help='Ids of the archived tasks to restore.')
+        parser.add_argument('--all', action='store_true', help='Restore every archived task.')
+        parser.add_argument('--batch-size', type=int, default=None, help='Tasks moved per transaction (default: TASK_ARCHIVE_BATCH_SIZE).')
+
+    def handle(self, *args, **options):
+        if bool(options['task_ids']) == options['all']:
+            raise CommandError('Give the ids of the tasks to restore or --all, not both.')
+        if options['batch_size'] is not None and options['batch_size'] < 1:
+            raise CommandError('--batch-size must be positive.')
+
+        restored = restore_tasks(options['task_ids'] or None, options['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'{restored} task(s) restored.'))
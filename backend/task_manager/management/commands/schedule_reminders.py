@@ -0,0 +1,31 @@
+import time
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from task_manager.reminders import schedule_reminders
+
+
+class Command(BaseCommand):
+    """
+    Scheduler waking every TASK_REMINDER_INTERVAL_SECONDS to write the reminders of the open tasks coming due.
+    """
+    help = 'Write the due-date reminders of the open tasks, at intervals or once.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--interval', type=int, default=None, help='Seconds between runs (default: TASK_REMINDER_INTERVAL_SECONDS).')
+        parser.add_argument('--once', action='store_true', help='Run once and exit, e.g. from cron.')
+
+    def handle(self, *args, **options):
+        interval = options['interval'] or settings.TASK_REMINDER_INTERVAL_SECONDS
+        if interval < 1:
+            raise CommandError('--interval must be positive.')
+        try:
+            while True:
+                reminded = schedule_reminders()
+                for user_id, task_ids in sorted(reminded.items()):
+                    self.stdout.write(f'User {user_id}: {len(task_ids)} task(s) coming due.')
+                self.stdout.write(self.style.SUCCESS(f'{sum(map(len, reminded.values()))} reminder(s) scheduled.'))
+                if options['once']:
+                    return
+                time.sleep(interval)
+        except KeyboardInterrupt:
+            self.stdout.write('Stopped.')
@@ -0,0 +1,43 @@
+# Generated by Django 4.1.9 on 2026-10-19 13:22
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('task_manager', '0002_alter_task_task_due_date'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskTombstone',
+            fields=[
+                ('tombstone_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('task_id', models.IntegerField(verbose_name='Task')),
+                ('reason', models.CharField(choices=[('deleted', 'Deleted'), ('unassigned', 'Unassigned')], max_length=20, verbose_name='Reason')),
+                ('created', models.DateTimeField(auto_now_add=True, db_index=True, verbose_name='Created')),
+            ],
+            options={
+                'verbose_name': 'Task Tombstone',
+                'verbose_name_plural': 'Task Tombstones',
+                'ordering': ['tombstone_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['modified', 'task_id'], name='task_modified_idx'),
+        ),
+        migrations.AddField(
+            model_name='tasktombstone',
+            name='user',
+            field=models.ForeignKey(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, related_name='task_tombstones', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddIndex(
+            model_name='tasktombstone',
+            index=models.Index(fields=['user', 'tombstone_id'], name='tombstone_user_idx'),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 4.1.9 on 2026-10-19 13:27
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('task_manager', '0003_task_tombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ArchivedTask',
+            fields=[
+                ('task_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('task_name', models.CharField(max_length=200, verbose_name='Task Name')),
+                ('task_description', models.TextField(blank=True, null=True, verbose_name='Task Description')),
+                ('task_due_date', models.DateField(blank=True, null=True, verbose_name='Due Date')),
+                ('priority', models.IntegerField(blank=True, choices=[(1, 'High'), (2, 'Medium'), (3, 'Low')], null=True)),
+                ('completed', models.BooleanField(default=False, null=True, verbose_name='Completed')),
+                ('created', models.DateTimeField(verbose_name='Created')),
+                ('modified', models.DateTimeField(verbose_name='Modified')),
+                ('archived', models.DateTimeField(db_index=True, default=django.utils.timezone.now, verbose_name='Archived')),
+                ('task_assignee', models.ManyToManyField(blank=True, related_name='archived_task_assignees', to=settings.AUTH_USER_MODEL, verbose_name='Task Assignee(s)')),
+                ('task_creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_task_creator', to=settings.AUTH_USER_MODEL, verbose_name='Task Creator')),
+            ],
+            options={
+                'verbose_name': 'Archived Task',
+                'verbose_name_plural': 'Archived Tasks',
+                'ordering': ['task_id'],
+            },
+        ),
+        migrations.CreateModel(
+            name='ArchivedTaskComment',
+            fields=[
+                ('comment_id', models.IntegerField(primary_key=True, serialize=False)),
+                ('comment', models.TextField(verbose_name='Comment')),
+                ('created', models.DateTimeField(verbose_name='Created')),
+                ('modified', models.DateTimeField(verbose_name='Modified')),
+                ('comment_creator', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='archived_comment_creator', to=settings.AUTH_USER_MODEL)),
+                ('task_id', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='comments', to='task_manager.archivedtask', verbose_name='Task')),
+            ],
+            options={
+                'verbose_name': 'Archived Task Comment',
+                'verbose_name_plural': 'Archived Task Comments',
+                'ordering': ['comment_id'],
+            },
+        ),
+    ]
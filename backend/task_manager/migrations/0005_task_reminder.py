@@ -0,0 +1,63 @@
+# Generated by Django 4.1.9 on 2026-10-19 13:33
+
+from django.conf import settings
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('task_manager', '0004_archived_task'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('due_date', models.DateField(verbose_name='Due Date')),
+                ('modified', models.DateTimeField(verbose_name='Modified')),
+            ],
+            options={
+                'verbose_name': 'Reminder Watermark',
+                'verbose_name_plural': 'Reminder Watermark',
+            },
+        ),
+        migrations.CreateModel(
+            name='TaskReminder',
+            fields=[
+                ('reminder_id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('due_date', models.DateField(verbose_name='Due Date')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Created')),
+            ],
+            options={
+                'verbose_name': 'Task Reminder',
+                'verbose_name_plural': 'Task Reminders',
+                'ordering': ['reminder_id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False)), fields=['task_due_date'], name='open_task_due_idx'),
+        ),
+        migrations.AddField(
+            model_name='taskreminder',
+            name='task',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reminders', to='task_manager.task', verbose_name='Task'),
+        ),
+        migrations.AddField(
+            model_name='taskreminder',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_reminders', to=settings.AUTH_USER_MODEL, verbose_name='User'),
+        ),
+        migrations.AddIndex(
+            model_name='taskreminder',
+            index=models.Index(fields=['user', 'due_date'], name='reminder_user_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='taskreminder',
+            constraint=models.UniqueConstraint(fields=('task', 'user', 'due_date'), name='unique_task_reminder'),
+        ),
+    ]
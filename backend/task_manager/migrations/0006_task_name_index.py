@@ -0,0 +1,17 @@
+# Generated by Django 4.1.9 on 2026-10-19 13:35
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0005_task_reminder'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(fields=['task_name'], name='task_name_idx', opclasses=['varchar_pattern_ops']),
+        ),
+    ]
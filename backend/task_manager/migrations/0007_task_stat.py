@@ -0,0 +1,56 @@
+# Generated by Django 4.1.9 on 2026-10-19 14:16
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def count_tasks(apps, schema_editor):
+    """
+    Fill the rollup from the existing tasks, like `python manage.py rebuild_task_stats`.
+    """
+    Task = apps.get_model('task_manager', 'Task')
+    TaskStat = apps.get_model('task_manager', 'TaskStat')
+    fields = ('task_due_date', 'priority', 'completed')
+    rows = [
+        TaskStat(scope='creator', user_id=row['task_creator_id'], count=row['count'], **{field: row[field] for field in fields})
+        for row in Task.objects.order_by().values('task_creator_id', *fields).annotate(count=Count('task_id'))
+    ]
+    rows += [
+        TaskStat(scope='assignee', user_id=row['userprofile_id'], count=row['count'], **{field: row[f'task__{field}'] for field in fields})
+        for row in Task.task_assignee.through.objects.order_by().values('userprofile_id', *[f'task__{field}' for field in fields]).annotate(count=Count('task_id'))
+    ]
+    TaskStat.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('task_manager', '0006_task_name_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TaskStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('creator', 'Creator'), ('assignee', 'Assignee')], max_length=10, verbose_name='Scope')),
+                ('task_due_date', models.DateField(null=True, verbose_name='Due Date')),
+                ('priority', models.IntegerField(null=True, verbose_name='Priority')),
+                ('completed', models.BooleanField(null=True, verbose_name='Completed')),
+                ('count', models.IntegerField(default=0, verbose_name='Count')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='task_stats', to=settings.AUTH_USER_MODEL, verbose_name='User')),
+            ],
+            options={
+                'verbose_name': 'Task Statistic',
+                'verbose_name_plural': 'Task Statistics',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='taskstat',
+            index=models.Index(fields=['scope', 'user', 'task_due_date'], name='task_stat_user_idx'),
+        ),
+        migrations.RunPython(count_tasks, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.1.9 on 2026-10-19 15:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('task_manager', '0008_open_tasks_index'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='task',
+            index=models.Index(condition=models.Q(('completed', False)), fields=['task_creator', 'task_due_date'], name='open_tasks_by_creator'),
+        ),
+    ]
@@ -23,6 +23,16 @@ class Task(TimeStampedModel, models.Model):
         verbose_name = 'Task'
         verbose_name_plural = 'Tasks'
         ordering = ["task_id"]
+        indexes = [
+            models.Index(fields=['modified', 'task_id'], name='task_modified_idx'),
+            # open tasks only: completed tasks are never overdue nor reminded, and they are most of the table;
+            # the priority serves the overdue and due soon lists sorted by priority without reading the tasks
+            models.Index(fields=['task_due_date', 'priority'], name='open_tasks', condition=models.Q(completed=False)),
+            # the same for the task lists of the managers, restricted to the tasks they created
+            models.Index(fields=['task_creator', 'task_due_date'], name='open_tasks_by_creator', condition=models.Q(completed=False)),
+            # prefix search of the admin, the operator class makes LIKE 'prefix%' indexable on PostgreSQL
+            models.Index(fields=['task_name'], name='task_name_idx', opclasses=['varchar_pattern_ops']),
+        ]
     
     PRIORITY_CHOICES = (
             (1, 'High'),
@@ -67,4 +77,197 @@ class TaskComment(TimeStampedModel, models.Model):
     comment = models.TextField(verbose_name="Comment")
 
     def __str__(self):
-        return f'{self.comment}'
\ No newline at end of file
+        return f'{self.comment}'
+
+
+class TaskTombstone(models.Model):
+    """
+    Records that a task left the task list of a user, so delta-sync clients can drop it.
+
+    Fields:
+        tombstone_id (BigAutoField): The unique, increasing identifier of the tombstone.
+        task_id (IntegerField): The id of the task that was deleted or unassigned.
+        user (ForeignKey): The user who lost access to the task.
+        reason (CharField): Why the task left the list, 'deleted' or 'unassigned'.
+        created (DateTimeField): When the task left the list.
+    """
+    class Meta:
+        verbose_name = 'Task Tombstone'
+        verbose_name_plural = 'Task Tombstones'
+        ordering = ["tombstone_id"]
+        indexes = [
+            models.Index(fields=['user', 'tombstone_id'], name='tombstone_user_idx'),
+        ]
+
+    REASON_CHOICES = (
+            ('deleted', 'Deleted'),
+            ('unassigned', 'Unassigned'),
+    )
+
+    tombstone_id = models.BigAutoField(primary_key=True)
+    task_id = models.IntegerField(verbose_name="Task")
+    # no database constraint: deleting a user cascades to their tasks, whose tombstones are written mid-deletion
+    user = models.ForeignKey(get_user_model(), on_delete=models.DO_NOTHING, db_constraint=False, related_name='task_tombstones', verbose_name="User")
+    reason = models.CharField(max_length=20, choices=REASON_CHOICES, verbose_name="Reason")
+    created = models.DateTimeField(auto_now_add=True, db_index=True, verbose_name="Created")
+
+    def __str__(self):
+        return f'{self.task_id} ({self.reason})'
+
+
+class ArchivedTask(models.Model):
+    """
+    Cold copy of a completed task moved out of the Task table by the archive_tasks command.
+    Task ids are kept, so restore_tasks brings a task back under the same id.
+
+    Fields:
+        task_id (IntegerField): The identifier the task had in the Task table.
+        task_name (CharField): The name of the task.
+        task_description (TextField): The description of the task.
+        task_due_date (DateField): The due date of the task.
+        task_creator (ForeignKey): The user who created the task.
+        task_assignee (ManyToManyField): The users assigned to the task.
+        priority (IntegerField): The priority level of the task.
+        completed (BooleanField): Indicates if the task is completed or not.
+        created (DateTimeField): When the task was created.
+        modified (DateTimeField): When the task was last modified before being archived.
+        archived (DateTimeField): When the task was archived.
+    """
+    class Meta:
+        verbose_name = 'Archived Task'
+        verbose_name_plural = 'Archived Tasks'
+        ordering = ["task_id"]
+
+    user = get_user_model()
+    task_id = models.IntegerField(primary_key=True)
+    task_name = models.CharField(max_length=200, null=False, verbose_name="Task Name")
+    task_description = models.TextField(null=True, blank=True, verbose_name="Task Description")
+    task_due_date = models.DateField(null=True, blank=True, verbose_name="Due Date")
+    task_creator = models.ForeignKey(user, on_delete=models.CASCADE, null=False, related_name='archived_task_creator', verbose_name="Task Creator")
+    task_assignee = models.ManyToManyField(user, blank=True, related_name='archived_task_assignees', verbose_name="Task Assignee(s)")
+    priority = models.IntegerField(null=True, blank=True, choices=Task.PRIORITY_CHOICES)
+    completed = models.BooleanField(null=True, default=False, verbose_name="Completed")
+    created = models.DateTimeField(verbose_name="Created")
+    modified = models.DateTimeField(verbose_name="Modified")
+    archived = models.DateTimeField(default=timezone.now, db_index=True, verbose_name="Archived")
+
+    def __str__(self):
+        return f'{self.task_name}'
+
+
+class ArchivedTaskComment(models.Model):
+    """
+    Cold copy of a comment of an archived task.
+
+    Fields:
+        comment_id (IntegerField): The identifier the comment had in the TaskComment table.
+        task_id (ForeignKey): The archived task to which the comment belongs.
+        comment_creator (ForeignKey): The user who created the comment.
+        comment (TextField): The content of the comment.
+        created (DateTimeField): When the comment was created.
+        modified (DateTimeField): When the comment was last modified.
+    """
+    class Meta:
+        verbose_name = 'Archived Task Comment'
+        verbose_name_plural = 'Archived Task Comments'
+        ordering = ["comment_id"]
+
+    user = get_user_model()
+    comment_id = models.IntegerField(primary_key=True)
+    task_id = models.ForeignKey(ArchivedTask, on_delete=models.CASCADE, null=False, related_name='comments', verbose_name="Task")
+    comment_creator = models.ForeignKey(user, on_delete=models.CASCADE, null=False, related_name='archived_comment_creator')
+    comment = models.TextField(verbose_name="Comment")
+    created = models.DateTimeField(verbose_name="Created")
+    modified = models.DateTimeField(verbose_name="Modified")
+
+    def __str__(self):
+        return f'{self.comment}'
+
+
+class TaskReminder(models.Model):
+    """
+    A due-date reminder of a task for one of its assignees, written by the schedule_reminders command.
+
+    Fields:
+        reminder_id (BigAutoField): The unique identifier for the reminder.
+        task (ForeignKey): The task coming due.
+        user (ForeignKey): The assignee to remind.
+        due_date (DateField): The due date the reminder is about, a new due date gets a new reminder.
+        created (DateTimeField): When the reminder was scheduled.
+    """
+    class Meta:
+        verbose_name = 'Task Reminder'
+        verbose_name_plural = 'Task Reminders'
+        ordering = ["reminder_id"]
+        constraints = [
+            models.UniqueConstraint(fields=['task', 'user', 'due_date'], name='unique_task_reminder'),
+        ]
+        indexes = [
+            models.Index(fields=['user', 'due_date'], name='reminder_user_idx'),
+        ]
+
+    reminder_id = models.BigAutoField(primary_key=True)
+    task = models.ForeignKey(Task, on_delete=models.CASCADE, related_name='reminders', verbose_name="Task")
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='task_reminders', verbose_name="User")
+    due_date = models.DateField(verbose_name="Due Date")
+    created = models.DateTimeField(auto_now_add=True, verbose_name="Created")
+
+    def __str__(self):
+        return f'{self.task_id} due {self.due_date} for {self.user_id}'
+
+
+class ReminderWatermark(models.Model):
+    """
+    How far the schedule_reminders command got, a single row. The next run only reads
+    the tasks coming due after due_date and the tasks modified after modified.
+
+    Fields:
+        due_date (DateField): The last due date already scanned.
+        modified (DateTimeField): The start of the last run, tasks modified later are scanned again.
+    """
+    class Meta:
+        verbose_name = 'Reminder Watermark'
+        verbose_name_plural = 'Reminder Watermark'
+
+    due_date = models.DateField(verbose_name="Due Date")
+    modified = models.DateTimeField(verbose_name="Modified")
+
+    def __str__(self):
+        return f'{self.due_date} / {self.modified}'
+
+
+class TaskStat(models.Model):
+    """
+    Rollup of the task counts, kept up to date by the task signals with delta arithmetic
+    (task_manager/stats.py) so the statistics never scan the tasks.
+    One row counts the tasks of a user, as creator or as assignee, sharing a due date, a priority and a completion state.
+
+    Fields:
+        scope (CharField): How the tasks relate to the user, 'creator' or 'assignee'.
+        user (ForeignKey): The creator or assignee of the tasks.
+        task_due_date (DateField): The due date of the tasks.
+        priority (IntegerField): The priority of the tasks.
+        completed (BooleanField): The completion state of the tasks.
+        count (IntegerField): The number of tasks.
+    """
+    class Meta:
+        verbose_name = 'Task Statistic'
+        verbose_name_plural = 'Task Statistics'
+        indexes = [
+            models.Index(fields=['scope', 'user', 'task_due_date'], name='task_stat_user_idx'),
+        ]
+
+    SCOPE_CHOICES = (
+            ('creator', 'Creator'),
+            ('assignee', 'Assignee'),
+    )
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES, verbose_name="Scope")
+    user = models.ForeignKey(get_user_model(), on_delete=models.CASCADE, related_name='task_stats', verbose_name="User")
+    task_due_date = models.DateField(null=True, verbose_name="Due Date")
+    priority = models.IntegerField(null=True, verbose_name="Priority")
+    completed = models.BooleanField(null=True, verbose_name="Completed")
+    count = models.IntegerField(default=0, verbose_name="Count")
+
+    def __str__(self):
+        return f'{self.scope} {self.user_id}: {self.count}'
@@ -0,0 +1,285 @@
+from datetime import date, timedelta
+from django.db import connections
+from django.db.models import Count, F, IntegerField, Min, OuterRef, Q, Subquery, Value, Window, prefetch_related_objects
+from django.db.models.functions import Coalesce, Left, RowNumber
+from django.utils import timezone
+from rest_framework.serializers import ValidationError
+from utils.iterables import chunked
+from .models import Task, TaskComment, ArchivedTask, ArchivedTaskComment
+
+# characters of the latest comment rendered in the task list
+COMMENT_PREVIEW_LENGTH = 100
+
+
+def get_visible_tasks(user, queryset=None):
+    """
+    Restrict a task queryset to the tasks the user is allowed to list.
+    Admins see every task, managers the tasks they created and team members the tasks assigned to them.
+
+    Args:
+        user (User): The requesting user.
+        queryset (QuerySet): The task queryset to restrict, defaults to all tasks.
+
+    Returns:
+        QuerySet: The tasks visible to the user.
+    """
+    if queryset is None:
+        queryset = Task.objects.all()
+    if user.role == 'admin':
+        return queryset  # All tasks for admin
+    elif user.role == 'manager':
+        return queryset.filter(task_creator=user)  # Tasks created by manager
+    elif user.role == 'team_member':
+        return queryset.filter(task_assignee=user)  # Tasks assigned to team member
+    return queryset.none()
+
+
+def _parse_date(query_params, key):
+    value = query_params.get(key)
+    if value is None:
+        return None
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        raise ValidationError(f"{key} must be a date (YYYY-MM-DD).")
+
+
+def filter_tasks(queryset, query_params):
+    """
+    Apply the task list query parameters (completed, task_assignee_id, due_date, due_before, due_after,
+    overdue, due_within_days, sort_by, sort_dir) to a queryset.
+
+    The overdue and due soon filters only match open tasks, a range of the open_tasks partial index
+    (open_tasks_by_creator for the tasks of a manager).
+
+    Args:
+        queryset (QuerySet): The task queryset to filter.
+        query_params (QueryDict): The query parameters of the request.
+
+    Returns:
+        QuerySet: The filtered and sorted task queryset.
+
+    Raises:
+        ValidationError: If a due date filter is invalid.
+    """
+    completed = query_params.get('completed')
+    task_assignee_id = query_params.get('task_assignee_id')
+    due_date = query_params.get('due_date', None)
+    due_before = _parse_date(query_params, 'due_before')
+    due_after = _parse_date(query_params, 'due_after')
+    overdue = query_params.get('overdue')
+    due_within_days = query_params.get('due_within_days')
+    sort_by = query_params.get('sort_by', None)
+    sort_dir = query_params.get('sort_dir')
+
+    if completed is not None:
+        completed = str(completed).lower() == 'true'
+        queryset = queryset.filter(completed=completed)
+
+    if task_assignee_id:
+        queryset = queryset.filter(task_assignee=task_assignee_id)
+
+    if due_date is not None:
+        queryset = queryset.filter(task_due_date=due_date)
+
+    if due_before is not None:
+        queryset = queryset.filter(task_due_date__lt=due_before)
+
+    if due_after is not None:
+        queryset = queryset.filter(task_due_date__gt=due_after)
+
+    today = timezone.localdate()
+    if overdue is not None and str(overdue).lower() == 'true':
+        # NULL is never overdue; spelled out, it bounds the index range so that the planner prefers it to a scan
+        queryset = queryset.filter(completed=False, task_due_date__isnull=False, task_due_date__lt=today)
+
+    if due_within_days is not None:
+        try:
+            days = int(due_within_days)
+        except (TypeError, ValueError):
+            raise ValidationError("due_within_days must be an integer.")
+        if days < 0:
+            raise ValidationError("due_within_days must not be negative.")
+        queryset = queryset.filter(completed=False, task_due_date__gte=today, task_due_date__lte=today + timedelta(days=days))
+
+    sort_fields = {'due_date': 'task_due_date', 'id': 'task_id', 'priority': 'priority'}
+    if sort_by in sort_fields:
+        queryset = queryset.order_by(sort_fields[sort_by])
+        if sort_dir == "desc":
+            queryset = queryset.reverse()
+
+    return queryset
+
+
+def get_visible_task_comments(user, queryset=None):
+    """
+    Restrict a task comment queryset to the comments the user is allowed to list.
+    Admins see every comment, other users the comments they wrote.
+
+    Args:
+        user (User): The requesting user.
+        queryset (QuerySet): The comment queryset to restrict, defaults to all comments.
+
+    Returns:
+        QuerySet: The comments visible to the user.
+    """
+    if queryset is None:
+        queryset = TaskComment.objects.all()
+    if user.role == 'admin':
+        return queryset  # All task comment for admin
+    elif user.role in ('manager', 'team_member'):
+        return queryset.filter(comment_creator=user)  # Comments written by the user
+    return queryset.none()
+
+
+def filter_task_comments(queryset, query_params):
+    """
+    Apply the task comment list query parameters (task_id) to a queryset.
+
+    Args:
+        queryset (QuerySet): The task comment queryset to filter.
+        query_params (QueryDict): The query parameters of the request.
+
+    Returns:
+        QuerySet: The filtered task comment queryset.
+
+    Raises:
+        ValidationError: If the task id is not an integer.
+    """
+    task_id = query_params.get('task_id')
+    if task_id is not None:
+        try:
+            task_id = int(task_id)
+        except (TypeError, ValueError):
+            raise ValidationError("task_id must be an integer.")
+        queryset = queryset.filter(task_id=task_id)
+    return queryset
+
+
+def annotate_comment_summary(queryset, user):
+    """
+    Annotate a task queryset with the number of comments of each task and its latest comment,
+    among the comments visible to the user (see get_visible_task_comments).
+    Each annotation is a correlated subquery over the comments of one task, evaluated for the
+    rows of the page only: the cost is constant per page, and the count of the list ignores them.
+
+    Args:
+        queryset (QuerySet): The task or archived task queryset.
+        user (User): The requesting user.
+
+    Returns:
+        QuerySet: The queryset with comment_count, last_comment_id, last_comment_creator_id,
+            last_comment_created and last_comment_preview annotations.
+    """
+    comment_model = ArchivedTaskComment if queryset.model is ArchivedTask else TaskComment
+    comments = get_visible_task_comments(user, comment_model.objects.filter(task_id=OuterRef('pk')).order_by())
+    last_comment = comments.order_by('-comment_id')[:1]
+    return queryset.annotate(
+        comment_count=Coalesce(Subquery(comments.values('task_id').annotate(count=Count('pk')).values('count'), output_field=IntegerField()), Value(0)),
+        last_comment_id=Subquery(last_comment.values('comment_id')),
+        last_comment_creator_id=Subquery(last_comment.values('comment_creator_id')),
+        last_comment_created=Subquery(last_comment.values('created')),
+        last_comment_preview=Subquery(last_comment.values(preview=Left('comment', COMMENT_PREVIEW_LENGTH))),
+    )
+
+
+def _get_first_task_ids(queryset, user_field, limit):
+    rows = queryset.order_by().values_list(user_field, 'task_id')
+    if limit is None:
+        return list(rows.order_by('task_id'))
+    # Django cannot filter on a window function yet: the ranked rows are filtered by an outer query
+    ranked = rows.annotate(position=Window(RowNumber(), partition_by=F(user_field), order_by=F('task_id').asc()))
+    sql, params = ranked.query.sql_with_params()
+    with connections[ranked.db].cursor() as cursor:
+        cursor.execute(f'SELECT * FROM ({sql}) ranked WHERE ranked.position <= %s ORDER BY 2', (*params, limit))
+        return [row[:2] for row in cursor.fetchall()]
+
+
+def get_user_tasks(user_ids, viewer, limit=None):
+    """
+    Load the tasks created by and assigned to many users at once, for the ?tasks=true user list,
+    restricted to the tasks visible to the requesting user (see get_visible_tasks).
+    Two queries find the task ids of every user, ranked and cut at the limit in SQL, two more load
+    the kept tasks with their creators and assignees, whatever the number of users.
+
+    Args:
+        user_ids (list): The ids of the users.
+        viewer (User): The requesting user.
+        limit (int): The maximum number of created and of assigned tasks kept per user, the lowest task ids first.
+
+    Returns:
+        dict: {'created_tasks': [Task], 'assigned_tasks': [Task]} by user id.
+    """
+    visible = get_visible_tasks(viewer)
+    pairs = {
+        'created_tasks': _get_first_task_ids(visible.filter(task_creator_id__in=user_ids), 'task_creator_id', limit),
+        'assigned_tasks': _get_first_task_ids(
+            Task.task_assignee.through.objects.filter(userprofile_id__in=user_ids, task_id__in=visible.values('task_id')),
+            'userprofile_id', limit,
+        ),
+    }
+    task_ids = {user_id: {key: [] for key in pairs} for user_id in user_ids}
+    for key, rows in pairs.items():
+        for user_id, task_id in rows:
+            task_ids[user_id][key].append(task_id)
+
+    wanted = sorted({task_id for user in task_ids.values() for ids in user.values() for task_id in ids})
+    tasks = {}
+    for chunk in chunked(wanted, 500):
+        loaded = list(Task.objects.filter(task_id__in=chunk).select_related('task_creator'))
+        prefetch_related_objects(loaded, 'task_assignee')
+        tasks.update((task.task_id, task) for task in loaded)
+    return {
+        user_id: {key: [tasks[task_id] for task_id in ids] for key, ids in user.items()}
+        for user_id, user in task_ids.items()
+    }
+
+
+def get_assignee_workload(user, today):
+    """
+    Count the open tasks of every assignee in one GROUP BY over the assignee table joined to the tasks,
+    restricted to the tasks visible to the user (see get_visible_tasks).
+
+    Args:
+        user (User): The requesting user.
+        today (date): The day the due weeks and overdue tasks are computed from.
+
+    Returns:
+        list: Per assignee, the open tasks in total, per priority and per due week, the overdue tasks
+            and the earliest due date, the most loaded assignees first.
+    """
+    assignments = Task.task_assignee.through.objects.exclude(task__completed=True)
+    if user.role == 'manager':
+        assignments = assignments.filter(task__task_creator=user)
+    elif user.role == 'team_member':
+        assignments = assignments.filter(userprofile=user)
+    elif user.role != 'admin':
+        return []
+
+    due_date = 'task__task_due_date'
+    week_start = today - timedelta(days=today.weekday())
+    next_week_start = week_start + timedelta(days=7)
+    rows = assignments.values(user_id=F('userprofile_id'), username=F('userprofile__username')).annotate(
+        open=Count('task_id'),
+        overdue=Count('task_id', filter=Q(**{f'{due_date}__lt': today})),
+        earliest_due_date=Min(due_date),
+        high=Count('task_id', filter=Q(task__priority=1)),
+        medium=Count('task_id', filter=Q(task__priority=2)),
+        low=Count('task_id', filter=Q(task__priority=3)),
+        this_week=Count('task_id', filter=Q(**{f'{due_date}__gte': today, f'{due_date}__lt': next_week_start})),
+        next_week=Count('task_id', filter=Q(**{f'{due_date}__gte': next_week_start, f'{due_date}__lt': next_week_start + timedelta(days=7)})),
+        later=Count('task_id', filter=Q(**{f'{due_date}__gte': next_week_start + timedelta(days=7)})),
+        no_due_date=Count('task_id', filter=Q(**{f'{due_date}__isnull': True})),
+    ).order_by('-open', 'user_id')
+    return [
+        {
+            'user_id': row['user_id'],
+            'username': row['username'],
+            'open': row['open'],
+            'overdue': row['overdue'],
+            'earliest_due_date': row['earliest_due_date'],
+            'by_priority': {name: row[name] for name in ('high', 'medium', 'low')},
+            'by_due_week': {name: row[name] for name in ('this_week', 'next_week', 'later', 'no_due_date')},
+        }
+        for row in rows
+    ]
@@ -0,0 +1,62 @@
+"""
+Due-date reminders of open tasks.
+
+Each run of the scheduler only reads new work, thanks to the ReminderWatermark:
+the open tasks whose due date entered the reminder window since the last run
+(a range of the open_tasks partial index), plus the open tasks modified
+since the last run (a range of task_modified_idx) which may have been given a
+due date inside the part of the window already scanned. The cost of a run
+follows the number of tasks coming due, not the size of the Task table.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from utils.iterables import chunked
+from .models import Task, TaskReminder, ReminderWatermark
+
+
+def schedule_reminders(now=None):
+    """
+    Write the reminders of the open tasks due within TASK_REMINDER_WINDOW_DAYS, one per assignee,
+    and move the watermark forward.
+
+    Args:
+        now (datetime): The time of the run, defaults to now.
+
+    Returns:
+        dict: The ids of the tasks newly reminded, by assignee id.
+    """
+    now = now or timezone.now()
+    today = timezone.localdate(now)
+    horizon = today + timedelta(days=settings.TASK_REMINDER_WINDOW_DAYS)
+
+    with transaction.atomic():
+        watermark = ReminderWatermark.objects.select_for_update().first()
+        if watermark is None:
+            watermark = ReminderWatermark(due_date=today - timedelta(days=1), modified=now)
+        scanned_until = max(watermark.due_date, today - timedelta(days=1))
+
+        open_tasks = Task.objects.filter(completed=False)
+        due_dates = dict(open_tasks.filter(task_due_date__gt=scanned_until, task_due_date__lte=horizon).values_list('task_id', 'task_due_date'))
+        if scanned_until >= today:
+            due_dates.update(open_tasks.filter(
+                modified__gt=watermark.modified, task_due_date__gte=today, task_due_date__lte=min(scanned_until, horizon),
+            ).values_list('task_id', 'task_due_date'))
+
+        reminded = defaultdict(list)
+        for task_ids in chunked(sorted(due_dates), settings.TASK_REMINDER_BATCH_SIZE):
+            assignees = Task.task_assignee.through.objects.filter(task_id__in=task_ids).values_list('task_id', 'userprofile_id')
+            reminders = [TaskReminder(task_id=task_id, user_id=user_id, due_date=due_dates[task_id]) for task_id, user_id in assignees]
+            # skip the reminders already written for the same due date, the unique constraint covers concurrent runs
+            existing = set(TaskReminder.objects.filter(task_id__in=task_ids).values_list('task_id', 'user_id', 'due_date'))
+            reminders = [reminder for reminder in reminders if (reminder.task_id, reminder.user_id, reminder.due_date) not in existing]
+            TaskReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+            for reminder in reminders:
+                reminded[reminder.user_id].append(reminder.task_id)
+
+        watermark.due_date = max(horizon, watermark.due_date)
+        watermark.modified = now
+        watermark.save()
+    return dict(reminded)
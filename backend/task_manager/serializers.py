@@ -5,6 +5,22 @@ from rest_framework_json_api import serializers
 from rest_framework import status
 from rest_framework.exceptions import APIException
 from django.contrib.auth import get_user_model
+from utils.fields import BatchedPrimaryKeyRelatedField, BatchedListSerializer
+
+class IncludedUserSerializer(serializers.ModelSerializer):
+    """
+    Serializer for the users included in the task and comment documents (?include=task_creator).
+    Only the public fields: team members cannot read the other users on /users/.
+
+    Fields:
+        username (CharField): The username of the user.
+        role (CharField): The role of the user.
+    """
+
+    class Meta:
+        model = UserProfile
+        fields = ['username', 'role']
+
 
 class TaskSerializer(serializers.ModelSerializer):
     """
@@ -19,15 +35,61 @@ class TaskSerializer(serializers.ModelSerializer):
         task_assignee (ManyToManyField): The users assigned to the task.
         priority (IntegerField): The priority level of the task.
         completed (BooleanField): Indicates if the task is completed or not.
+        comment_count (IntegerField): The number of comments of the task, only with the 'comment_summary' context.
+        last_comment (SerializerMethodField): The latest comment of the task, only with the 'comment_summary' context.
 
     """
 
     priority = serializers.ChoiceField(choices=Task.PRIORITY_CHOICES, required=False)
-    task_assignee = serializers.PrimaryKeyRelatedField(queryset=get_user_model().objects.all(), many=True, required=False)
+    task_assignee = BatchedPrimaryKeyRelatedField(queryset=get_user_model().objects.all(), many=True, required=False)
+    comment_count = serializers.IntegerField(read_only=True)
+    last_comment = serializers.SerializerMethodField()
+
+    included_serializers = {
+        'task_creator': IncludedUserSerializer,
+        'task_assignee': IncludedUserSerializer,
+    }
 
     class Meta:
         model = Task
         fields = '__all__'
+        # the assignees of all the tasks of a list (import) are checked with one query
+        list_serializer_class = BatchedListSerializer
+
+    def get_fields(self):
+        """
+        Drop the comment summary fields unless the view annotated the tasks with them
+        (see queries.annotate_comment_summary) and set the 'comment_summary' context.
+        """
+        fields = super().get_fields()
+        if not self.context.get('comment_summary'):
+            fields.pop('comment_count')
+            fields.pop('last_comment')
+        return fields
+
+    def get_last_comment(self, obj):
+        if obj.last_comment_id is None:
+            return None
+        return {
+            'comment_id': obj.last_comment_id,
+            'comment_creator': obj.last_comment_creator_id,
+            'created': serializers.DateTimeField().to_representation(obj.last_comment_created),
+            'comment': obj.last_comment_preview,
+        }
+
+
+class ArchivableTaskSerializer(TaskSerializer):
+    """
+    Serializer rendering tasks and archived tasks alike as 'Task' resources, used for output only.
+
+    Fields:
+        archived (DateTimeField): When the task was archived, null for the tasks that are not archived.
+    """
+    archived = serializers.SerializerMethodField()
+
+    def get_archived(self, obj):
+        archived = getattr(obj, 'archived', None)
+        return archived and serializers.DateTimeField().to_representation(archived)
 
 
 class TaskCommentSerializer(serializers.ModelSerializer):
@@ -42,6 +104,11 @@ class TaskCommentSerializer(serializers.ModelSerializer):
     """
     task_id = serializers.PrimaryKeyRelatedField(queryset=Task.objects.all(), required=False)
 
+    included_serializers = {
+        'task_id': TaskSerializer,
+        'comment_creator': IncludedUserSerializer,
+    }
+
     class Meta:
         model = TaskComment
         fields = '__all__'
\ No newline at end of file
@@ -0,0 +1,364 @@
+from collections import Counter
+from django.db import transaction
+from django.db.models.signals import pre_save, post_save, pre_delete, post_delete, m2m_changed
+from django.dispatch import receiver, Signal
+from django.utils import timezone
+from utils.iterables import chunked
+from utils.pagination import bump_count_version
+from .models import Task, TaskComment, ArchivedTask
+from .events import TaskEvent, broker
+from .delta_sync import record_tombstones
+from .stats import get_task_key, get_task_deltas, apply_deltas, rebuild_task_stats, TASK_FIELDS
+
+# Sent once by the set-based bulk operations (task_manager/bulk.py), which bypass the per-row
+# model signals. Arguments: task_ids (list), action (str), user (the assignee added or removed, or None),
+# user_ids (the other users who lost the tasks, e.g. their previous creators, or None).
+tasks_bulk_changed = Signal()
+
+
+def _task_payload(task, assignee_ids):
+    return {
+        'task_id': task.task_id,
+        'task_name': task.task_name,
+        'task_due_date': task.task_due_date,
+        'priority': task.priority,
+        'completed': task.completed,
+        'task_creator': task.task_creator_id,
+        'task_assignee': sorted(assignee_ids),
+    }
+
+
+def _get_assignee_ids(task_id):
+    return set(Task.task_assignee.through.objects.filter(task_id=task_id).values_list('userprofile_id', flat=True))
+
+
+def _publish_on_commit(name, audience, data):
+    """
+    Publish an event once the current transaction commits, so streams never see rolled back changes.
+    """
+    event = TaskEvent(name, audience, data)
+    transaction.on_commit(lambda: broker.publish(event))
+
+
+@receiver(post_save, sender=Task, weak=False)
+def publish_task_saved(sender, instance, created, **kwargs):
+    """
+    Signal receiver function publishing 'task.created' / 'task.updated' events.
+
+    Args:
+        sender: The model class that sent the signal (Task).
+        instance: The actual instance being saved.
+        created: A boolean indicating whether the instance was created or updated.
+        **kwargs: Additional keyword arguments.
+
+    Returns:
+        None.
+    """
+    if not broker.has_subscribers():
+        return
+    assignee_ids = set() if created else _get_assignee_ids(instance.task_id)
+    _publish_on_commit(
+        'task.created' if created else 'task.updated',
+        {instance.task_creator_id, *assignee_ids},
+        _task_payload(instance, assignee_ids),
+    )
+
+
+@receiver(pre_delete, sender=Task, weak=False)
+def remember_deleted_task_assignees(sender, instance, **kwargs):
+    """
+    Signal receiver function keeping the assignees of a task about to be deleted,
+    the assignee rows are gone by the time post_delete is sent.
+    """
+    instance._deleted_assignee_ids = _get_assignee_ids(instance.task_id)
+
+
+@receiver(post_delete, sender=Task, weak=False)
+def record_deleted_task_tombstones(sender, instance, **kwargs):
+    """
+    Signal receiver function writing the delta-sync tombstones of a deleted task,
+    one for its creator and one for each of its assignees.
+    """
+    user_ids = {instance.task_creator_id, *getattr(instance, '_deleted_assignee_ids', set())}
+    record_tombstones([(instance.task_id, user_id) for user_id in user_ids], 'deleted')
+
+
+@receiver(post_delete, sender=Task, weak=False)
+def publish_task_deleted(sender, instance, **kwargs):
+    """
+    Signal receiver function publishing 'task.deleted' events.
+    """
+    if not broker.has_subscribers():
+        return
+    assignee_ids = getattr(instance, '_deleted_assignee_ids', set())
+    _publish_on_commit('task.deleted', {instance.task_creator_id, *assignee_ids}, _task_payload(instance, assignee_ids))
+
+
+@receiver(m2m_changed, sender=Task.task_assignee.through, weak=False)
+def track_task_assignees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Signal receiver function keeping delta-sync consistent when assignees change:
+    the modification time of the changed tasks is bumped so the new assignees
+    pick them up, and removed assignees get an 'unassigned' tombstone.
+
+    Args:
+        sender: The assignee through model.
+        instance: The task (or the user when the relation is changed from the user side).
+        action: The m2m_changed action.
+        reverse: True when the relation is changed from the user side.
+        pk_set: The primary keys added or removed.
+        **kwargs: Additional keyword arguments.
+
+    Returns:
+        None.
+    """
+    if action == 'pre_clear':
+        instance._cleared_pks = set(
+            sender.objects.filter(**{'userprofile_id' if reverse else 'task_id': instance.pk})
+            .values_list('task_id' if reverse else 'userprofile_id', flat=True)
+        )
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_pks', set())
+    if not pk_set:
+        return
+
+    pairs = [(task_id, instance.pk) for task_id in pk_set] if reverse else [(instance.pk, user_id) for user_id in pk_set]
+    Task.objects.filter(task_id__in={task_id for task_id, _ in pairs}).update(modified=timezone.now())
+    if action != 'post_add':
+        record_tombstones(pairs, 'unassigned')
+
+
+@receiver(m2m_changed, sender=Task.task_assignee.through, weak=False)
+def publish_task_assignees_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Signal receiver function publishing 'task.assigned' / 'task.unassigned' events.
+    Users removed from a task receive the event too, so their clients can drop the task.
+
+    Args:
+        sender: The assignee through model.
+        instance: The task (or the user when the relation is changed from the user side).
+        action: The m2m_changed action.
+        reverse: True when the relation is changed from the user side.
+        pk_set: The primary keys added or removed.
+        **kwargs: Additional keyword arguments.
+
+    Returns:
+        None.
+    """
+    if not broker.has_subscribers():
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_pks', set())
+    if not pk_set:
+        return
+
+    name = 'task.assigned' if action == 'post_add' else 'task.unassigned'
+    if reverse:
+        changes = [(task, {instance.pk}) for task in Task.objects.filter(task_id__in=pk_set)]
+    else:
+        changes = [(instance, set(pk_set))]
+    for task, changed_user_ids in changes:
+        assignee_ids = _get_assignee_ids(task.task_id)
+        data = _task_payload(task, assignee_ids)
+        data['changed_assignees'] = sorted(changed_user_ids)
+        _publish_on_commit(name, {task.task_creator_id, *assignee_ids, *changed_user_ids}, data)
+
+
+@receiver(post_save, sender=TaskComment, weak=False)
+def publish_comment_saved(sender, instance, created, **kwargs):
+    """
+    Signal receiver function publishing 'comment.created' / 'comment.updated' events
+    to the users who can see the commented task.
+    """
+    if not broker.has_subscribers():
+        return
+    _publish_comment_event('comment.created' if created else 'comment.updated', instance)
+
+
+@receiver(post_delete, sender=TaskComment, weak=False)
+def publish_comment_deleted(sender, instance, **kwargs):
+    """
+    Signal receiver function publishing 'comment.deleted' events.
+    """
+    if not broker.has_subscribers():
+        return
+    _publish_comment_event('comment.deleted', instance)
+
+
+def _publish_comment_event(name, comment):
+    task = Task.objects.filter(task_id=comment.task_id_id).values('task_creator_id').first()
+    audience = {comment.comment_creator_id, *_get_assignee_ids(comment.task_id_id)}
+    if task is not None:
+        audience.add(task['task_creator_id'])
+    _publish_on_commit(name, audience, {
+        'comment_id': comment.comment_id,
+        'task_id': comment.task_id_id,
+        'comment_creator': comment.comment_creator_id,
+        'comment': comment.comment,
+    })
+
+
+@receiver(tasks_bulk_changed, weak=False)
+def publish_tasks_bulk_changed(sender, task_ids, action, user=None, **kwargs):
+    """
+    Signal receiver function publishing one 'tasks.bulk_changed' event per user,
+    listing the changed tasks the user can see, instead of one event per task.
+
+    Args:
+        sender: The Task model.
+        task_ids (list): The ids of the changed tasks.
+        action (str): The bulk operation applied.
+        user (User): The assignee added or removed, who is told too.
+        **kwargs: Additional keyword arguments.
+
+    Returns:
+        None.
+    """
+    if not broker.has_subscribers():
+        return
+    task_ids_by_user = {}
+    for chunk in chunked(task_ids, 500):
+        rows = list(Task.objects.filter(task_id__in=chunk).values_list('task_id', 'task_creator_id'))
+        rows += Task.task_assignee.through.objects.filter(task_id__in=chunk).values_list('task_id', 'userprofile_id')
+        if user is not None:
+            rows += [(task_id, user.pk) for task_id in chunk]
+        for task_id, user_id in rows:
+            task_ids_by_user.setdefault(user_id, set()).add(task_id)
+    for user_id, user_task_ids in task_ids_by_user.items():
+        _publish_on_commit('tasks.bulk_changed', {user_id}, {'action': action, 'task_ids': sorted(user_task_ids)})
+
+
+def _bump_count_versions(*models):
+    # once now and once on commit: a total counted by another request before the commit would be stale
+    tables = [model._meta.db_table for model in models]
+    bump_count_version(*tables)
+    transaction.on_commit(lambda: bump_count_version(*tables))
+
+
+@receiver(post_save, sender=Task, weak=False)
+@receiver(post_delete, sender=Task, weak=False)
+@receiver(m2m_changed, sender=Task.task_assignee.through, weak=False)
+@receiver(post_save, sender=TaskComment, weak=False)
+@receiver(post_delete, sender=TaskComment, weak=False)
+def invalidate_cached_counts(sender, **kwargs):
+    """
+    Signal receiver function invalidating the cached list totals reading the written table.
+    """
+    if kwargs.get('action', 'post').startswith('pre'):
+        return
+    _bump_count_versions(sender)
+
+
+@receiver(tasks_bulk_changed, weak=False)
+def invalidate_cached_counts_bulk(sender, **kwargs):
+    """
+    Signal receiver function invalidating the cached task list totals after a bulk operation,
+    which may have written the tasks, their assignees or their comments.
+    """
+    _bump_count_versions(Task, Task.task_assignee.through, TaskComment)
+
+
+@receiver(pre_save, sender=Task, weak=False)
+def remember_task_stat_key(sender, instance, **kwargs):
+    """
+    Signal receiver function keeping the stored creator and counted fields of a task about to be updated,
+    to move it between the rollup rows (task_manager/stats.py) once saved.
+    """
+    if instance.pk is not None:
+        instance._stat_previous = Task.objects.filter(pk=instance.pk).values('task_creator_id', *TASK_FIELDS).first()
+
+
+@receiver(post_save, sender=Task, weak=False)
+def update_task_stats_saved(sender, instance, created, **kwargs):
+    """
+    Signal receiver function counting a new task in the rollup, or moving an updated task
+    from the rows of its previous values to the rows of its new ones.
+    """
+    key = get_task_key(instance)
+    previous = None if created else getattr(instance, '_stat_previous', None)
+    if previous is None:
+        # a new task has no assignees yet, they are counted by m2m_changed
+        apply_deltas(get_task_deltas(key, instance.task_creator_id, set() if created else _get_assignee_ids(instance.task_id), 1))
+        return
+    previous_key = get_task_key(previous)
+    if previous_key == key and previous['task_creator_id'] == instance.task_creator_id:
+        return
+    assignee_ids = _get_assignee_ids(instance.task_id)
+    deltas = get_task_deltas(previous_key, previous['task_creator_id'], assignee_ids, -1)
+    deltas.update(get_task_deltas(key, instance.task_creator_id, assignee_ids, 1))
+    apply_deltas(deltas)
+
+
+@receiver(post_delete, sender=Task, weak=False)
+def update_task_stats_deleted(sender, instance, **kwargs):
+    """
+    Signal receiver function removing a deleted task from the rollup.
+    """
+    apply_deltas(get_task_deltas(get_task_key(instance), instance.task_creator_id, getattr(instance, '_deleted_assignee_ids', set()), -1))
+
+
+@receiver(m2m_changed, sender=Task.task_assignee.through, weak=False)
+def update_task_stats_assignees(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Signal receiver function counting the tasks of their new assignees, and uncounting them for the removed ones.
+
+    Args:
+        sender: The assignee through model.
+        instance: The task (or the user when the relation is changed from the user side).
+        action: The m2m_changed action.
+        reverse: True when the relation is changed from the user side.
+        pk_set: The primary keys added or removed.
+        **kwargs: Additional keyword arguments.
+
+    Returns:
+        None.
+    """
+    if action == 'pre_remove':
+        # remove() sends every requested key, keep the assignments that exist
+        if reverse:
+            assignments = sender.objects.filter(userprofile_id=instance.pk, task_id__in=pk_set).values_list('task_id', flat=True)
+        else:
+            assignments = sender.objects.filter(task_id=instance.pk, userprofile_id__in=pk_set).values_list('userprofile_id', flat=True)
+        instance._removed_pks = set(assignments)
+        return
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if action == 'post_remove':
+        pk_set = getattr(instance, '_removed_pks', set())
+    elif action == 'post_clear':
+        pk_set = getattr(instance, '_cleared_pks', set())
+    if not pk_set:
+        return
+
+    delta = 1 if action == 'post_add' else -1
+    deltas = Counter()
+    if reverse:
+        for task in Task.objects.filter(task_id__in=pk_set).values(*TASK_FIELDS):
+            deltas.update(get_task_deltas(get_task_key(task), None, [instance.pk], delta))
+    else:
+        deltas.update(get_task_deltas(get_task_key(instance), None, pk_set, delta))
+    apply_deltas(deltas)
+
+
+@receiver(tasks_bulk_changed, weak=False)
+def update_task_stats_bulk(sender, task_ids, action, user=None, user_ids=None, **kwargs):
+    """
+    Signal receiver function recounting the rollup rows of the users of the tasks changed by a bulk operation,
+    whose previous values are gone: their creators and assignees, live or archived, and the users who lost them.
+    """
+    if action == 'comments_deleted':
+        return
+    affected = set(user_ids or ())
+    if user is not None:
+        affected.add(user.pk)
+    for chunk in chunked(task_ids, 500):
+        affected.update(Task.objects.filter(task_id__in=chunk).values_list('task_creator_id', flat=True))
+        affected.update(Task.task_assignee.through.objects.filter(task_id__in=chunk).values_list('userprofile_id', flat=True))
+        affected.update(ArchivedTask.objects.filter(task_id__in=chunk).values_list('task_creator_id', flat=True))
+        affected.update(ArchivedTask.task_assignee.through.objects.filter(archivedtask_id__in=chunk).values_list('userprofile_id', flat=True))
+    rebuild_task_stats(affected)
@@ -0,0 +1,197 @@
+"""
+Task statistics: open, completed, overdue and per priority counts, per creator,
+per assignee and per due-date bucket.
+
+The counts are read from the TaskStat rollup, never from the tasks: a task
+change only adds or subtracts 1 to the rows of its creator and assignees
+(apply_deltas, called by the task signals), the set-based bulk operations
+recount the rows of the users they touched, and rebuild_task_stats recounts
+the whole rollup (`python manage.py rebuild_task_stats`). A read costs the
+rows of the rollup, which grow with the users and distinct due dates, not with
+the tasks.
+"""
+from collections import Counter
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import Count, F
+from django.utils import timezone
+from utils.iterables import chunked
+from .models import Task, TaskStat
+
+BATCH_SIZE = 500
+
+# the TaskStat fields describing the counted tasks, after scope and user
+TASK_FIELDS = ('task_due_date', 'priority', 'completed')
+
+PRIORITY_NAMES = {value: name.lower() for value, name in Task.PRIORITY_CHOICES}
+
+_due_date_field = Task._meta.get_field('task_due_date')
+
+
+def get_task_key(task):
+    """
+    Read the fields of a task counted by the rollup.
+
+    Args:
+        task (Task or dict): The task, or its values.
+
+    Returns:
+        tuple: The due date, priority and completion state of the task.
+    """
+    values = task if isinstance(task, dict) else {field: getattr(task, field) for field in TASK_FIELDS}
+    # a due date set as a string on an unsaved instance counts under the date it is stored as
+    return (_due_date_field.to_python(values['task_due_date']), values['priority'], values['completed'])
+
+
+def get_task_deltas(task_key, creator_id, assignee_ids, delta):
+    """
+    Build the rollup changes of adding (delta=1) or removing (delta=-1) a task.
+
+    Returns:
+        Counter: The count change of each (scope, user_id, task_due_date, priority, completed) row.
+    """
+    deltas = Counter()
+    if creator_id is not None:
+        deltas[('creator', creator_id, *task_key)] += delta
+    for user_id in assignee_ids:
+        deltas[('assignee', user_id, *task_key)] += delta
+    return deltas
+
+
+def _get_row_lookups(scope, user_id, *task_key):
+    lookups = {'scope': scope, 'user_id': user_id}
+    for field, value in zip(TASK_FIELDS, task_key):
+        if value is None:
+            lookups[f'{field}__isnull'] = True
+        else:
+            lookups[field] = value
+    return lookups
+
+
+def apply_deltas(deltas):
+    """
+    Add the count changes to the rollup, creating the missing rows.
+
+    A missing row with a negative change belongs to a user being deleted, whose rows
+    are already gone: nothing is written.
+
+    Args:
+        deltas (Counter): The count changes, see get_task_deltas.
+
+    Returns:
+        None.
+    """
+    for key, delta in deltas.items():
+        if not delta:
+            continue
+        updated = TaskStat.objects.filter(**_get_row_lookups(*key)).update(count=F('count') + delta)
+        if not updated and delta > 0:
+            scope, user_id, due_date, priority, completed = key
+            TaskStat.objects.create(scope=scope, user_id=user_id, task_due_date=due_date, priority=priority, completed=completed, count=delta)
+
+
+def _count_rows(user_ids):
+    fields = [f'task__{field}' for field in TASK_FIELDS]
+    creators = Task.objects.order_by()
+    assignees = Task.task_assignee.through.objects.order_by()
+    if user_ids is not None:
+        creators = creators.filter(task_creator_id__in=user_ids)
+        assignees = assignees.filter(userprofile_id__in=user_ids)
+    for row in creators.values('task_creator_id', *TASK_FIELDS).annotate(count=Count('task_id')):
+        yield TaskStat(scope='creator', user_id=row['task_creator_id'], count=row['count'], **{field: row[field] for field in TASK_FIELDS})
+    for row in assignees.values('userprofile_id', *fields).annotate(count=Count('task_id')):
+        yield TaskStat(scope='assignee', user_id=row['userprofile_id'], count=row['count'], **{field: row[f'task__{field}'] for field in TASK_FIELDS})
+
+
+def rebuild_task_stats(user_ids=None):
+    """
+    Recount the rollup rows of some users, or the whole rollup, from the tasks.
+
+    Args:
+        user_ids (iterable): The users whose rows are recounted, every user by default.
+
+    Returns:
+        int: The number of rollup rows written.
+    """
+    written = 0
+    with transaction.atomic():
+        if user_ids is None:
+            TaskStat.objects.all().delete()
+            batches = [None]
+        else:
+            batches = chunked(sorted(set(user_ids)), BATCH_SIZE)
+        for batch in batches:
+            if batch is not None:
+                TaskStat.objects.filter(user_id__in=batch).delete()
+            rows = TaskStat.objects.bulk_create(_count_rows(batch), batch_size=BATCH_SIZE)
+            written += len(rows)
+    return written
+
+
+def _new_counts():
+    return {'total': 0, 'open': 0, 'completed': 0, 'overdue': 0, 'by_priority': {name: 0 for name in [*PRIORITY_NAMES.values(), 'none']}}
+
+
+def _add(counts, row, today):
+    counts['total'] += row['count']
+    if row['completed']:
+        counts['completed'] += row['count']
+    else:
+        counts['open'] += row['count']
+        if row['task_due_date'] is not None and row['task_due_date'] < today:
+            counts['overdue'] += row['count']
+    counts['by_priority'][PRIORITY_NAMES.get(row['priority'], 'none')] += row['count']
+
+
+def _get_due_date_bucket(due_date, today):
+    if due_date is None:
+        return 'no_due_date'
+    if due_date < today:
+        return 'overdue'
+    if due_date == today:
+        return 'today'
+    if due_date <= today + timedelta(days=7):
+        return 'next_7_days'
+    return 'later'
+
+
+def get_task_stats(user):
+    """
+    Read the task statistics visible to a user from the rollup.
+    Admins see every creator and assignee, managers the tasks they created and
+    team members the tasks assigned to them (the rules of get_visible_tasks).
+
+    Args:
+        user (User): The requesting user.
+
+    Returns:
+        dict: The totals, the counts per creator and per assignee, and the open tasks per due-date bucket
+            (overdue, today, next_7_days, later, no_due_date).
+    """
+    rows = TaskStat.objects.exclude(count=0)
+    if user.role == 'admin':
+        totals_scope = 'creator'
+    elif user.role == 'manager':
+        rows, totals_scope = rows.filter(scope='creator', user=user), 'creator'
+    elif user.role == 'team_member':
+        rows, totals_scope = rows.filter(scope='assignee', user=user), 'assignee'
+    else:
+        rows, totals_scope = rows.none(), 'creator'
+
+    today = timezone.localdate()
+    totals = _new_counts()
+    per_user = {'creator': {}, 'assignee': {}}
+    due_dates = dict.fromkeys(('overdue', 'today', 'next_7_days', 'later', 'no_due_date'), 0)
+    for row in rows.values('scope', 'user_id', *TASK_FIELDS, 'count'):
+        _add(per_user[row['scope']].setdefault(row['user_id'], _new_counts()), row, today)
+        # the rows of the totals scope count each visible task once
+        if row['scope'] == totals_scope:
+            _add(totals, row, today)
+            if not row['completed']:
+                due_dates[_get_due_date_bucket(row['task_due_date'], today)] += row['count']
+    return {
+        'totals': totals,
+        'by_creator': [{'user_id': user_id, **counts} for user_id, counts in sorted(per_user['creator'].items())],
+        'by_assignee': [{'user_id': user_id, **counts} for user_id, counts in sorted(per_user['assignee'].items())],
+        'by_due_date': due_dates,
+    }
@@ -0,0 +1,116 @@
+"""
+Server-Sent Events stream of the task changes visible to the connected user.
+
+Served as a raw ASGI application (see task_management_system/asgi.py): an idle
+connection is a suspended coroutine plus a small bounded buffer, so one worker
+holds thousands of them without a thread per client. Opening a stream takes a
+request from the token bucket of the stream (see utils.throttling), so a client
+reconnecting in a loop is throttled like one polling the task list.
+"""
+import asyncio
+from urllib.parse import parse_qs
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from rest_framework.exceptions import Throttled
+from utils.throttling import throttle_token, get_rate_limit_headers
+from .async_views import authenticate_token
+from .events import broker
+
+TASK_EVENTS_PATH = '/events/tasks/'
+
+
+def _get_token_key(scope):
+    """
+    Read the token from the Authorization header, or from the 'token' query parameter
+    for browsers whose EventSource cannot send headers.
+    """
+    for name, value in scope.get('headers', []):
+        if name == b'authorization':
+            keyword, _, key = value.decode('latin-1').partition(' ')
+            if keyword == 'Token':
+                return key.strip()
+    return parse_qs(scope.get('query_string', b'').decode()).get('token', [None])[0]
+
+
+def _encode_headers(headers):
+    return [(name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in headers.items()]
+
+
+async def _send_error(send, status_code, message, headers=None):
+    await send({
+        'type': 'http.response.start',
+        'status': status_code,
+        'headers': [(b'content-type', b'application/vnd.api+json')] + _encode_headers(headers or {}),
+    })
+    body = f'{{"errors":[{{"detail":"{message}","status":"{status_code}"}}]}}'.encode()
+    await send({'type': 'http.response.body', 'body': body})
+
+
+async def task_event_stream(scope, receive, send):
+    """
+    ASGI application streaming task and comment events as text/event-stream.
+
+    Events: task.created, task.updated, task.deleted, task.assigned, task.unassigned,
+    comment.created, comment.updated, comment.deleted, plus 'overflow' when the
+    client was too slow and lost events (it should then reload its tasks).
+
+    Args:
+        scope (dict): The ASGI connection scope.
+        receive (callable): The ASGI receive channel.
+        send (callable): The ASGI send channel.
+
+    Returns:
+        None.
+    """
+    if scope['method'] != 'GET':
+        await _send_error(send, 405, 'Method not allowed.')
+        return
+    key = _get_token_key(scope)
+    user = await authenticate_token(key)
+    if user is None:
+        await _send_error(send, 401, 'Authentication credentials were not provided.')
+        return
+    rate_limit = await sync_to_async(throttle_token, thread_sensitive=False)(key, 'task-events.stream')
+    rate_limit_headers = get_rate_limit_headers(rate_limit) if rate_limit is not None else {}
+    if rate_limit is not None and not rate_limit['allowed']:
+        exc = Throttled(rate_limit['wait'])
+        await _send_error(send, 429, str(exc.detail), {**rate_limit_headers, 'Retry-After': '%d' % exc.wait})
+        return
+
+    subscription = broker.subscribe(user)
+    disconnected = asyncio.Event()
+
+    async def watch_disconnect():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+        disconnected.set()
+        subscription.wake()
+
+    watcher = asyncio.ensure_future(watch_disconnect())
+    try:
+        await send({
+            'type': 'http.response.start',
+            'status': 200,
+            'headers': [
+                (b'content-type', b'text/event-stream'),
+                (b'cache-control', b'no-cache'),
+                (b'x-accel-buffering', b'no'),
+            ] + _encode_headers(rate_limit_headers),
+        })
+        await send({'type': 'http.response.body', 'body': b'retry: 5000\n\n', 'more_body': True})
+        while True:
+            has_events = await subscription.wait(settings.TASK_EVENTS_HEARTBEAT_SECONDS)
+            if disconnected.is_set():
+                break
+            if not has_events:
+                # comment line keeping proxies from closing the idle connection
+                await send({'type': 'http.response.body', 'body': b': keep-alive\n\n', 'more_body': True})
+                continue
+            events, dropped = subscription.drain()
+            chunk = b''.join(event.encode() for event in events)
+            if dropped:
+                chunk = f'event: overflow\ndata: {{"dropped": {dropped}}}\n\n'.encode() + chunk
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': True})
+    finally:
+        broker.unsubscribe(subscription)
+        watcher.cancel()
@@ -1,12 +1,32 @@
 from core.models import UserProfile
-from . models import Task, TaskComment
+from . models import Task, TaskComment, TaskTombstone, ArchivedTask, ArchivedTaskComment, TaskReminder, TaskStat
 from rest_framework.test import APIClient
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.utils import timezone
 from datetime import timedelta
 import json
+import asyncio
+from asgiref.sync import async_to_sync
 from rest_framework.authtoken.models import Token
+from django.core.management import call_command, CommandError
+from django.core.cache import cache
+from django.conf import settings
+from django.db import connection
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from .events import TaskEvent, broker
+from .streams import task_event_stream
+from .reminders import schedule_reminders
+from .signals import tasks_bulk_changed
+from .stats import rebuild_task_stats
+from .queries import get_visible_tasks, filter_tasks
+from .access import TaskAccess
+from .delta_sync import SyncToken
+from . import bulk
+from jobs.models import Job
+from io import StringIO
+from unittest import mock
 
 class TaskTestCase(APITestCase):
     """
@@ -398,3 +418,1256 @@ class TaskCommentTestCase(APITestCase):
         self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.member_token.key)
         response = self.client.post(self.url, data, content_type='application/json')
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class AsyncReadTestCase(APITestCase):
+    """
+    Test suite for the async-native task and task comment read endpoints
+    """
+    def setUp(self):
+        self.client = APIClient()
+
+        manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.manager_token = Token.objects.get(user=manager_user)
+
+        member_user = UserProfile.objects.create_user(username='member_1', email = "member_1@wow.com", password='member_password', role="team_member")
+        self.member_token = Token.objects.get(user=member_user)
+
+        due_date = (timezone.now() + timedelta(days=7)).date()
+        for i in range(3):
+            task = Task.objects.create(task_name=f'test_task_{i}', task_creator=manager_user, task_due_date=due_date, priority=i + 1)
+            task.task_assignee.set([member_user])
+            TaskComment.objects.create(task_id=task, comment_creator=member_user, comment=f"test comment {i}")
+        unassigned_task = Task.objects.create(task_name='unassigned_task', task_creator=manager_user)
+        self.task_id = task.task_id
+
+        other_member_user = UserProfile.objects.create_user(username='member_2', email = "member_2@wow.com", password='member_password', role="team_member")
+        self.other_member_token = Token.objects.get(user=other_member_user)
+        unassigned_task.task_assignee.set([other_member_user])
+        self.hidden_task_id = unassigned_task.task_id
+        self.hidden_comment_id = TaskComment.objects.create(task_id=unassigned_task, comment_creator=manager_user, comment="hidden comment").comment_id
+
+    def test_async_task_list_matches_sync_list(self):
+        """
+        Success: Test the async task list renders the same document as the synchronous list
+        """
+        for token in (self.manager_token, self.member_token):
+            self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+            for query in ('', '?sort_by=priority&sort_dir=desc', '?limit=2&offset=1', '?completed=false'):
+                sync_response = self.client.get('/tasks/' + query)
+                async_response = self.client.get('/async/tasks/' + query)
+                self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+                # the pagination links only differ by the /async prefix of the endpoint
+                self.assertEqual(json.loads(async_response.content.decode().replace('/async/tasks/', '/tasks/')), sync_response.json())
+
+    def test_async_task_detail_matches_sync_detail(self):
+        """
+        Success: Test the async task detail renders the same document as the synchronous retrieve
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.manager_token.key)
+        sync_response = self.client.get(f'/tasks/{self.task_id}/')
+        async_response = self.client.get(f'/async/tasks/{self.task_id}/')
+        self.assertEqual(async_response.status_code, status.HTTP_200_OK)
+        self.assertEqual(async_response.json(), sync_response.json())
+
+        response = self.client.get('/async/tasks/1000/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_async_task_comments_match_sync_comments(self):
+        """
+        Success: Test the async task comment list and detail render the same documents as the synchronous ones
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.member_token.key)
+        self.assertEqual(self.client.get('/async/task-comments/').json(), self.client.get('/task-comments/').json())
+        comment_id = TaskComment.objects.first().comment_id
+        self.assertEqual(self.client.get(f'/async/task-comments/{comment_id}/').json(), self.client.get(f'/task-comments/{comment_id}/').json())
+
+    def test_async_details_are_scoped_like_sync_details(self):
+        """
+        Error: Test a task or comment the user cannot see is not found on the async and the synchronous details alike
+        """
+        cases = [
+            (self.member_token, f'tasks/{self.hidden_task_id}/', status.HTTP_404_NOT_FOUND),
+            (self.member_token, f'task-comments/{self.hidden_comment_id}/', status.HTTP_404_NOT_FOUND),
+            (self.other_member_token, f'tasks/{self.hidden_task_id}/', status.HTTP_200_OK),
+            # the assignees of a task read its comments
+            (self.other_member_token, f'task-comments/{self.hidden_comment_id}/', status.HTTP_200_OK),
+            (self.other_member_token, f'tasks/{self.task_id}/', status.HTTP_404_NOT_FOUND),
+        ]
+        for token, path, expected in cases:
+            self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+            self.assertEqual(self.client.get('/' + path).status_code, expected, path)
+            self.assertEqual(self.client.get('/async/' + path).status_code, expected, path)
+
+    def test_async_endpoints_require_token(self):
+        """
+        Error: Test the async endpoints reject requests without a valid token
+        """
+        response = self.client.get('/async/tasks/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials(HTTP_AUTHORIZATION='Token invalid')
+        response = self.client.get('/async/task-comments/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskEventStreamTestCase(APITestCase):
+    """
+    Test suite for the task change events and their Server-Sent Events stream
+    """
+    def setUp(self):
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.member_user = UserProfile.objects.create_user(username='member_1', email = "member_1@wow.com", password='member_password', role="team_member")
+        self.other_member_user = UserProfile.objects.create_user(username='member_2', email = "member_2@wow.com", password='member_password', role="team_member")
+        self.member_token = Token.objects.get(user=self.member_user)
+        self.loop = asyncio.new_event_loop()
+        self.subscriptions = []
+
+    def tearDown(self):
+        for subscription in self.subscriptions:
+            broker.unsubscribe(subscription)
+        self.loop.close()
+
+    def subscribe(self, user, buffer_size=10):
+        subscription = broker.subscribe(user, loop=self.loop, buffer_size=buffer_size)
+        self.subscriptions.append(subscription)
+        return subscription
+
+    def drain_names(self, subscription):
+        self.loop.run_until_complete(asyncio.sleep(0))
+        events, dropped = subscription.drain()
+        return [event.name for event in events]
+
+    def test_events_are_filtered_by_visibility(self):
+        """
+        Success: Test each user only receives the events of the tasks they can see
+        """
+        manager_subscription = self.subscribe(self.manager_user)
+        member_subscription = self.subscribe(self.member_user)
+        other_subscription = self.subscribe(self.other_member_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task = Task.objects.create(task_name='test_task_1', task_creator=self.manager_user)
+            task.task_assignee.add(self.member_user)
+            TaskComment.objects.create(task_id=task, comment_creator=self.member_user, comment="test comment")
+            task.completed = True
+            task.save()
+
+        self.assertEqual(self.drain_names(manager_subscription), ['task.created', 'task.assigned', 'comment.created', 'task.updated'])
+        self.assertEqual(self.drain_names(member_subscription), ['task.assigned', 'comment.created', 'task.updated'])
+        self.assertEqual(self.drain_names(other_subscription), [])
+
+    def test_unassigned_and_deleted_events(self):
+        """
+        Success: Test removed assignees are told about the removal and deletions reach the former audience
+        """
+        task = Task.objects.create(task_name='test_task_1', task_creator=self.manager_user)
+        task.task_assignee.add(self.member_user, self.other_member_user)
+        member_subscription = self.subscribe(self.member_user)
+        other_subscription = self.subscribe(self.other_member_user)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            task.task_assignee.remove(self.member_user)
+            task.delete()
+
+        self.assertEqual(self.drain_names(member_subscription), ['task.unassigned'])
+        self.assertEqual(self.drain_names(other_subscription), ['task.unassigned', 'task.deleted'])
+
+    def test_events_are_not_published_on_rollback(self):
+        """
+        Edge: Test no event is published when the transaction never commits
+        """
+        manager_subscription = self.subscribe(self.manager_user)
+        with self.captureOnCommitCallbacks(execute=False):
+            Task.objects.create(task_name='test_task_1', task_creator=self.manager_user)
+        self.assertEqual(self.drain_names(manager_subscription), [])
+
+    def test_buffer_is_bounded(self):
+        """
+        Edge: Test a slow subscriber keeps only the newest events and counts the dropped ones
+        """
+        subscription = self.subscribe(self.manager_user, buffer_size=2)
+        for i in range(5):
+            broker.publish(TaskEvent('task.updated', {self.manager_user.id}, {'task_id': i}))
+        self.loop.run_until_complete(asyncio.sleep(0))
+        events, dropped = subscription.drain()
+        self.assertEqual([event.data['task_id'] for event in events], [3, 4])
+        self.assertEqual(dropped, 3)
+
+    def test_event_stream(self):
+        """
+        Success: Test the ASGI stream authenticates the token and sends the visible events
+        """
+        sent = []
+
+        async def run_stream():
+            disconnect = asyncio.Event()
+
+            async def receive():
+                await disconnect.wait()
+                return {'type': 'http.disconnect'}
+
+            async def send(message):
+                sent.append(message)
+
+            scope = {'type': 'http', 'method': 'GET', 'path': '/events/tasks/', 'query_string': f'token={self.member_token.key}'.encode(), 'headers': []}
+            stream = asyncio.ensure_future(task_event_stream(scope, receive, send))
+            while not broker.has_subscribers():
+                await asyncio.sleep(0.01)
+            broker.publish(TaskEvent('task.updated', {self.member_user.id}, {'task_id': 1}))
+            broker.publish(TaskEvent('task.updated', {self.other_member_user.id}, {'task_id': 2}))
+            while len(sent) < 3:
+                await asyncio.sleep(0.01)
+            disconnect.set()
+            await stream
+
+        async_to_sync(run_stream)()
+        self.assertEqual(sent[0]['status'], 200)
+        body = b''.join(message.get('body', b'') for message in sent[1:])
+        self.assertIn(b'event: task.updated\ndata: {"task_id": 1}', body)
+        self.assertNotIn(b'"task_id": 2', body)
+        self.assertFalse(broker.has_subscribers())
+
+    def test_event_stream_requires_token(self):
+        """
+        Error: Test the stream rejects connections without a valid token
+        """
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/events/tasks/', 'query_string': b'token=invalid', 'headers': []}
+        async_to_sync(task_event_stream)(scope, None, send)
+        self.assertEqual(sent[0]['status'], 401)
+
+
+class TaskDeltaSyncTestCase(APITestCase):
+    """
+    Test suite for the incremental task sync endpoint
+    """
+    def setUp(self):
+        self.client = APIClient()
+
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.manager_token = Token.objects.get(user=self.manager_user)
+
+        self.member_user = UserProfile.objects.create_user(username='member_1', email = "member_1@wow.com", password='member_password', role="team_member")
+        self.member_token = Token.objects.get(user=self.member_user)
+
+        self.tasks = []
+        for i in range(3):
+            task = Task.objects.create(task_name=f'test_task_{i}', task_creator=self.manager_user, priority=1)
+            task.task_assignee.set([self.member_user])
+            self.tasks.append(task)
+
+    def sync(self, token, since=None, limit=None):
+        params = {}
+        if since is not None:
+            params['since'] = since
+        if limit is not None:
+            params['limit'] = limit
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + token.key)
+        response = self.client.get('/tasks/changes/', params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['data']
+
+    def test_incremental_sync_returns_only_changes(self):
+        """
+        Success: Test a full sync returns every visible task and the next sync only the modified ones
+        """
+        data = self.sync(self.member_token)
+        self.assertEqual([task['task_id'] for task in data['tasks']], [task.task_id for task in self.tasks])
+        self.assertEqual(data['deleted'], [])
+
+        data = self.sync(self.member_token, data['next_token'])
+        self.assertEqual(data['tasks'], [])
+
+        self.tasks[1].completed = True
+        self.tasks[1].save()
+        data = self.sync(self.member_token, data['next_token'])
+        self.assertEqual([task['task_id'] for task in data['tasks']], [self.tasks[1].task_id])
+        self.assertTrue(data['tasks'][0]['completed'])
+
+    def test_deleted_and_unassigned_tasks_are_reported(self):
+        """
+        Success: Test deleted tasks reach the creator and the assignees, unassigned tasks reach the removed assignee
+        """
+        manager_token = self.sync(self.manager_token)['next_token']
+        member_token = self.sync(self.member_token)['next_token']
+
+        deleted_id = self.tasks[0].task_id
+        self.tasks[0].delete()
+        self.tasks[1].task_assignee.remove(self.member_user)
+
+        member_data = self.sync(self.member_token, member_token)
+        self.assertEqual(member_data['deleted'], [deleted_id, self.tasks[1].task_id])
+        self.assertEqual(member_data['tasks'], [])
+
+        data = self.sync(self.manager_token, manager_token)
+        self.assertEqual(data['deleted'], [deleted_id])
+        # the manager still sees the unassigned task, it comes back as modified
+        self.assertEqual([task['task_id'] for task in data['tasks']], [self.tasks[1].task_id])
+
+        data = self.sync(self.member_token, member_data['next_token'])
+        self.assertEqual(data['deleted'], [])
+
+    def test_task_deleted_during_sync_is_reported_next_time(self):
+        """
+        Edge: Test a task deleted right after a full sync read it is reported as deleted by the next sync
+        """
+        deleted_id = self.tasks[0].task_id
+
+        def create_token(*args):
+            Task.objects.filter(task_id=deleted_id).delete()
+            return SyncToken(*args)
+
+        with mock.patch('task_manager.delta_sync.SyncToken', side_effect=create_token):
+            data = self.sync(self.member_token)
+        self.assertIn(deleted_id, [task['task_id'] for task in data['tasks']])
+
+        data = self.sync(self.member_token, data['next_token'])
+        self.assertEqual(data['deleted'], [deleted_id])
+
+    def test_newly_assigned_task_is_returned(self):
+        """
+        Edge: Test a task assigned to the user after the last sync is returned even if its fields did not change
+        """
+        other_task = Task.objects.create(task_name='other_task', task_creator=self.manager_user)
+        token = self.sync(self.member_token)['next_token']
+        other_task.task_assignee.add(self.member_user)
+        data = self.sync(self.member_token, token)
+        self.assertEqual([task['task_id'] for task in data['tasks']], [other_task.task_id])
+
+    def test_sync_pages_with_has_more(self):
+        """
+        Edge: Test a limited sync pages through the changes with has_more and next_token
+        """
+        data = self.sync(self.member_token, limit=2)
+        self.assertTrue(data['has_more'])
+        self.assertEqual(len(data['tasks']), 2)
+        data = self.sync(self.member_token, data['next_token'], limit=2)
+        self.assertFalse(data['has_more'])
+        self.assertEqual([task['task_id'] for task in data['tasks']], [self.tasks[2].task_id])
+
+    def test_invalid_and_expired_tokens(self):
+        """
+        Error: Test a malformed token is rejected with 400 and a token older than the retention with 410
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.member_token.key)
+        response = self.client.get('/tasks/changes/', {'since': 'not-a-token'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/tasks/changes/', {'limit': 'ten'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.get('/tasks/changes/', {'since': '0.0.0.0'})
+        self.assertEqual(response.status_code, status.HTTP_410_GONE)
+
+
+class TaskArchiveTestCase(APITestCase):
+    """
+    Test suite for the archival of completed tasks
+    """
+    def setUp(self):
+        self.client = APIClient()
+
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.manager_token = Token.objects.get(user=self.manager_user)
+        self.member_user = UserProfile.objects.create_user(username='member_1', email = "member_1@wow.com", password='member_password', role="team_member")
+
+        self.old_task = Task.objects.create(task_name='old_task', task_creator=self.manager_user, completed=True)
+        self.old_task.task_assignee.set([self.member_user])
+        self.comment = TaskComment.objects.create(task_id=self.old_task, comment_creator=self.member_user, comment="old comment")
+        Task.objects.create(task_name='old_open_task', task_creator=self.manager_user)
+        Task.objects.filter(task_id=self.old_task.task_id).update(modified=timezone.now() - timedelta(days=400))
+        Task.objects.filter(task_name='old_open_task').update(modified=timezone.now() - timedelta(days=400))
+        self.recent_task = Task.objects.create(task_name='recent_task', task_creator=self.manager_user, completed=True)
+
+    def test_archive_moves_old_completed_tasks(self):
+        """
+        Success: Test only the old completed tasks are moved, with their comments and assignees, without tombstones
+        """
+        call_command('archive_tasks', '--batch-size', '1', stdout=open('/dev/null', 'w'))
+        self.assertEqual(list(Task.objects.values_list('task_name', flat=True)), ['old_open_task', 'recent_task'])
+        self.assertFalse(TaskComment.objects.exists())
+        archived = ArchivedTask.objects.get()
+        self.assertEqual(archived.task_id, self.old_task.task_id)
+        self.assertEqual(list(archived.task_assignee.all()), [self.member_user])
+        self.assertEqual(ArchivedTaskComment.objects.get().comment_id, self.comment.comment_id)
+        self.assertFalse(TaskTombstone.objects.exists())
+
+    def test_archive_tasks_with_reminders(self):
+        """
+        Edge: Test the reminders of an archived task are dropped with it, the other reminders are kept
+        """
+        TaskReminder.objects.create(task=self.old_task, user=self.member_user, due_date=timezone.localdate())
+        kept = TaskReminder.objects.create(task=self.recent_task, user=self.member_user, due_date=timezone.localdate())
+        call_command('archive_tasks', stdout=open('/dev/null', 'w'))
+        self.assertEqual(ArchivedTask.objects.get().task_id, self.old_task.task_id)
+        self.assertEqual(list(TaskReminder.objects.all()), [kept])
+
+    def test_list_and_retrieve_include_archived(self):
+        """
+        Success: Test archived tasks are only listed and retrieved with include_archived=true
+        """
+        call_command('archive_tasks', stdout=open('/dev/null', 'w'))
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.manager_token.key)
+
+        response = self.client.get('/tasks/')
+        self.assertEqual(len(response.json()['data']), 2)
+        response = self.client.get('/tasks/', {'include_archived': 'true'})
+        data = response.json()['data']
+        self.assertEqual([task['id'] for task in data][-1], str(self.old_task.task_id))
+        self.assertIsNone(data[0]['attributes']['archived'])
+        self.assertIsNotNone(data[-1]['attributes']['archived'])
+        response = self.client.get('/tasks/', {'include_archived': 'true', 'limit': 1, 'offset': 2})
+        self.assertEqual([task['id'] for task in response.json()['data']], [str(self.old_task.task_id)])
+
+        response = self.client.get(f'/tasks/{self.old_task.task_id}/')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.get(f'/tasks/{self.old_task.task_id}/', {'include_archived': 'true'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['attributes']['task_name'], 'old_task')
+
+    def test_restore_brings_tasks_back(self):
+        """
+        Success: Test restored tasks come back under their id with their comments and assignees
+        """
+        call_command('archive_tasks', stdout=open('/dev/null', 'w'))
+        call_command('restore_tasks', str(self.old_task.task_id), stdout=open('/dev/null', 'w'))
+        self.assertFalse(ArchivedTask.objects.exists())
+        self.assertFalse(ArchivedTaskComment.objects.exists())
+        task = Task.objects.get(task_id=self.old_task.task_id)
+        self.assertEqual(list(task.task_assignee.all()), [self.member_user])
+        self.assertEqual(TaskComment.objects.get().task_id, task)
+        # a restored task counts as modified, it is not archived again right away
+        self.assertGreater(task.modified, timezone.now() - timedelta(days=1))
+
+    def test_restore_requires_ids_or_all(self):
+        """
+        Error: Test the restore command refuses to run without task ids or --all
+        """
+        with self.assertRaises(CommandError):
+            call_command('restore_tasks')
+
+
+class TaskBulkJobTestCase(APITestCase):
+    """
+    Test suite for the task endpoints running in background jobs
+    """
+    def setUp(self):
+        self.client = APIClient()
+
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.manager_token = Token.objects.get(user=self.manager_user)
+        self.member_user = UserProfile.objects.create_user(username='member_1', email = "member_1@wow.com", password='member_password', role="team_member")
+        self.member_token = Token.objects.get(user=self.member_user)
+        other_manager = UserProfile.objects.create_user(username='manager_2', email = "manager_2@wow.com", password='manager_password', role="manager")
+
+        self.task_ids = [Task.objects.create(task_name=f'test_task_{i}', task_creator=self.manager_user).task_id for i in range(3)]
+        self.other_task_id = Task.objects.create(task_name='other_task', task_creator=other_manager).task_id
+
+    def post(self, url, data, token=None):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + (token or self.manager_token).key)
+        return self.client.post(url, json.dumps(data), content_type='application/json')
+
+    def run_job(self, response):
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job_id = response.json()['data']['job']['job_id']
+        self.assertEqual(response['Location'], f'/jobs/{job_id}/')
+        call_command('run_jobs', '--once', '--workers', '1', stdout=StringIO())
+        response = self.client.get(f'/jobs/{job_id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json()['data']['attributes']
+
+    def test_bulk_delete(self):
+        """
+        Success: Test bulk delete answers 202 and the job deletes only the tasks created by the user
+        """
+        job = self.run_job(self.post('/tasks/bulk-delete/', {'task_ids': self.task_ids[:2] + [self.other_task_id]}))
+        self.assertEqual(job['status'], Job.SUCCEEDED)
+        self.assertEqual(job['result'], {'deleted_task_ids': self.task_ids[:2], 'skipped_task_ids': [self.other_task_id]})
+        self.assertEqual(list(Task.objects.values_list('task_id', flat=True)), [self.task_ids[2], self.other_task_id])
+
+    def test_bulk_assign(self):
+        """
+        Success: Test bulk assign assigns the users to the tasks visible to the user
+        """
+        job = self.run_job(self.post('/tasks/bulk-assign/', {'task_ids': self.task_ids + [self.other_task_id], 'task_assignee': [self.member_user.id]}))
+        self.assertEqual(job['result']['assigned_task_ids'], self.task_ids)
+        self.assertEqual(sorted(self.member_user.task_assignees.values_list('task_id', flat=True)), self.task_ids)
+
+    def test_export_and_import(self):
+        """
+        Success: Test the export job returns the visible tasks and the import job creates tasks
+        """
+        job = self.run_job(self.post('/tasks/export/?sort_by=id&sort_dir=desc', {}))
+        self.assertEqual([task['task_id'] for task in job['result']['tasks']], self.task_ids[::-1])
+
+        job = self.run_job(self.post('/tasks/import/', {'tasks': [{'task_name': 'imported_1'}, {'task_name': 'imported_2', 'priority': 2}]}))
+        self.assertEqual(job['status'], Job.SUCCEEDED)
+        self.assertEqual(Task.objects.filter(task_name__startswith='imported', task_creator=self.manager_user).count(), 2)
+
+        response = self.post('/tasks/import/', {'tasks': [{'task_name': 'imported_3'}, {'priority': 2}]})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Task.objects.filter(task_name='imported_3').exists())
+
+    def test_bulk_endpoints_validate_before_queuing(self):
+        """
+        Error: Test invalid payloads and unauthorized roles are rejected without queuing a job
+        """
+        self.assertEqual(self.post('/tasks/bulk-delete/', {'task_ids': []}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post('/tasks/bulk-delete/', {'task_ids': ['1']}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post('/tasks/bulk-assign/', {'task_ids': [1], 'task_assignee': [1000]}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post('/tasks/bulk-delete/', {'task_ids': [1]}, self.member_token).status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(self.post('/tasks/import/', {'tasks': [{'task_name': 'valid'}, {'task_assignee': [1000]}]}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Job.objects.exists())
+
+
+class TaskReminderTestCase(APITestCase):
+    """
+    Test suite for the due-date reminder scheduler
+    """
+    def setUp(self):
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.member_1 = UserProfile.objects.create_user(username='member_1', email = "member_1@wow.com", password='member_password', role="team_member")
+        self.member_2 = UserProfile.objects.create_user(username='member_2', email = "member_2@wow.com", password='member_password', role="team_member")
+
+        self.tomorrow = timezone.localdate() + timedelta(days=1)
+        self.due_task = Task.objects.create(task_name='due_task', task_creator=self.manager_user, task_due_date=self.tomorrow)
+        self.due_task.task_assignee.set([self.member_1, self.member_2])
+        for name, due_date, completed in (('done_task', self.tomorrow, True), ('later_task', self.tomorrow + timedelta(days=10), False)):
+            task = Task.objects.create(task_name=name, task_creator=self.manager_user, task_due_date=due_date, completed=completed)
+            task.task_assignee.set([self.member_1])
+
+    def test_reminders_per_assignee(self):
+        """
+        Success: Test the open tasks coming due get one reminder per assignee, once
+        """
+        reminded = schedule_reminders()
+        self.assertEqual(reminded, {self.member_1.id: [self.due_task.task_id], self.member_2.id: [self.due_task.task_id]})
+        self.assertEqual(TaskReminder.objects.filter(due_date=self.tomorrow).count(), 2)
+        self.assertEqual(schedule_reminders(), {})
+
+    def test_watermark_catches_new_and_moved_tasks(self):
+        """
+        Success: Test the next runs pick up a task created or assigned inside the window already scanned, and the days entering the window
+        """
+        call_command('schedule_reminders', '--once', stdout=StringIO())
+        new_task = Task.objects.create(task_name='new_task', task_creator=self.manager_user, task_due_date=self.tomorrow)
+        new_task.task_assignee.set([self.member_2])
+        self.assertEqual(schedule_reminders(), {self.member_2.id: [new_task.task_id]})
+
+        later_task = Task.objects.get(task_name='later_task')
+        self.assertEqual(schedule_reminders(timezone.now() + timedelta(days=10)), {self.member_1.id: [later_task.task_id]})
+
+    def test_open_tasks_due_query_uses_partial_index(self):
+        """
+        Edge: Test the due date scan reads the open_tasks partial index instead of the table
+        """
+        plan = Task.objects.filter(completed=False, task_due_date__gt=self.tomorrow, task_due_date__lte=self.tomorrow).values('task_id').explain()
+        self.assertIn('open_tasks', plan)
+
+
+class TaskAdminTestCase(APITestCase):
+    """
+    Test suite for the task and task comment admin changelists
+    """
+    def setUp(self):
+        self.admin_user = UserProfile.objects.create_superuser(username='admin_1', email = "admin@wow.com", password='admin_password', role="admin")
+        self.client.force_login(self.admin_user)
+
+    def create_tasks(self, count):
+        for i in range(count):
+            task = Task.objects.create(task_name=f'test_task_{i}', task_creator=self.admin_user)
+            task.task_assignee.set([self.admin_user])
+            TaskComment.objects.create(task_id=task, comment_creator=self.admin_user, comment=f"test comment {i}")
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return len(queries)
+
+    def test_changelist_queries_do_not_grow_with_rows(self):
+        """
+        Success: Test the changelists run the same number of queries for 2 and 10 rows
+        """
+        self.create_tasks(2)
+        few = [self.count_queries(url) for url in ('/admin/task_manager/task/', '/admin/task_manager/taskcomment/', '/admin/core/userprofile/')]
+        self.create_tasks(8)
+        many = [self.count_queries(url) for url in ('/admin/task_manager/task/', '/admin/task_manager/taskcomment/', '/admin/core/userprofile/')]
+        self.assertEqual(few, many)
+
+    def test_changelist_search(self):
+        """
+        Success: Test numbers are searched by id and text by indexed prefix
+        """
+        self.create_tasks(12)
+        task = Task.objects.get(task_name='test_task_11')
+        response = self.client.get('/admin/task_manager/task/', {'q': str(task.task_id)})
+        self.assertEqual(list(response.context['cl'].result_list), [task])
+        response = self.client.get('/admin/task_manager/task/', {'q': 'test_task_1'})
+        self.assertEqual(response.context['cl'].result_count, 3)
+        response = self.client.get('/admin/task_manager/taskcomment/', {'q': str(task.task_id)})
+        self.assertEqual([comment.task_id for comment in response.context['cl'].result_list], [task])
+
+
+class TaskBulkAdminActionTestCase(APITestCase):
+    """
+    Test suite for the set-based task admin actions
+    """
+    def setUp(self):
+        self.admin_user = UserProfile.objects.create_superuser(username='admin_1', email = "admin@wow.com", password='admin_password', role="admin")
+        self.member_user = UserProfile.objects.create_user(username='member_1', email = "member_1@wow.com", password='member_password', role="team_member")
+        # the admin posts forms, not JSON:API documents
+        self.client = Client()
+        self.client.force_login(self.admin_user)
+        self.due_date = timezone.localdate()
+        for i in range(20):
+            task = Task.objects.create(task_name=f'test_task_{i}', task_creator=self.admin_user, task_due_date=self.due_date, priority=1)
+            TaskComment.objects.create(task_id=task, comment_creator=self.admin_user, comment=f"test comment {i}")
+        self.sent = []
+        tasks_bulk_changed.connect(self.record_signal)
+
+    def tearDown(self):
+        tasks_bulk_changed.disconnect(self.record_signal)
+
+    def record_signal(self, sender, task_ids, action, **kwargs):
+        self.sent.append((action, len(task_ids)))
+
+    def run_action(self, action, url='/admin/task_manager/task/', **values):
+        # the admin needs one checked row even when the whole selection is applied
+        data = {'action': action, 'select_across': 1, 'index': 0, '_selected_action': [1]}
+        data.update(values)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, status.HTTP_302_FOUND)
+        return len(queries)
+
+    def test_update_actions_apply_to_all_tasks(self):
+        """
+        Success: Test the update actions change every task in a constant number of queries and send one signal each
+        """
+        queries = self.run_action('mark_completed')
+        self.assertEqual(Task.objects.filter(completed=True).count(), 20)
+        self.run_action('set_priority', priority=3)
+        self.run_action('shift_due_dates', days=2)
+        self.assertEqual(set(Task.objects.values_list('priority', 'task_due_date')), {(3, self.due_date + timedelta(days=2))})
+        self.assertEqual(self.sent, [('completed', 20), ('priority_changed', 20), ('due_dates_shifted', 20)])
+
+        Task.objects.bulk_create([Task(task_name=f'more_task_{i}', task_creator=self.admin_user) for i in range(30)])
+        self.assertEqual(self.run_action('mark_incomplete'), queries)
+
+    def test_assignee_and_creator_actions(self):
+        """
+        Success: Test adding and removing an assignee and reassigning the creator, with delta-sync tombstones
+        """
+        self.run_action('add_assignee', user_id=self.member_user.id)
+        self.assertEqual(self.member_user.task_assignees.count(), 20)
+        self.run_action('add_assignee', user_id=self.member_user.id)
+        self.assertEqual(self.sent[-1], ('assigned', 0))
+
+        self.run_action('remove_assignee', user_id=self.member_user.id)
+        self.assertEqual(self.member_user.task_assignees.count(), 0)
+        self.assertEqual(TaskTombstone.objects.filter(user=self.member_user, reason='unassigned').count(), 20)
+
+        self.run_action('set_creator', user_id=self.member_user.id)
+        self.assertEqual(Task.objects.filter(task_creator=self.member_user).count(), 20)
+        self.assertEqual(TaskTombstone.objects.filter(user=self.admin_user).count(), 20)
+
+    def test_comment_actions(self):
+        """
+        Success: Test purging the comments of tasks and deleting selected comments
+        """
+        task = Task.objects.first()
+        self.client.post('/admin/task_manager/task/', {'action': 'purge_comments', 'index': 0, '_selected_action': [task.task_id]})
+        self.assertEqual(TaskComment.objects.count(), 19)
+        self.run_action('delete_comments', url='/admin/task_manager/taskcomment/')
+        self.assertFalse(TaskComment.objects.exists())
+        self.assertEqual(self.sent, [('comments_deleted', 1), ('comments_deleted', 19)])
+
+    def test_actions_require_their_value(self):
+        """
+        Error: Test actions needing a value or an existing user change nothing without it
+        """
+        self.run_action('set_priority')
+        self.run_action('add_assignee', user_id=1000)
+        self.assertEqual(set(Task.objects.values_list('priority', flat=True)), {1})
+        self.assertEqual(self.sent, [])
+
+
+class TaskListCountTestCase(APITestCase):
+    """
+    Test suite for the count modes and the cached totals of the task list
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=self.manager_user).key)
+        for i in range(5):
+            Task.objects.create(task_name=f'test_task_{i}', task_creator=self.manager_user)
+
+    def count_queries(self, query):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/tasks/' + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        # the database cache counts its own rows when it culls them
+        return response.json(), [q['sql'] for q in queries.captured_queries if 'COUNT(' in q['sql'] and settings.CACHES['default']['LOCATION'] not in q['sql']]
+
+    def test_exact_count_is_cached_until_a_write(self):
+        """
+        Success: Test the exact total and links, the total is counted once then invalidated by a new task
+        """
+        document, counts = self.count_queries('?limit=2&offset=2')
+        self.assertEqual(document['meta']['pagination'], {'count': 5, 'count_mode': 'exact', 'limit': 2, 'offset': 2})
+        self.assertEqual(document['links']['prev'], 'http://testserver/tasks/?limit=2')
+        self.assertEqual(document['links']['next'], 'http://testserver/tasks/?limit=2&offset=4')
+        self.assertEqual(document['links']['last'], 'http://testserver/tasks/?limit=2&offset=4')
+        self.assertEqual(len(counts), 1)
+
+        document, counts = self.count_queries('?limit=2')
+        self.assertEqual(document['meta']['pagination']['count'], 5)
+        self.assertEqual(counts, [])
+
+        Task.objects.create(task_name='new_task', task_creator=self.manager_user)
+        document, counts = self.count_queries('?limit=2')
+        self.assertEqual(document['meta']['pagination']['count'], 6)
+        self.assertEqual(len(counts), 1)
+
+    def test_count_false_skips_the_total(self):
+        """
+        Success: Test count=false runs no COUNT(*) and still links the next page
+        """
+        document, counts = self.count_queries('?limit=2&count=false')
+        self.assertEqual(counts, [])
+        self.assertIsNone(document['meta']['pagination']['count'])
+        self.assertIsNone(document['links']['last'])
+        self.assertEqual(document['links']['next'], 'http://testserver/tasks/?count=false&limit=2&offset=2')
+
+        document, counts = self.count_queries('?limit=2&offset=4&count=false')
+        self.assertEqual(len(document['data']), 1)
+        self.assertIsNone(document['links']['next'])
+
+    def test_count_estimate(self):
+        """
+        Edge: Test count=estimate never runs a COUNT(*), falling back to a cached exact total
+        """
+        document, counts = self.count_queries('?count=estimate&completed=false')
+        self.assertEqual(counts, [])
+        self.assertIsNone(document['meta']['pagination']['count'])
+        self.assertEqual(document['meta']['pagination']['count_mode'], 'estimate')
+
+        self.count_queries('?completed=false')
+        document, counts = self.count_queries('?count=estimate&completed=false')
+        self.assertEqual(counts, [])
+        self.assertEqual(document['meta']['pagination']['count'], 5)
+
+
+class TaskStatsTestCase(APITestCase):
+    """
+    Test suite for the task statistics rollup and endpoint
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.url = '/tasks/stats/'
+        self.admin_user = UserProfile.objects.create_user(username='admin_1', email = "admin@wow.com", password='admin_password', role="admin")
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.member_user = UserProfile.objects.create_user(username='member_1', email = "member@wow.com", password='member_password', role="team_member")
+        self.today = timezone.localdate()
+        self.tasks = [
+            Task.objects.create(task_name='test_task_0', task_creator=self.manager_user, task_due_date=self.today, priority=1),
+            Task.objects.create(task_name='test_task_1', task_creator=self.manager_user, task_due_date=self.today + timedelta(days=30), priority=2),
+            Task.objects.create(task_name='test_task_2', task_creator=self.admin_user, priority=3, completed=True),
+        ]
+        self.tasks[0].task_assignee.set([self.member_user])
+        self.tasks[2].task_assignee.set([self.member_user, self.manager_user])
+        # overdue: due dates in the past cannot be entered, they are reached with time
+        Task.objects.filter(pk=self.tasks[1].pk).update(task_due_date=self.today - timedelta(days=1))
+        rebuild_task_stats()
+
+    def get_stats(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=user)}')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)['data']['stats']
+
+    def get_rollup(self):
+        rows = TaskStat.objects.exclude(count=0).values_list('scope', 'user_id', 'task_due_date', 'priority', 'completed', 'count')
+        return sorted(rows, key=str)
+
+    def test_stats_by_role(self):
+        """
+        Success: Test admins see every creator and assignee, managers their tasks, team members their assignments
+        """
+        stats = self.get_stats(self.admin_user)
+        self.assertEqual({key: stats['totals'][key] for key in ('total', 'open', 'completed', 'overdue')}, {'total': 3, 'open': 2, 'completed': 1, 'overdue': 1})
+        self.assertEqual(stats['totals']['by_priority'], {'high': 1, 'medium': 1, 'low': 1, 'none': 0})
+        self.assertEqual([row['user_id'] for row in stats['by_creator']], [self.admin_user.id, self.manager_user.id])
+        self.assertEqual({row['user_id']: row['total'] for row in stats['by_assignee']}, {self.manager_user.id: 1, self.member_user.id: 2})
+        self.assertEqual(stats['by_due_date'], {'overdue': 1, 'today': 1, 'next_7_days': 0, 'later': 0, 'no_due_date': 0})
+
+        stats = self.get_stats(self.manager_user)
+        self.assertEqual(stats['totals']['total'], 2)
+        self.assertEqual(stats['by_assignee'], [])
+
+        stats = self.get_stats(self.member_user)
+        self.assertEqual((stats['totals']['open'], stats['totals']['completed']), (1, 1))
+        self.assertEqual([row['user_id'] for row in stats['by_assignee']], [self.member_user.id])
+
+    def test_signals_keep_the_rollup_exact(self):
+        """
+        Success: Test saves, deletes, assignee changes and bulk operations leave the rollup equal to a full recount
+        """
+        task = self.tasks[0]
+        task.completed = True
+        task.priority = 2
+        task.save()
+        task.task_assignee.add(self.manager_user)
+        task.task_assignee.remove(self.member_user, self.admin_user)
+        self.manager_user.task_assignees.add(self.tasks[1])
+        self.tasks[2].task_assignee.clear()
+        Task.objects.create(task_name='test_task_3', task_creator=self.admin_user, task_due_date=str(self.today))
+        self.tasks[1].delete()
+        bulk.set_creator(Task.objects.filter(task_creator=self.admin_user), self.manager_user)
+        bulk.set_completed(Task.objects.all(), False)
+        bulk.remove_assignee(Task.objects.all(), self.manager_user)
+
+        rollup = self.get_rollup()
+        rebuild_task_stats()
+        self.assertEqual(rollup, self.get_rollup())
+
+    def test_stats_read_the_rollup_only(self):
+        """
+        Edge: Test the statistics cost the same queries whatever the number of tasks, and the command reconciles the rollup
+        """
+        self.get_stats(self.admin_user)
+        with CaptureQueriesContext(connection) as few_tasks:
+            self.get_stats(self.admin_user)
+        for i in range(30):
+            Task.objects.create(task_name=f'more_task_{i}', task_creator=self.manager_user, task_due_date=self.today, priority=1)
+        with CaptureQueriesContext(connection) as many_tasks:
+            self.get_stats(self.admin_user)
+        self.assertEqual(len(few_tasks), len(many_tasks))
+        self.assertFalse(any('"task_manager_task"' in query['sql'] for query in many_tasks.captured_queries))
+
+        TaskStat.objects.filter(scope='creator').update(count=0)
+        out = StringIO()
+        call_command('rebuild_task_stats', stdout=out)
+        self.assertIn('3 count(s) corrected', out.getvalue())
+        self.assertEqual(self.get_stats(self.admin_user)['totals']['total'], 33)
+
+
+class TaskWorkloadTestCase(APITestCase):
+    """
+    Test suite for the assignee workload endpoint
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = '/tasks/workload/'
+        self.admin_user = UserProfile.objects.create_user(username='admin_1', email = "admin@wow.com", password='admin_password', role="admin")
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.member_users = [
+            UserProfile.objects.create_user(username=f'member_{i}', email = f"member_{i}@wow.com", password='member_password', role="team_member")
+            for i in range(2)
+        ]
+        today = timezone.localdate()
+        for i, (creator, priority) in enumerate([(self.manager_user, 1), (self.manager_user, 2), (self.admin_user, 1)]):
+            task = Task.objects.create(task_name=f'test_task_{i}', task_creator=creator, task_due_date=today + timedelta(days=14), priority=priority)
+            task.task_assignee.set(self.member_users[:1] if i else self.member_users)
+        completed = Task.objects.create(task_name='test_task_done', task_creator=self.manager_user, completed=True)
+        completed.task_assignee.set(self.member_users)
+        overdue = Task.objects.filter(task_name='test_task_1')
+        overdue.update(task_due_date=today - timedelta(days=1))
+        self.today = today
+
+    def get_workload(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=user)}')
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return json.loads(response.content)['data']['workload']
+
+    def test_workload_in_one_query(self):
+        """
+        Success: Test the open tasks of every assignee are counted by one aggregate query, then cached
+        """
+        with CaptureQueriesContext(connection) as queries:
+            workload = self.get_workload(self.admin_user)
+        self.assertEqual(sum('task_manager_task_task_assignee' in query['sql'] for query in queries.captured_queries), 1)
+        self.assertEqual([row['user_id'] for row in workload], [member.id for member in self.member_users])
+        first = workload[0]
+        self.assertEqual((first['open'], first['overdue']), (3, 1))
+        self.assertEqual(first['by_priority'], {'high': 2, 'medium': 1, 'low': 0})
+        self.assertEqual(first['earliest_due_date'], str(self.today - timedelta(days=1)))
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.get_workload(self.admin_user), workload)
+        self.assertFalse(any('task_manager_task_task_assignee' in query['sql'] for query in queries.captured_queries))
+
+    def test_workload_is_scoped(self):
+        """
+        Success: Test managers count the tasks they created only, team members see their own load only
+        """
+        workload = self.get_workload(self.manager_user)
+        self.assertEqual({row['user_id']: row['open'] for row in workload}, {self.member_users[0].id: 2, self.member_users[1].id: 1})
+        workload = self.get_workload(self.member_users[1])
+        self.assertEqual([(row['user_id'], row['open']) for row in workload], [(self.member_users[1].id, 1)])
+
+    def test_workload_unauthenticated(self):
+        """
+        Error: Test the workload requires authentication
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TaskDueFilterTestCase(APITestCase):
+    """
+    Test suite for the due date range, overdue and due soon filters of the task list
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=self.manager_user).key)
+        today = timezone.localdate()
+        for name, days, completed in [('overdue', -2, False), ('done_late', -1, True), ('today', 0, False), ('soon', 3, False), ('later', 10, False)]:
+            Task.objects.create(task_name=name, task_creator=self.manager_user, completed=completed)
+            # set past the due date validator of the model
+            Task.objects.filter(task_name=name).update(task_due_date=today + timedelta(days=days))
+        Task.objects.create(task_name='no_due_date', task_creator=self.manager_user)
+        self.today = today
+
+    def get_names(self, query):
+        response = self.client.get('/tasks/' + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        ids = [int(task['id']) for task in response.json()['data']]
+        return sorted(Task.objects.filter(task_id__in=ids).values_list('task_name', flat=True))
+
+    def test_due_date_filters(self):
+        """
+        Success: Test the overdue and due soon lists only hold open tasks, the date ranges exclude their bounds
+        """
+        self.assertEqual(self.get_names('?overdue=true'), ['overdue'])
+        self.assertEqual(self.get_names('?due_within_days=3'), ['soon', 'today'])
+        self.assertEqual(self.get_names('?due_within_days=0'), ['today'])
+        self.assertEqual(self.get_names(f'?due_after={self.today - timedelta(days=2)}&due_before={self.today + timedelta(days=3)}'), ['done_late', 'today'])
+
+    def test_invalid_due_date_filters(self):
+        """
+        Error: Test a malformed date or a negative or non-numeric number of days is rejected
+        """
+        for query in ('?due_before=tomorrow', '?due_after=2023-13-01', '?due_within_days=-1', '?due_within_days=soon'):
+            response = self.client.get('/tasks/' + query)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, query)
+
+    def test_overdue_query_uses_partial_index(self):
+        """
+        Edge: Test the overdue and due soon lists of admins and managers read the open tasks partial indexes
+        """
+        admin_user = UserProfile.objects.create_user(username='admin_1', email = "admin@wow.com", password='admin_password', role="admin")
+        for user, index in ((admin_user, 'open_tasks'), (self.manager_user, 'open_tasks_by_creator')):
+            for query in ({'overdue': 'true'}, {'due_within_days': '7'}):
+                # the queryset of the list endpoint
+                plan = filter_tasks(get_visible_tasks(user, Task.objects.all()), query).explain()
+                self.assertIn(f'USING INDEX {index} ', plan)
+
+
+class TaskIncludeTestCase(APITestCase):
+    """
+    Test suite for the compound documents (?include=) of the task and comment endpoints
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.member_users = [
+            UserProfile.objects.create_user(username=f'member_{i}', email = f"member_{i}@wow.com", password='member_password', role="team_member")
+            for i in range(2)
+        ]
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=self.manager_user).key)
+        for i in range(4):
+            task = Task.objects.create(task_name=f'test_task_{i}', task_creator=self.manager_user)
+            task.task_assignee.set(self.member_users)
+            TaskComment.objects.create(task_id=task, comment_creator=self.manager_user, comment=f'comment_{i}')
+
+    def get_document(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.json(), len(queries.captured_queries)
+
+    def test_include_task_users(self):
+        """
+        Success: Test the creator and assignees are included once each, with one query per relation
+        """
+        _, plain_queries = self.get_document('/tasks/?count=false')
+        document, queries = self.get_document('/tasks/?count=false&include=task_creator,task_assignee')
+        self.assertEqual(len(document['data']), 4)
+        included = {(resource['type'], resource['id']): resource['attributes'] for resource in document['included']}
+        self.assertEqual(included, {
+            ('UserProfile', str(user.id)): {'username': user.username, 'role': user.role}
+            for user in [self.manager_user, *self.member_users]
+        })
+        # the assignees are prefetched for the relationships anyway, the creators cost one more query
+        self.assertEqual(queries, plain_queries + 1)
+
+    def test_include_comment_task(self):
+        """
+        Success: Test the comments include their task and its creator in a fixed number of queries
+        """
+        document, queries = self.get_document('/task-comments/?include=task_id.task_creator,comment_creator')
+        types = sorted(resource['type'] for resource in document['included'])
+        self.assertEqual(types, ['Task'] * 4 + ['UserProfile'])
+        TaskComment.objects.create(task_id=Task.objects.create(task_name='new_task', task_creator=self.manager_user), comment_creator=self.manager_user, comment='new')
+        _, more_queries = self.get_document('/task-comments/?include=task_id.task_creator,comment_creator')
+        self.assertEqual(more_queries, queries)
+
+    def test_include_unknown_path(self):
+        """
+        Error: Test an include path the endpoint does not support is a bad request
+        """
+        task_id = Task.objects.first().task_id
+        for url in ('/tasks/?include=comments', f'/tasks/{task_id}/?include=task_creator.role', '/task-comments/?include=task_id.comments'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST, url)
+
+
+class TaskCommentSummaryTestCase(APITestCase):
+    """
+    Test suite for the comment count and latest comment of the task list, and the task filter of the comment list
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = UserProfile.objects.create_user(username='admin_1', email = "admin@wow.com", password='admin_password', role="admin")
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.member_user = UserProfile.objects.create_user(username='member_1', email = "member_1@wow.com", password='member_password', role="team_member")
+        self.tasks = []
+        for i in range(3):
+            task = Task.objects.create(task_name=f'test_task_{i}', task_creator=self.manager_user)
+            task.task_assignee.set([self.member_user])
+            self.tasks.append(task)
+        for i in range(3):
+            TaskComment.objects.create(task_id=self.tasks[0], comment_creator=self.manager_user, comment=f'comment_{i}')
+        self.last_comment = TaskComment.objects.create(task_id=self.tasks[0], comment_creator=self.member_user, comment='x' * 150)
+
+    def get_tasks(self, user, query):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=user).key)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/tasks/' + query)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return {int(task['id']): task['attributes'] for task in response.json()['data']}, len(queries.captured_queries)
+
+    def test_comment_summary_in_page_query(self):
+        """
+        Success: Test the comment count and latest comment preview of each task, at a constant number of queries per page
+        """
+        tasks, _ = self.get_tasks(self.admin_user, '?count=false')
+        self.assertNotIn('comment_count', tasks[self.tasks[0].task_id])
+
+        tasks, queries = self.get_tasks(self.admin_user, '?count=false&comment_summary=true')
+        self.assertEqual([tasks[task.task_id]['comment_count'] for task in self.tasks], [4, 0, 0])
+        last_comment = tasks[self.tasks[0].task_id]['last_comment']
+        self.assertEqual(last_comment['comment_id'], self.last_comment.comment_id)
+        self.assertEqual(last_comment['comment_creator'], self.member_user.id)
+        self.assertEqual(last_comment['comment'], 'x' * 100)
+        self.assertIsNone(tasks[self.tasks[1].task_id]['last_comment'])
+
+        for task in self.tasks[1:]:
+            TaskComment.objects.create(task_id=task, comment_creator=self.manager_user, comment='more')
+        _, more_queries = self.get_tasks(self.admin_user, '?count=false&comment_summary=true')
+        self.assertEqual(more_queries, queries)
+
+    def test_comment_summary_is_scoped(self):
+        """
+        Success: Test managers and team members count only the comments they can list, and filter the comment list by task
+        """
+        tasks, _ = self.get_tasks(self.manager_user, '?comment_summary=true')
+        self.assertEqual(tasks[self.tasks[0].task_id]['comment_count'], 3)
+        self.assertEqual(tasks[self.tasks[0].task_id]['last_comment']['comment'], 'comment_2')
+        tasks, _ = self.get_tasks(self.member_user, '?comment_summary=true')
+        self.assertEqual(tasks[self.tasks[0].task_id]['comment_count'], 1)
+
+        response = self.client.get('/task-comments/', {'task_id': self.tasks[0].task_id})
+        self.assertEqual([int(comment['id']) for comment in response.json()['data']], [self.last_comment.comment_id])
+        response = self.client.get('/task-comments/', {'task_id': self.tasks[1].task_id})
+        self.assertEqual(response.json()['data'], [])
+
+    def test_comment_list_invalid_task_id(self):
+        """
+        Error: Test a task id that is not an integer is rejected by the comment list
+        """
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=self.manager_user).key)
+        response = self.client.get('/task-comments/', {'task_id': 'first'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+
+class TaskAssigneeChangeTestCase(APITestCase):
+    """
+    Test suite for adding and removing some assignees of a task
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.members = [
+            UserProfile.objects.create_user(username=f'member_{i}', email=f"member_{i}@wow.com", password='member_password', role="team_member")
+            for i in range(3)
+        ]
+        self.task = Task.objects.create(task_name='test_task', task_creator=self.manager_user)
+        self.task.task_assignee.set([self.members[0]])
+        self.url = f'/tasks/{self.task.task_id}/assignees/'
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=self.manager_user).key)
+
+    def post(self, action, user_ids):
+        return self.client.post(self.url + action + '/', json.dumps({'task_assignee': user_ids}), content_type='application/json')
+
+    def get_assignees(self):
+        return sorted(self.task.task_assignee.values_list('id', flat=True))
+
+    def test_add_and_remove_are_idempotent(self):
+        """
+        Success: Test only the missing assignments are inserted and only the existing ones deleted, once
+        """
+        ids = [member.id for member in self.members]
+        response = self.post('add', ids)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json()['data']['added'], ids[1:])
+        self.assertEqual(self.get_assignees(), ids)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post('add', ids)
+        self.assertEqual(response.json()['data']['added'], [])
+        self.assertFalse([query for query in queries.captured_queries if query['sql'].startswith('INSERT')])
+
+        response = self.post('remove', ids[:2])
+        self.assertEqual(response.json()['data']['removed'], ids[:2])
+        response = self.post('remove', ids[:2])
+        self.assertEqual(response.json()['data']['removed'], [])
+        self.assertEqual(self.get_assignees(), ids[2:])
+
+    def test_changes_send_m2m_changed(self):
+        """
+        Success: Test the rollup, the modified date and the delta-sync tombstones follow the changed assignments only
+        """
+        modified = Task.objects.get(pk=self.task.pk).modified
+        self.post('add', [self.members[0].id, self.members[1].id])
+        self.post('remove', [self.members[0].id, self.members[2].id])
+        self.assertGreater(Task.objects.get(pk=self.task.pk).modified, modified)
+        self.assertEqual(list(TaskTombstone.objects.values_list('task_id', 'user_id', 'reason')), [(self.task.task_id, self.members[0].id, 'unassigned')])
+        rollup = sorted(TaskStat.objects.exclude(count=0).values_list('scope', 'user_id', 'count'))
+        rebuild_task_stats()
+        self.assertEqual(rollup, sorted(TaskStat.objects.exclude(count=0).values_list('scope', 'user_id', 'count')))
+        self.assertIn(('assignee', self.members[1].id, 1), rollup)
+
+    def test_change_assignees_errors(self):
+        """
+        Error: Test unknown users, invalid ids, team members and tasks of other managers are rejected
+        """
+        self.assertEqual(self.post('add', [self.members[1].id, 999]).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.post('remove', ['1']).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.get_assignees(), [self.members[0].id])
+
+        other_manager = UserProfile.objects.create_user(username='manager_2', email = "manager_2@wow.com", password='manager_password', role="manager")
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=other_manager).key)
+        self.assertEqual(self.post('add', [self.members[1].id]).status_code, status.HTTP_404_NOT_FOUND)
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=self.members[0]).key)
+        self.assertEqual(self.post('remove', [self.members[0].id]).status_code, status.HTTP_403_FORBIDDEN)
+
+
+class TaskAccessTestCase(APITestCase):
+    """
+    Test suite for the task permissions checked by TaskAccess
+    """
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user = UserProfile.objects.create_user(username='admin_1', email = "admin@wow.com", password='admin_password', role="admin")
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.member_user = UserProfile.objects.create_user(username='member_1', email = "member_1@wow.com", password='member_password', role="team_member")
+        self.other_member = UserProfile.objects.create_user(username='member_2', email = "member_2@wow.com", password='member_password', role="team_member")
+        self.tasks = [Task.objects.create(task_name=f'test_task_{i}', task_creator=self.manager_user) for i in range(4)]
+        for task in self.tasks[:2]:
+            task.task_assignee.set([self.member_user, self.other_member])
+
+    def login(self, user):
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + Token.objects.get(user=user).key)
+
+    def test_checks_are_memoized(self):
+        """
+        Success: Test each assignment is checked once per TaskAccess, with an indexed query of one row at most
+        """
+        access = TaskAccess(self.member_user)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(access.can_see(self.tasks[0]))
+            self.assertTrue(access.can_comment(self.tasks[0]))
+            self.assertFalse(access.can_edit(self.tasks[0]))
+            self.assertFalse(access.can_see(self.tasks[2]))
+            self.assertFalse(access.can_comment(self.tasks[2]))
+        self.assertEqual(len(queries.captured_queries), 2)
+        # exists(): one indexed row at most, never the assignees
+        self.assertIn('LIMIT 1', queries.captured_queries[0]['sql'])
+
+    def test_checks_are_batched(self):
+        """
+        Success: Test many tasks are checked with one query for their assignments, none when the rule needs no assignment
+        """
+        access = TaskAccess(self.member_user)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(access.filter_commentable(self.tasks), self.tasks[:2])
+            self.assertEqual(access.filter(self.tasks, access.can_see), self.tasks[:2])
+        self.assertEqual(len(queries.captured_queries), 1)
+
+        access = TaskAccess(self.manager_user)
+        with self.assertNumQueries(0):
+            self.assertEqual(access.filter(self.tasks, access.can_edit), self.tasks)
+            self.assertEqual(access.filter_commentable(self.tasks), self.tasks)
+        self.assertEqual(TaskAccess(self.other_member).filter(self.tasks, TaskAccess(self.other_member).can_delete), [])
+
+    def test_comment_rules(self):
+        """
+        Success: Test assignees, creators and admins comment on a task, without loading its assignees
+        """
+        for user in (self.member_user, self.manager_user, self.admin_user):
+            self.login(user)
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.post('/task-comments/', json.dumps({'task_id': self.tasks[0].task_id, 'comment': 'comment'}), content_type='application/json')
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            self.assertEqual(len([query for query in queries.captured_queries if 'FROM "task_manager_task"' in query['sql']]), 1)
+
+        self.login(self.member_user)
+        response = self.client.post('/task-comments/', json.dumps({'task_id': self.tasks[2].task_id, 'comment': 'comment'}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_tasks_out_of_sight(self):
+        """
+        Error: Test the tasks a user cannot see are not found, and a comment needs a task
+        """
+        self.login(self.member_user)
+        self.assertEqual(self.client.get(f'/tasks/{self.tasks[0].task_id}/').status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.get(f'/tasks/{self.tasks[2].task_id}/').status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.patch(f'/tasks/{self.tasks[2].task_id}/', json.dumps({'completed': True}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertFalse(Task.objects.get(pk=self.tasks[2].pk).completed)
+
+        # assigned, the team member sees the task but cannot change it nor its assignees
+        data = {'task_name': 'renamed', 'task_assignee': [self.other_member.id]}
+        response = self.client.patch(f'/tasks/{self.tasks[0].task_id}/', json.dumps(data), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertEqual(Task.objects.get(pk=self.tasks[0].pk).task_name, 'test_task_0')
+        self.assertEqual(self.tasks[0].task_assignee.count(), 2)
+
+        response = self.client.post('/task-comments/', json.dumps({'comment': 'comment'}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_comments_out_of_sight(self):
+        """
+        Error: Test the comments on a task the user cannot see are not found by retrieve, update and delete
+        """
+        comment = TaskComment.objects.create(task_id=self.tasks[2], comment_creator=self.manager_user, comment='private')
+        url = f'/task-comments/{comment.comment_id}/'
+        self.login(self.member_user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_404_NOT_FOUND)
+        response = self.client.patch(url, json.dumps({'comment': 'changed'}), content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(TaskComment.objects.get().comment, 'private')
+
+        self.login(self.admin_user)
+        self.assertEqual(self.client.get(url).status_code, status.HTTP_200_OK)
+        self.assertEqual(self.client.delete(url).status_code, status.HTTP_200_OK)
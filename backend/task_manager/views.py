@@ -1,27 +1,40 @@
 from json import JSONDecodeError
+from django.conf import settings
+from django.core.cache import cache
+from django.utils import timezone
 from django.http import JsonResponse
-from .serializers import TaskSerializer, TaskCommentSerializer
-from .models import Task , TaskComment
+from .serializers import TaskSerializer, ArchivableTaskSerializer, TaskCommentSerializer
+from .models import Task , TaskComment, ArchivedTask
+from .archive import QuerySetChain
+from .queries import get_visible_tasks, filter_tasks, get_visible_task_comments, filter_task_comments, annotate_comment_summary, get_assignee_workload
+from .delta_sync import SyncToken, InvalidSyncToken, ExpiredSyncToken, get_task_changes
+from .stats import get_task_stats
+from .assignees import add_assignees, remove_assignees
+from .access import TaskAccess
 from rest_framework.parsers import JSONParser
 from rest_framework.permissions import IsAuthenticated
 from rest_framework import viewsets, status
 from rest_framework.response import Response
 from rest_framework.mixins import ListModelMixin,UpdateModelMixin,RetrieveModelMixin, DestroyModelMixin
+from rest_framework.decorators import action
 from .permissions import IsAdmin, IsManager, IsTeamMember
 from rest_framework.exceptions import PermissionDenied
 from django.contrib.auth import get_user_model
 from rest_framework.pagination import LimitOffsetPagination
+from utils.pagination import CachedCountPagination
 from rest_framework.serializers import ValidationError
 from django.http import Http404
-from drf_yasg.utils import swagger_auto_schema
-from . custom_schemas import *
-from drf_yasg.inspectors import CoreAPICompatInspector
-
-class NoSortSearchInspector(CoreAPICompatInspector):
-    def get_filter_parameters(self, filter_backend):
-        return []
+from rest_framework.generics import get_object_or_404
+from utils.fields import BatchedPrimaryKeyRelatedField
+from utils.mixins import ReplicaReadMixin, RateLimitHeadersMixin, CoalescedReadMixin, IncludedResourcesMixin
+from jobs.registry import enqueue
+from jobs.views import job_accepted_response
 
 class TaskViewSet(
+    RateLimitHeadersMixin,
+    IncludedResourcesMixin,
+    CoalescedReadMixin,
+    ReplicaReadMixin,
     ListModelMixin,
     RetrieveModelMixin,
     UpdateModelMixin,
@@ -48,6 +61,8 @@ class TaskViewSet(
         serializer_class (Serializer): The serializer class used for task serialization.
         pagination_class (Pagination): The pagination class used for task listing.
         http_method_names (list): The allowed HTTP methods for this ViewSet.
+        coalesced_actions (tuple): The actions whose identical concurrent requests share one response.
+        prefetch_for_includes (dict): The related objects loaded for each ?include= path.
     
     """
 
@@ -55,42 +70,71 @@ class TaskViewSet(
     parser_classes = [JSONParser]
     queryset = Task.objects.all()
     serializer_class = TaskSerializer
-    pagination_class = LimitOffsetPagination
+    pagination_class = CachedCountPagination
     http_method_names = ['get', 'post', 'patch', 'delete']
+    coalesced_actions = ('list', 'retrieve', 'stats', 'workload')
+    prefetch_for_includes = {
+        # the assignee ids are rendered in the relationships of every task
+        '__all__': ['task_assignee'],
+        'task_creator': ['task_creator'],
+    }
+
+    def get_coalescing_scope(self, request):
+        """
+        Describe the tasks visible to the user (see get_visible_tasks): every admin shares one scope.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            str: The visibility scope.
+        """
+        user = request.user
+        if user.role == 'admin':
+            return 'all'
+        elif user.role == 'manager':
+            return f'creator:{user.pk}'
+        return f'assignee:{user.pk}'
+
+    def include_archived(self, request):
+        """
+        Check if the request asks for the archived tasks too.
 
-    def is_user_allowed_delete(self, user, instance):
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            bool: True if the 'include_archived' query parameter is true, False otherwise.
+        """
+        return str(request.query_params.get('include_archived')).lower() == 'true'
+
+    def include_comment_summary(self, request):
         """
-        Check if the user is allowed to delete the task.
+        Check if the request asks for the comment count and latest comment of each task.
 
         Args:
-            user (User): The user object.
-            instance (Task): The task instance.
+            request (Request): The HTTP request object.
+
+        Returns:
+            bool: True if the 'comment_summary' query parameter is true, False otherwise.
+        """
+        return str(request.query_params.get('comment_summary')).lower() == 'true'
+
+    def get_object(self):
+        """
+        Get the task of the request, among the tasks the user can see (see TaskAccess.can_see).
 
         Returns:
-            bool: True if the user is allowed to delete the task, False otherwise.
-        """
-        task_creator_id = instance.task_creator.id
-        if user.id == task_creator_id and (user.role == "admin" or user.role == "manager"):
-            return True
-        else:
-            return False
-
-    @swagger_auto_schema(
-              responses={
-                200: get_task_response_schema,
-            },
-        manual_parameters=[
-                openapi.Parameter('completed', openapi.IN_QUERY, description='Is task completed', type=openapi.TYPE_BOOLEAN),
-                openapi.Parameter('task_assignee_id', openapi.IN_QUERY, description='Search by task assignee id', type=openapi.TYPE_INTEGER),
-                openapi.Parameter('due_date', openapi.IN_QUERY, description='Search by due date[Format: 2023-12-30 (YYYY-MM-DD)]', type=openapi.TYPE_STRING),
-                openapi.Parameter('sort_by', openapi.IN_QUERY, description='Sort by [Option: due_date, id, priority] ', type=openapi.TYPE_STRING),
-                openapi.Parameter('sort_dir', openapi.IN_QUERY, description='Direction of sort [Option: desc, asc]', type=openapi.TYPE_STRING),
-
-            ],
-            filter_inspectors=[NoSortSearchInspector],
-            manual_operation=False,
-            operation_description='Retrieve all tasks.'
-        )
+            Task: The task.
+
+        Raises:
+            Http404: If the task does not exist or is not visible to the user.
+        """
+        task = super().get_object()
+        if not TaskAccess.for_request(self.request).can_see(task):
+            raise Http404("No Task matches the given query.")
+        return task
+
     def list(self, request, *args, **kwargs):
         """
         Retrieve a list of tasks.
@@ -107,56 +151,25 @@ class TaskViewSet(
         """
         user = request.user
         try:
-            if IsAdmin().has_permission(request, self):
-                queryset = self.get_queryset()  # All tasks for admin
-            elif IsManager().has_permission(request, self):
-                queryset = self.get_queryset().filter(task_creator=user)  # Tasks created by manager
-            elif IsTeamMember().has_permission(request, self):
-                queryset = self.get_queryset().filter(task_assignee=user)  # Tasks assigned to team member
-            else:
-                queryset = Task.objects.none()  
-            
-            completed = self.request.query_params.get('completed')
-            task_assignee_id = self.request.query_params.get('task_assignee_id')
-            due_date = self.request.query_params.get('due_date', None)
-            sort_by = self.request.query_params.get('sort_by', None)
-            sort_dir = request.query_params.get('sort_dir')
-
-            # Apply additional filters based on query parameters
-            if completed is not None:
-                completed = str(completed).lower() == 'true'
-                queryset = queryset.filter(completed=completed)
-            
-            if task_assignee_id:
-                User = get_user_model()
-                task_assignee = User.objects.get(id=task_assignee_id)
-                queryset = queryset.filter(task_assignee=task_assignee)
-            
-            if due_date is not None:
-                queryset = queryset.filter(task_due_date=due_date)
-
-            if sort_by == 'due_date':
-                if sort_dir == "desc":
-                    queryset = queryset.order_by('task_due_date').reverse()
-                else:
-                    queryset = queryset.order_by('task_due_date')
+            queryset = get_visible_tasks(user, self.get_queryset())
+            queryset = filter_tasks(queryset, request.query_params)
+            serializer_class = self.get_serializer_class()
+            context = self.get_serializer_context()
+            context['comment_summary'] = self.include_comment_summary(request)
+            if context['comment_summary']:
+                queryset = annotate_comment_summary(queryset, user)
+
+            if self.include_archived(request):
+                archived_queryset = get_visible_tasks(user, self.prefetch_includes(ArchivedTask.objects.all()))
+                archived_queryset = filter_tasks(archived_queryset, request.query_params)
+                if context['comment_summary']:
+                    archived_queryset = annotate_comment_summary(archived_queryset, user)
+                queryset = QuerySetChain(queryset, archived_queryset)
+                serializer_class = ArchivableTaskSerializer
 
-            if sort_by == 'id':
-                if sort_dir == "desc":
-                    queryset = queryset.order_by('task_id').reverse()
-                else:
-                    queryset = queryset.order_by('task_id')
-            
-            if sort_by == 'priority':
-                if sort_dir == "desc":
-                    queryset = queryset.order_by('priority').reverse()
-                else:
-                    queryset = queryset.order_by('priority')
-            
-            
             page = self.paginate_queryset(queryset)
             if page is not None:
-                serializer = self.get_serializer(page, many=True)
+                serializer = serializer_class(page, many=True, context=context)
                 return self.get_paginated_response(serializer.data)
 
         except ValidationError as e:
@@ -166,22 +179,21 @@ class TaskViewSet(
         except Exception as e:
             return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    @swagger_auto_schema(responses={
-                200: get_task_response_schema,
-            },
-        operation_description="Retrieve a task by id"
-        )
     def retrieve(self, request, *args, **kwargs):
-         return super().retrieve(request, *args, **kwargs)
+         if not self.include_archived(request):
+             return super().retrieve(request, *args, **kwargs)
+         # looked up without filter_queryset, the JSON:API query parameter validation rejects include_archived
+         try:
+             instance = get_object_or_404(self.get_queryset(), pk=kwargs['pk'])
+         except Http404:
+             instance = get_object_or_404(self.prefetch_includes(ArchivedTask.objects.all()), pk=kwargs['pk'])
+         if not TaskAccess.for_request(request).can_see(instance):
+             raise Http404("No Task matches the given query.")
+         self.check_object_permissions(request, instance)
+         serializer = ArchivableTaskSerializer(instance, context=self.get_serializer_context())
+         return Response(serializer.data)
          
 
-    @swagger_auto_schema(
-              request_body=patch_task_request_schema,
-              responses={
-                200: get_task_response_schema,
-            },
-        operation_description="Create a new task by id"
-        )
     def create(self, request):
         """
         Create a new task.
@@ -217,13 +229,6 @@ class TaskViewSet(
         except Exception as e:
                     return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    @swagger_auto_schema(
-              request_body=patch_task_request_schema,
-              responses={
-                200: patch_task_update_response_schema,
-            },
-        operation_description="Update a task by id"
-    )
     def partial_update(self, request, *args, **kwargs):
         """
         Update a task.
@@ -243,6 +248,8 @@ class TaskViewSet(
         try:
             partial = kwargs.pop('partial', False)
             instance = self.get_object()
+            if not TaskAccess.for_request(request).can_edit(instance):
+                raise PermissionDenied("You are not authorized to update this task.")
             serializer = self.get_serializer(instance, data=request.data, partial=partial)
             if serializer.is_valid(raise_exception=True):
                 self.perform_update(serializer)
@@ -253,11 +260,13 @@ class TaskViewSet(
                 return Response({"result": "error", "message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
         except JSONDecodeError as e :
             return JsonResponse({"result": "error","message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
-        except PermissionDenied:
+        except PermissionDenied as e:
             return Response({"result": "error", "message": str(e), "status_code": status.HTTP_403_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
+        except Http404 as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
-    
+
     def destroy(self, request, *args, **kwargs):
         """
         Delete a task.
@@ -275,13 +284,13 @@ class TaskViewSet(
         """
         try:
             instance = self.get_object()
-            if self.is_user_allowed_delete(request.user, instance): 
+            if TaskAccess.for_request(request).can_delete(instance):
                 response_data = {'deleted_task_id': instance.task_id,'deleted_by': request.user.username}
                 self.perform_destroy(instance)
                 return Response({"result": "success", "deleted_task": response_data, "status_code": status.HTTP_200_OK}, status=status.HTTP_200_OK)
             else:
                 raise PermissionDenied("You are not authorized to delete this task.")
-        except PermissionDenied:
+        except PermissionDenied as e:
             return Response({"result": "error", "message": str(e), "status_code": status.HTTP_403_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
         except Http404 as e:
             return Response({"result": "error", "message": str(e), "status_code": status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)            
@@ -289,7 +298,283 @@ class TaskViewSet(
             return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
 
+    @action(detail=False, methods=['get'], url_path='changes')
+    def changes(self, request):
+        """
+        Retrieve the task changes visible to the user since a sync token.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The HTTP response containing the changed tasks, the removed task ids and the next sync token.
+
+        Raises:
+            ValidationError: If the sync token or the limit is invalid.
+        """
+        try:
+            token = SyncToken.parse(request.query_params.get('since'))
+            try:
+                limit = min(int(request.query_params.get('limit', 500)), 1000)
+            except ValueError:
+                raise ValidationError("Limit must be an integer.")
+            if limit < 1:
+                raise ValidationError("Limit must be positive.")
+
+            tasks, deleted, next_token, has_more = get_task_changes(request.user, token, limit)
+            serializer = TaskSerializer(tasks, many=True)
+            return Response({"result": "success", "tasks": serializer.data, "deleted": deleted, "next_token": next_token.encode(), "has_more": has_more, "status_code": status.HTTP_200_OK}, status=status.HTTP_200_OK)
+        except (ValidationError, InvalidSyncToken) as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
+        except ExpiredSyncToken as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_410_GONE}, status=status.HTTP_410_GONE)
+        except Exception as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        
+
+    @action(detail=False, methods=['get'], url_path='stats')
+    def stats(self, request):
+        """
+        Retrieve the task statistics visible to the user, read from the rollup table.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The HTTP response containing the task counts.
+        """
+        try:
+            return Response({"result": "success", "stats": get_task_stats(request.user), "status_code": status.HTTP_200_OK}, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+    @action(detail=False, methods=['get'], url_path='workload')
+    def workload(self, request):
+        """
+        Retrieve the open task load of each assignee, within the tasks visible to the user.
+        Computed by one aggregate query, cached WORKLOAD_CACHE_SECONDS per visibility scope.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The HTTP response containing the workload of the assignees.
+        """
+        try:
+            today = timezone.localdate()
+            key = f'task_workload:{self.get_coalescing_scope(request)}:{today}'
+            workload = cache.get(key)
+            if workload is None:
+                workload = get_assignee_workload(request.user, today)
+                cache.set(key, workload, settings.WORKLOAD_CACHE_SECONDS)
+            return Response({"result": "success", "workload": workload, "status_code": status.HTTP_200_OK}, status=status.HTTP_200_OK)
+        except Exception as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+
+    def get_id_list(self, data, key):
+        """
+        Read a non-empty list of ids from the request data.
+
+        Args:
+            data (dict): The request data.
+            key (str): The key of the list.
+
+        Returns:
+            list: The ids, without duplicates.
+
+        Raises:
+            ValidationError: If the list is missing, empty or holds anything but positive integers.
+        """
+        ids = data.get(key)
+        if not isinstance(ids, list) or not ids:
+            raise ValidationError(f"{key} must be a non-empty list of ids.")
+        if not all(isinstance(id, int) and not isinstance(id, bool) and id > 0 for id in ids):
+            raise ValidationError(f"{key} must only contain positive integer ids.")
+        return list(dict.fromkeys(ids))
+
+    def get_user_id_list(self, data, key):
+        """
+        Read a non-empty list of existing user ids from the request data, checked with one query.
+
+        Args:
+            data (dict): The request data.
+            key (str): The key of the list.
+
+        Returns:
+            list: The ids, without duplicates.
+
+        Raises:
+            ValidationError: If the list is invalid (see get_id_list) or holds unknown users, all of them reported.
+        """
+        user_ids = self.get_id_list(data, key)
+        try:
+            BatchedPrimaryKeyRelatedField(queryset=get_user_model().objects.all(), many=True).run_validation(user_ids)
+        except ValidationError as e:
+            raise ValidationError(f"{key}: {e.detail[0]}")
+        return user_ids
+
+    def queue_job(self, request, name, get_payload, roles=('admin', 'manager')):
+        """
+        Queue a background job for a bulk endpoint and answer 202 Accepted.
+
+        Args:
+            request (Request): The HTTP request object.
+            name (str): The name of the job handler.
+            get_payload (callable): Builds the job payload, may raise ValidationError.
+            roles (tuple): The roles allowed to queue the job.
+
+        Returns:
+            Response: The HTTP response containing the queued job, or the error.
+        """
+        try:
+            if request.user.role not in roles:
+                raise PermissionDenied("You are not authorized to perform this operation.")
+            job = enqueue(name, get_payload(), user=request.user)
+            return job_accepted_response(job)
+        except ValidationError as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
+        except PermissionDenied as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_403_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
+        except Exception as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=False, methods=['post'], url_path='bulk-delete')
+    def bulk_delete(self, request):
+        """
+        Queue the deletion of several tasks.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The HTTP response containing the queued job.
+        """
+        return self.queue_job(request, 'tasks.bulk_delete', lambda: {'task_ids': self.get_id_list(request.data, 'task_ids')})
+
+    @action(detail=False, methods=['post'], url_path='bulk-assign')
+    def bulk_assign(self, request):
+        """
+        Queue the assignment of users to several tasks.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The HTTP response containing the queued job.
+        """
+        def get_payload():
+            task_assignee = self.get_user_id_list(request.data, 'task_assignee')
+            return {'task_ids': self.get_id_list(request.data, 'task_ids'), 'task_assignee': task_assignee}
+        return self.queue_job(request, 'tasks.bulk_assign', get_payload)
+
+    @action(detail=False, methods=['post'], url_path='export')
+    def export(self, request):
+        """
+        Queue the export of the tasks visible to the user.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The HTTP response containing the queued job.
+        """
+        def get_payload():
+            payload = request.query_params.dict()
+            # reject invalid filters now rather than in a failed job
+            filter_tasks(Task.objects.none(), payload)
+            return payload
+
+        return self.queue_job(request, 'tasks.export', get_payload, roles=('admin', 'manager', 'team_member'))
+
+    @action(detail=False, methods=['post'], url_path='import')
+    def import_tasks(self, request):
+        """
+        Queue the creation of several tasks.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            Response: The HTTP response containing the queued job.
+        """
+        def get_payload():
+            tasks = request.data.get('tasks')
+            if not isinstance(tasks, list) or not tasks:
+                raise ValidationError("tasks must be a non-empty list of tasks.")
+            TaskSerializer(data=tasks, many=True).is_valid(raise_exception=True)
+            return {'tasks': tasks}
+        return self.queue_job(request, 'tasks.import', get_payload)
+
+    def change_assignees(self, request, pk, change, result_key):
+        """
+        Add or remove some assignees of a task, leaving the others alone.
+
+        Args:
+            request (Request): The HTTP request object.
+            pk (str): The id of the task.
+            change (callable): add_assignees or remove_assignees.
+            result_key (str): The key of the changed user ids in the response.
+
+        Returns:
+            Response: The HTTP response containing the ids of the users actually added or removed.
+        """
+        try:
+            access = TaskAccess.for_request(request)
+            task = get_object_or_404(Task.objects.all(), pk=pk)
+            if not access.can_see(task):
+                raise Http404("No Task matches the given query.")
+            if not access.can_edit(task):
+                raise PermissionDenied("You are not authorized to change the assignees of this task.")
+            if change is add_assignees:
+                task_assignee = self.get_user_id_list(request.data, 'task_assignee')
+            else:
+                task_assignee = self.get_id_list(request.data, 'task_assignee')
+            changed = change(task, task_assignee)
+            return Response({"result": "success", "task_id": task.task_id, result_key: changed, "status_code": status.HTTP_200_OK}, status=status.HTTP_200_OK)
+        except ValidationError as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
+        except PermissionDenied as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_403_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
+        except Http404 as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+
+    @action(detail=True, methods=['post'], url_path='assignees/add')
+    def add_assignees(self, request, pk=None):
+        """
+        Assign users to a task, on top of its current assignees.
+
+        Args:
+            request (Request): The HTTP request object.
+            pk (str): The id of the task.
+
+        Returns:
+            Response: The HTTP response containing the ids of the users newly assigned.
+        """
+        return self.change_assignees(request, pk, add_assignees, 'added')
+
+    @action(detail=True, methods=['post'], url_path='assignees/remove')
+    def remove_assignees(self, request, pk=None):
+        """
+        Unassign users from a task, keeping its other assignees.
+
+        Args:
+            request (Request): The HTTP request object.
+            pk (str): The id of the task.
+
+        Returns:
+            Response: The HTTP response containing the ids of the users unassigned.
+        """
+        return self.change_assignees(request, pk, remove_assignees, 'removed')
+
+
 class TaskCommentViewSet(
+        RateLimitHeadersMixin,
+        IncludedResourcesMixin,
+        ReplicaReadMixin,
         ListModelMixin,
         RetrieveModelMixin,
         UpdateModelMixin,
@@ -317,58 +602,37 @@ class TaskCommentViewSet(
         serializer_class (Serializer): The serializer class used for task comment serialization.
         pagination_class (Pagination): The pagination class used for task comment listing.
         http_method_names (list): The allowed HTTP methods for this ViewSet.
+        prefetch_for_includes (dict): The related objects loaded for each ?include= path.
     """
     permission_classes = [IsAuthenticated, (IsAdmin | IsManager | IsTeamMember)]
     parser_classes = [JSONParser]
     queryset = TaskComment.objects.all()
     serializer_class = TaskCommentSerializer
     pagination_class = LimitOffsetPagination
+    prefetch_for_includes = {
+        # an included task renders its assignee ids
+        'task_id': ['task_id__task_assignee'],
+        'task_id.task_creator': ['task_id__task_creator'],
+        'comment_creator': ['comment_creator'],
+    }
 
     http_method_names = ['get', 'post', 'patch', 'delete']
 
-    def is_user_allowed_comment(self, user, task):
+    def get_object(self):
         """
-        Checks if a user is allowed to comment on a task.
-        Admins, Task Creator and Task Assigness are only allowed.
-
-        Args:
-            user (User): The user object.
-            task (Task): The task object.
+        Get the comment of the request, if the user wrote it or can see its task (see TaskAccess.can_see_comment).
 
         Returns:
-            bool: True if the user is allowed to comment, False otherwise.
-        """
-        if user.role == "admin" or task.task_creator == user and user.role == "manager" or user in task.task_assignee.all():
-            return True
-        else:
-            return False
+            TaskComment: The comment.
 
-    def is_user_allowed_comment_delete(self, user, instance):
+        Raises:
+            Http404: If the comment does not exist or is not visible to the user.
         """
-        Checks if a user is allowed to delete a comment.
-        Original commenter and admin is allowed to delete.
-
-        Args:
-            user (User): The user object.
-            instance (TaskComment): The comment instance.
+        comment = super().get_object()
+        if not TaskAccess.for_request(self.request).can_see_comment(comment):
+            raise Http404("No TaskComment matches the given query.")
+        return comment
 
-        Returns:
-            bool: True if the user is allowed to delete the comment, False otherwise.
-        """
-        comment_creator_id = instance.comment_creator.id
-        if user.id == comment_creator_id or user.role == "admin":
-            return True
-        else:
-            return False
-        
-    @swagger_auto_schema(
-              responses={
-                200: get_task_comment_response_schema,
-            },
-            filter_inspectors=[NoSortSearchInspector],
-            manual_operation=False,
-            operation_description='Retrieve all task comments.'
-        )
     def list(self, request, *args, **kwargs):
         """
         Retrieve a list of task comments based on the user's role.
@@ -381,14 +645,8 @@ class TaskCommentViewSet(
         """
         user = request.user
         try:
-            if IsAdmin().has_permission(request, self):
-                queryset = self.get_queryset()  # All task comment for admin
-            elif IsManager().has_permission(request, self):
-                queryset = self.get_queryset().filter(comment_creator=user)  # Tasks created by manager
-            elif IsTeamMember().has_permission(request, self):
-                queryset = self.get_queryset().filter(comment_creator=user)  # Tasks assigned to team member
-            else:
-                queryset = Task.objects.none()  
+            queryset = get_visible_task_comments(user, self.get_queryset())
+            queryset = filter_task_comments(queryset, request.query_params)
             serializer = self.get_serializer(queryset, many=True)
             return Response(serializer.data)
         except ValidationError as e:
@@ -398,23 +656,11 @@ class TaskCommentViewSet(
         except Exception as e:
             return JsonResponse({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
-    @swagger_auto_schema(
-              responses={
-                200: get_task_comment_response_schema,
-            },
-        operation_description="Retrieve a task comment by id."
-        )
     def retrieve(self, request, *args, **kwargs):
+         # defined here so its API documentation (docs.py) is not set on the mixin method
          return super().retrieve(request, *args, **kwargs)
     
 
-    @swagger_auto_schema(
-              request_body=post_task_comment_request_schema,
-              responses={
-                200: post_task_comment_response_schema,
-            },
-        operation_description="Create a task comment for a task."
-        )
     def create(self, request):
         """
         Create a new task comment.
@@ -428,9 +674,11 @@ class TaskCommentViewSet(
         try:
             serializer = TaskCommentSerializer(data=request.data)
             if serializer.is_valid(raise_exception=True):
-                task_id = request.data.get('task_id')
-                task = Task.objects.get(task_id=task_id)
-                if self.is_user_allowed_comment(self.request.user, task):
+                # the task loaded by the validation of task_id
+                task = serializer.validated_data.get('task_id')
+                if task is None:
+                    raise ValidationError("task_id is required.")
+                if TaskAccess.for_request(request).can_comment(task):
                     serializer.save(comment_creator=self.request.user)
                     return Response({"result": "success", "created_task_comment": serializer.data, "status_code": status.HTTP_201_CREATED}, status=status.HTTP_201_CREATED)
                 else:
@@ -441,16 +689,11 @@ class TaskCommentViewSet(
                 return Response({"result": "error", "message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
         except JSONDecodeError as e:
                 return JsonResponse({"result": "error","message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status= status.HTTP_400_BAD_REQUEST)
+        except PermissionDenied as e:
+                return Response({"result": "error", "message": str(e), "status_code": status.HTTP_403_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
         except Exception as e:
                     return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
-    @swagger_auto_schema(
-              request_body = patch_task_comment_request_schema,
-              responses={
-                200: post_task_comment_response_schema,
-            },
-        operation_description="Update a task comment for a task."
-        )
     def partial_update(self, request, *args, **kwargs):
         """
         Update a task comment.
@@ -466,9 +709,7 @@ class TaskCommentViewSet(
             instance = self.get_object()
             serializer = self.get_serializer(instance, data=request.data, partial=partial)
             if serializer.is_valid(raise_exception=True):
-                comment_creator_id = instance.comment_creator.id
-                updater_id = self.request.user.id
-                if comment_creator_id == updater_id:
+                if TaskAccess.for_request(request).can_edit_comment(instance):
                     self.perform_update(serializer)
                     return Response(serializer.data, status=status.HTTP_200_OK)
                 else:
@@ -479,14 +720,13 @@ class TaskCommentViewSet(
             return Response({"result": "error", "message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
         except JSONDecodeError as e :
             return JsonResponse({"result": "error","message": str(e), "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
-        except PermissionDenied:
+        except PermissionDenied as e:
             return Response({"result": "error", "message": str(e), "status_code": status.HTTP_403_FORBIDDEN}, status=status.HTTP_403_FORBIDDEN)
+        except Http404 as e:
+            return Response({"result": "error", "message": str(e), "status_code": status.HTTP_404_NOT_FOUND}, status=status.HTTP_404_NOT_FOUND)
         except Exception as e:
             return Response({"result": "error", "message": str(e), "status_code": status.HTTP_500_INTERNAL_SERVER_ERROR}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         
-    @swagger_auto_schema(
-        operation_description="Delete a task comment by id. Only possible by comment creator or admin."
-    )
     def destroy(self, request, *args, **kwargs):
         """
         Delete a task comment.
@@ -502,7 +742,7 @@ class TaskCommentViewSet(
         """
         try:
             instance = self.get_object()
-            if self.is_user_allowed_comment_delete(request.user, instance): 
+            if TaskAccess.for_request(request).can_delete_comment(instance):
                 response_data = {
                     'message': 'Task comment successfully deleted.',
                     'deleted_comment': instance.comment,
@@ -0,0 +1,28 @@
+from django.contrib import admin
+from django.db.models import Q
+from .pagination import EstimatedCountPaginator
+
+
+class ScalableModelAdmin(admin.ModelAdmin):
+    """
+    ModelAdmin for tables too big for exact counts and substring search.
+
+    The changelist uses EstimatedCountPaginator and skips the second COUNT(*) of the
+    unfiltered table. Searching for a number looks up search_id_fields only, other
+    terms go through search_fields, which should only hold indexed lookups.
+
+    Attributes:
+        search_id_fields (tuple): Integer lookups matched when the search term is a number.
+    """
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    search_id_fields = ()
+
+    def get_search_results(self, request, queryset, search_term):
+        term = search_term.strip()
+        if term.isdigit() and self.search_id_fields:
+            condition = Q()
+            for field in self.search_id_fields:
+                condition |= Q(**{field: int(term)})
+            return queryset.filter(condition), False
+        return super().get_search_results(request, queryset, search_term)
@@ -0,0 +1,162 @@
+"""
+Many API calls in one HTTP round trip (POST /batch/, see core.views.BatchView).
+
+Each sub-request runs through the API view of its path in the same process, as
+if it came alone: its own permissions, throttle bucket, transaction and error
+handling, but no middleware, and authenticated as the user of the batch
+without a second token lookup. The sub-requests run in order on the database
+connection of the batch, or for read-only batches on a thread pool, each thread
+with its own connection. The rendered sub-responses are copied verbatim into
+the batch response, never decoded and encoded again.
+"""
+import json
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from io import BytesIO
+from urllib.parse import urlsplit
+from django.conf import settings
+from django.core.handlers.wsgi import WSGIRequest
+from django.db import connections
+from django.urls import Resolver404, resolve
+from rest_framework import status
+from rest_framework.serializers import ValidationError
+from rest_framework.views import APIView
+
+METHODS = ('GET', 'POST', 'PATCH', 'DELETE')
+
+
+def parse_sub_requests(data):
+    """
+    Validate the body of a batch request.
+
+    Args:
+        data (dict): The body, {"requests": [{"id", "method", "path", "body"}, ...], "parallel": bool},
+            or the list of sub-requests alone.
+
+    Returns:
+        list: The sub-requests, with their id (their position by default) and method (GET by default).
+
+    Raises:
+        ValidationError: If the body is not a list of at most BATCH_MAX_REQUESTS valid sub-requests.
+    """
+    sub_requests = data.get('requests') if isinstance(data, dict) else data
+    if not isinstance(sub_requests, list) or not sub_requests:
+        raise ValidationError("requests must be a non-empty list of requests.")
+    if len(sub_requests) > settings.BATCH_MAX_REQUESTS:
+        raise ValidationError(f"A batch holds at most {settings.BATCH_MAX_REQUESTS} requests.")
+    parsed = []
+    for position, sub_request in enumerate(sub_requests):
+        if not isinstance(sub_request, dict) or not isinstance(sub_request.get('path'), str) or not sub_request['path'].startswith('/'):
+            raise ValidationError(f"Request {position} must have a path starting with /.")
+        method = str(sub_request.get('method', 'GET')).upper()
+        if method not in METHODS:
+            raise ValidationError(f"Request {position} has an unsupported method, use one of {', '.join(METHODS)}.")
+        parsed.append({'id': sub_request.get('id', position), 'method': method, 'path': sub_request['path'], 'body': sub_request.get('body')})
+    return parsed
+
+
+def build_sub_request(request, sub_request):
+    """
+    Build the Django request of a sub-request, from the environment of the batch request.
+
+    Args:
+        request (Request): The batch request, already authenticated.
+        sub_request (dict): The sub-request, see parse_sub_requests.
+
+    Returns:
+        WSGIRequest: The request, authenticated as the user of the batch.
+    """
+    url = urlsplit(sub_request['path'])
+    body = b'' if sub_request['body'] is None else json.dumps(sub_request['body']).encode()
+    environ = dict(request.META)
+    environ.update({
+        'REQUEST_METHOD': sub_request['method'],
+        'PATH_INFO': url.path,
+        'QUERY_STRING': url.query,
+        'CONTENT_TYPE': 'application/json',
+        'CONTENT_LENGTH': str(len(body)),
+        'wsgi.input': BytesIO(body),
+        'wsgi.url_scheme': request.scheme,
+        # the sub-responses are rendered by their own view, whatever the batch response is rendered with
+        'HTTP_ACCEPT': '*/*',
+    })
+    sub = WSGIRequest(environ)
+    # DRF authenticates a request carrying these with them instead of its authentication classes
+    sub._force_auth_user, sub._force_auth_token = request.user, request.auth
+    return sub
+
+
+def _error(message, status_code):
+    content = json.dumps({"result": "error", "message": message, "status_code": status_code})
+    return status_code, {'Content-Type': 'application/json'}, content
+
+
+def run_sub_request(request, sub_request):
+    """
+    Run a sub-request through the API view of its path.
+
+    Args:
+        request (Request): The batch request.
+        sub_request (dict): The sub-request, see parse_sub_requests.
+
+    Returns:
+        tuple: The status code, the headers and the rendered JSON body of the response.
+    """
+    sub = build_sub_request(request, sub_request)
+    try:
+        match = resolve(sub.path_info)
+    except Resolver404:
+        return _error(f"No API endpoint at {sub.path_info}.", status.HTTP_404_NOT_FOUND)
+    view_class = getattr(match.func, 'cls', None)
+    # the API views only: neither the admin, the documentation and async endpoints nor a nested batch
+    if view_class is None or not issubclass(view_class, APIView) or not getattr(view_class, 'batchable', True):
+        return _error(f"{sub.path_info} cannot be called in a batch.", status.HTTP_400_BAD_REQUEST)
+    sub.resolver_match = match
+    try:
+        response = match.func(sub, *match.args, **match.kwargs)
+    except Exception as e:
+        return _error(str(e), status.HTTP_500_INTERNAL_SERVER_ERROR)
+    if response.streaming:
+        response.close()
+        return _error(f"{sub.path_info} streams its response, it cannot be called in a batch.", status.HTTP_400_BAD_REQUEST)
+    if hasattr(response, 'render'):
+        response.render()
+    content = response.content.decode(response.charset)
+    if not content or 'json' not in response.get('Content-Type', ''):
+        content = json.dumps(content or None)
+    return response.status_code, dict(response.items()), content
+
+
+def _run_in_thread(request, sub_request):
+    try:
+        return run_sub_request(request, sub_request)
+    finally:
+        # the connections of a pool thread would outlive it
+        connections.close_all()
+
+
+def run_batch(request, sub_requests, parallel=False):
+    """
+    Run the sub-requests of a batch and render the batch response.
+
+    Args:
+        request (Request): The batch request, already authenticated.
+        sub_requests (list): The sub-requests, see parse_sub_requests.
+        parallel (bool): Run them on BATCH_MAX_WORKERS threads, only honoured when every sub-request is a GET.
+
+    Returns:
+        str: The JSON body {"responses": [{"id", "status", "headers", "body"}, ...]}, in the order of the sub-requests.
+    """
+    workers = min(settings.BATCH_MAX_WORKERS, len(sub_requests))
+    if parallel and workers > 1 and all(sub_request['method'] == 'GET' for sub_request in sub_requests):
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(partial(_run_in_thread, request), sub_requests))
+    else:
+        results = [run_sub_request(request, sub_request) for sub_request in sub_requests]
+
+    parts = []
+    for sub_request, (status_code, headers, content) in zip(sub_requests, results):
+        envelope = json.dumps({'id': sub_request['id'], 'status': status_code, 'headers': headers})
+        # the rendered body goes in as is, in place of the closing brace of the envelope
+        parts.append(f'{envelope[:-1]}, "body": {content}}}')
+    return '{"responses": [' + ', '.join(parts) + ']}'
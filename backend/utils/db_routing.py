@@ -0,0 +1,108 @@
+import random
+from contextvars import ContextVar
+from django.conf import settings
+from django.core.cache import cache
+
+PRIMARY_DB_ALIAS = 'default'
+
+_read_db_alias = ContextVar('read_db_alias', default=None)
+
+
+def get_replica_aliases():
+    """
+    Retrieve the configured read replica database aliases.
+
+    Returns:
+        list: The replica aliases listed in settings.DATABASE_REPLICAS.
+    """
+    return list(getattr(settings, 'DATABASE_REPLICAS', []))
+
+
+def use_replica():
+    """
+    Route the reads of the current request / context to one of the replicas.
+    A single replica is chosen per call so that every read of a request sees the same snapshot.
+
+    Returns:
+        Token: The context variable token to pass to release_replica, or None if no replica is configured.
+    """
+    replicas = get_replica_aliases()
+    if not replicas:
+        return None
+    return _read_db_alias.set(random.choice(replicas))
+
+
+def release_replica(token):
+    """
+    Restore the read routing that was active before use_replica was called.
+
+    Args:
+        token (Token): The token returned by use_replica.
+
+    Returns:
+        None.
+    """
+    if token is not None:
+        _read_db_alias.reset(token)
+
+
+def _sticky_cache_key(user):
+    return f'db_routing:primary_pin:{user.pk}'
+
+
+def pin_to_primary(user):
+    """
+    Keep the reads of a user on the primary database for REPLICA_STICKY_SECONDS after a mutation,
+    so the user always reads their own writes even while the replicas are catching up.
+
+    Args:
+        user (User): The user who performed the mutation.
+
+    Returns:
+        None.
+    """
+    if user is None or not user.is_authenticated:
+        return
+    cache.set(_sticky_cache_key(user), True, timeout=settings.REPLICA_STICKY_SECONDS)
+
+
+def is_pinned_to_primary(user):
+    """
+    Check if the reads of a user must stay on the primary database.
+
+    Args:
+        user (User): The user to check.
+
+    Returns:
+        bool: True if the user performed a mutation within the stickiness window, False otherwise.
+    """
+    if user is None or not user.is_authenticated:
+        return False
+    return bool(cache.get(_sticky_cache_key(user)))
+
+
+class PrimaryReplicaRouter:
+    """
+    Database router sending writes to the primary database and reads to the replica
+    selected for the current request (see use_replica). Reads outside of a replica
+    context always stay on the primary.
+    """
+
+    def db_for_read(self, model, **hints):
+        # the database cache holds the read-your-writes pins: a replica lags behind it
+        if model._meta.app_label == 'django_cache':
+            return PRIMARY_DB_ALIAS
+        return _read_db_alias.get() or PRIMARY_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return PRIMARY_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        db_aliases = {PRIMARY_DB_ALIAS, *get_replica_aliases()}
+        if obj1._state.db in db_aliases and obj2._state.db in db_aliases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # replicas receive the schema together with the data from the primary
+        return db == PRIMARY_DB_ALIAS
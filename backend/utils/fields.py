@@ -0,0 +1,118 @@
+"""
+Serializer fields resolving many primary keys at once.
+
+PrimaryKeyRelatedField(many=True) validates each submitted id with its own
+SELECT ... WHERE id = ?. BatchedPrimaryKeyRelatedField(many=True) validates the
+types first, then loads every object with a single IN query and reports all
+the missing ids in one error. A list serializer can also load the ids of all
+its items up front (prefetch), its items then validate without any query.
+"""
+from django.core.exceptions import ValidationError as DjangoValidationError
+from django.utils.translation import gettext_lazy as _
+from rest_framework.exceptions import ValidationError
+from rest_framework.relations import MANY_RELATION_KWARGS, ManyRelatedField, PrimaryKeyRelatedField
+from rest_framework.serializers import ListSerializer
+
+
+class BatchedManyRelatedField(ManyRelatedField):
+    """
+    The list field of BatchedPrimaryKeyRelatedField(many=True), see the module documentation.
+    """
+    default_error_messages = {
+        'does_not_exist': _('Invalid pks {pk_values} - objects do not exist.'),
+    }
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prefetched, self.prefetched_pks = {}, set()
+
+    def get_pks(self, data):
+        """
+        Convert the submitted ids to primary key values.
+
+        Args:
+            data (list): The submitted ids.
+
+        Returns:
+            list: The primary key values, in the submitted order.
+
+        Raises:
+            ValidationError: If data is not a list, is empty when not allowed, or holds a value of the wrong type.
+        """
+        if isinstance(data, str) or not hasattr(data, '__iter__'):
+            self.fail('not_a_list', input_type=type(data).__name__)
+        if not self.allow_empty and len(data) == 0:
+            self.fail('empty')
+        child = self.child_relation
+        pk_field = child.get_queryset().model._meta.pk
+        pks = []
+        for item in data:
+            if child.pk_field is not None:
+                item = child.pk_field.to_internal_value(item)
+            try:
+                if isinstance(item, bool):
+                    raise TypeError
+                pks.append(pk_field.to_python(item))
+            except (TypeError, ValueError, DjangoValidationError):
+                child.fail('incorrect_type', data_type=type(item).__name__)
+        return pks
+
+    def prefetch(self, data_list):
+        """
+        Load the objects of the ids submitted to this field by many items with one query.
+        The items validated next resolve their ids from them; invalid lists are left to their item.
+
+        Args:
+            data_list (list): The values submitted to this field by each item.
+
+        Returns:
+            None.
+        """
+        pks = set()
+        for data in data_list:
+            try:
+                pks.update(self.get_pks(data))
+            except ValidationError:
+                continue
+        self.prefetched = self.child_relation.get_queryset().in_bulk(pks) if pks else {}
+        self.prefetched_pks = pks
+
+    def to_internal_value(self, data):
+        pks = self.get_pks(data)
+        objects = {pk: self.prefetched[pk] for pk in pks if pk in self.prefetched}
+        not_loaded = set(pks) - self.prefetched_pks
+        if not_loaded:
+            objects.update(self.child_relation.get_queryset().in_bulk(not_loaded))
+        missing = sorted(set(pks) - set(objects))
+        if missing:
+            self.fail('does_not_exist', pk_values=missing)
+        return [objects[pk] for pk in pks]
+
+
+class BatchedPrimaryKeyRelatedField(PrimaryKeyRelatedField):
+    """
+    PrimaryKeyRelatedField validating a list of ids (many=True) with a single query, see the module documentation.
+    """
+
+    @classmethod
+    def many_init(cls, *args, **kwargs):
+        list_kwargs = {'child_relation': cls(*args, **kwargs)}
+        for key in kwargs:
+            if key in MANY_RELATION_KWARGS:
+                list_kwargs[key] = kwargs[key]
+        return BatchedManyRelatedField(**list_kwargs)
+
+
+class BatchedListSerializer(ListSerializer):
+    """
+    List serializer loading the ids of the BatchedManyRelatedField fields of all its items with one query
+    per field, before the items are validated (Meta.list_serializer_class of the item serializer).
+    """
+
+    def to_internal_value(self, data):
+        if isinstance(data, list):
+            items = [item for item in data if isinstance(item, dict)]
+            for name, field in self.child.fields.items():
+                if isinstance(field, BatchedManyRelatedField) and not field.read_only:
+                    field.prefetch([item[name] for item in items if name in item])
+        return super().to_internal_value(data)
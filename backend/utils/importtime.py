@@ -0,0 +1,87 @@
+"""
+Import-time profile of the process startup, read from `python -X importtime`.
+
+The profiled entry point is imported in a fresh interpreter, so the modules
+already loaded by the calling process (e.g. manage.py) do not hide their cost.
+"""
+import re
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from pathlib import Path
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# what a worker runs before serving its first request: the application, then the URLconf
+ENTRY_POINTS = {
+    'wsgi': 'from task_management_system.wsgi import application',
+    'asgi': 'from task_management_system.asgi import application',
+}
+LOAD_URLCONF = 'from django.urls import get_resolver; get_resolver().url_patterns'
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)$')
+
+
+def parse_importtime(output):
+    """
+    Parse the `-X importtime` report of an interpreter.
+
+    Args:
+        output (str): The standard error of the interpreter.
+
+    Returns:
+        list: One (module, self_us, cumulative_us, depth) tuple per imported module, in import order.
+    """
+    modules = []
+    for line in output.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            modules.append((module, int(self_us), int(cumulative_us), len(indent) // 2))
+    return modules
+
+
+def profile_startup(entry='wsgi', load_urlconf=True, env=None, blocked=()):
+    """
+    Start a fresh interpreter on an entry point and report its import times.
+
+    Args:
+        entry (str): 'wsgi' or 'asgi'.
+        load_urlconf (bool): Also import the URLconf, as the first request does.
+        env (dict): The environment of the interpreter, defaults to the current one.
+        blocked (iterable): Packages made unimportable, to measure a startup without optional packages installed here.
+
+    Returns:
+        tuple: The parsed modules (see parse_importtime) and the wall clock startup time in seconds.
+    """
+    code = ENTRY_POINTS[entry] + ('\n' + LOAD_URLCONF if load_urlconf else '')
+    if blocked:
+        code = f'import sys; sys.modules.update(dict.fromkeys({sorted(blocked)!r}))\n' + code
+    started = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - started
+    if process.returncode != 0:
+        raise RuntimeError(process.stderr.strip().splitlines()[-1])
+    return parse_importtime(process.stderr), elapsed
+
+
+def group_by_package(modules):
+    """
+    Add up the self import time of the modules of each top-level package.
+
+    Args:
+        modules (list): The parsed modules (see parse_importtime).
+
+    Returns:
+        list: (package, self_us, module_count) tuples, the most expensive first.
+    """
+    packages = defaultdict(lambda: [0, 0])
+    for module, self_us, _, _ in modules:
+        package = packages[module.split('.')[0]]
+        package[0] += self_us
+        package[1] += 1
+    return sorted(((name, us, count) for name, (us, count) in packages.items()), key=lambda row: -row[1])
@@ -0,0 +1,13 @@
+def chunked(values, size):
+    """
+    Split a sequence in consecutive slices, e.g. to keep IN (...) lists under the database parameter limit.
+
+    Args:
+        values (sequence): The values to split.
+        size (int): The maximum length of a slice.
+
+    Returns:
+        generator: The slices.
+    """
+    for start in range(0, len(values), size):
+        yield values[start:start + size]
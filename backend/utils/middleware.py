@@ -0,0 +1,96 @@
+"""
+Middleware dispatching each request to the middleware stack of its URL prefix.
+
+The API authenticates with tokens only, so sessions, CSRF, messages and
+clickjacking protection are wasted work on its routes (a session lookup per
+request at worst). PathPrefixMiddleware runs FULL_STACK_MIDDLEWARE only for the
+paths starting with one of FULL_STACK_PATH_PREFIXES (the admin and the API
+documentation), every other request goes straight to the view.
+"""
+import asyncio
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.handlers.exception import convert_exception_to_response
+from django.utils.module_loading import import_string
+
+
+class PathPrefixMiddleware:
+    """
+    Run FULL_STACK_MIDDLEWARE, in order, around the requests of FULL_STACK_PATH_PREFIXES.
+
+    The wrapped middleware is chained like settings.MIDDLEWARE, its process_view and
+    process_exception hooks are run by the hooks of this middleware, for the same requests.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.prefixes = tuple(settings.FULL_STACK_PATH_PREFIXES)
+        self.is_async = asyncio.iscoroutinefunction(get_response)
+        if self.is_async:
+            # same switch as MiddlewareMixin: the handler then awaits __call__ and the view hook
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+            self.process_view = self._aprocess_view
+        self.view_hooks = []
+        self.exception_hooks = []
+        handler = get_response
+        for middleware_path in reversed(settings.FULL_STACK_MIDDLEWARE):
+            try:
+                middleware = import_string(middleware_path)(handler)
+            except MiddlewareNotUsed:
+                continue
+            if hasattr(middleware, 'process_view'):
+                self.view_hooks.insert(0, middleware.process_view)
+            if hasattr(middleware, 'process_exception'):
+                self.exception_hooks.append(middleware.process_exception)
+            handler = convert_exception_to_response(middleware)
+        self.full_stack = handler
+
+    def uses_full_stack(self, request):
+        """
+        Check whether a request goes through the full middleware stack.
+
+        Args:
+            request (HttpRequest): The request object.
+
+        Returns:
+            bool: True for the paths starting with one of FULL_STACK_PATH_PREFIXES.
+        """
+        return request.path_info.startswith(self.prefixes)
+
+    def __call__(self, request):
+        if self.uses_full_stack(request):
+            return self.full_stack(request)
+        return self.get_response(request)
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not self.uses_full_stack(request):
+            return None
+        for hook in self.view_hooks:
+            response = hook(request, view_func, view_args, view_kwargs)
+            if response:
+                return response
+        return None
+
+    async def _aprocess_view(self, request, view_func, view_args, view_kwargs):
+        if not self.uses_full_stack(request):
+            return None
+        for hook in self.view_hooks:
+            if asyncio.iscoroutinefunction(hook):
+                response = await hook(request, view_func, view_args, view_kwargs)
+            else:
+                response = await sync_to_async(hook, thread_sensitive=True)(request, view_func, view_args, view_kwargs)
+            if response:
+                return response
+        return None
+
+    def process_exception(self, request, exception):
+        if not self.uses_full_stack(request):
+            return None
+        for hook in self.exception_hooks:
+            response = hook(request, exception)
+            if response:
+                return response
+        return None
@@ -0,0 +1,171 @@
+from functools import partial
+from django.conf import settings
+from rest_framework import status
+from rest_framework.exceptions import ParseError
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.response import Response
+from rest_framework_json_api.utils import get_included_resources
+from .db_routing import use_replica, release_replica, pin_to_primary, is_pinned_to_primary
+from .singleflight import flights
+from .throttling import get_rate_limit_headers
+
+
+class ReplicaReadMixin:
+    """
+    ViewSet mixin routing the safe read actions to a read replica.
+
+    Users who performed a mutation within the stickiness window keep reading from
+    the primary database so they always see their own writes.
+
+    Attributes:
+        replica_read_actions (tuple): The actions allowed to read from a replica.
+    """
+    replica_read_actions = ('list', 'retrieve')
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.replica_read_actions and not is_pinned_to_primary(request.user):
+            self._replica_token = use_replica()
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        release_replica(getattr(self, '_replica_token', None))
+        self._replica_token = None
+        if request.method not in SAFE_METHODS and response.status_code < 400:
+            pin_to_primary(request.user)
+        return super().finalize_response(request, response, *args, **kwargs)
+
+
+class RateLimitHeadersMixin:
+    """
+    View mixin adding the state of the token bucket of the request (see utils.throttling) to the response,
+    as RateLimit-Limit, RateLimit-Remaining and RateLimit-Reset (seconds until the bucket is full) headers.
+    Throttled responses also get the Retry-After header of DRF.
+    """
+
+    def finalize_response(self, request, response, *args, **kwargs):
+        response = super().finalize_response(request, response, *args, **kwargs)
+        rate_limit = getattr(request._request, 'rate_limit', None)
+        if rate_limit is not None:
+            for name, value in get_rate_limit_headers(rate_limit).items():
+                response[name] = value
+        return response
+
+
+class CoalescedReadMixin:
+    """
+    ViewSet mixin coalescing identical concurrent read requests (see utils.singleflight).
+
+    Requests of the same action, path, normalized query parameters and visibility scope
+    arriving while the first one runs wait for its response data instead of running the
+    queries and the serializer again, at most COALESCE_WAIT_SECONDS. Users who just wrote
+    (pinned to the primary database) always run their own request, to read their writes.
+
+    Attributes:
+        coalesced_actions (tuple): The actions coalesced.
+    """
+    coalesced_actions = ('list',)
+
+    def get_coalescing_scope(self, request):
+        """
+        Describe what the user is allowed to see, two users of the same scope get the same response.
+        Defaults to the user itself, views widen it to the users sharing the same visibility rule.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            str: The visibility scope.
+        """
+        return f'user:{request.user.pk}'
+
+    def get_coalescing_key(self, request, *args, **kwargs):
+        query = tuple(sorted((key, tuple(values)) for key, values in request.query_params.lists()))
+        return (
+            self.__class__.__qualname__, self.action, self.get_coalescing_scope(request),
+            request.get_host(), request.path, query,
+        )
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        if self.action in self.coalesced_actions and not is_pinned_to_primary(request.user):
+            # the handler is looked up after initial(), once authentication, permissions and throttles passed
+            method = request.method.lower()
+            setattr(self, method, partial(self.coalesce, getattr(self, method)))
+
+    def coalesce(self, handler, request, *args, **kwargs):
+        response, shared = flights.do(
+            self.get_coalescing_key(request, *args, **kwargs),
+            partial(handler, request, *args, **kwargs),
+            settings.COALESCE_WAIT_SECONDS,
+            shareable=lambda response: response.status_code < 500,
+        )
+        if shared:
+            # a response of our own, rendered for this request, around the shared data
+            return Response(response.data, status=response.status_code)
+        return response
+
+
+class IncludedResourcesMixin:
+    """
+    ViewSet mixin serving JSON:API compound documents (?include=a,b.c) with one batched query per relation.
+
+    The include paths are checked against the included_serializers of the serializer before the
+    handler runs, an unknown path is a 400. The related objects of the requested paths are
+    prefetched on the queryset, the renderer adds each of them once to the 'included' section.
+
+    Attributes:
+        prefetch_for_includes (dict): The prefetch_related lookups of each include path,
+            '__all__' the lookups made whatever the include.
+    """
+    prefetch_for_includes = {}
+
+    def get_include_error(self, request):
+        """
+        Check the include paths of the request.
+
+        Args:
+            request (Request): The HTTP request object.
+
+        Returns:
+            str: The error message of the first unknown path, None if every path is known.
+        """
+        for path in get_included_resources(request):
+            serializer_class = self.get_serializer_class()
+            for name in path.split('.'):
+                serializer_class = (getattr(serializer_class, 'included_serializers', None) or {}).get(name)
+                if serializer_class is None:
+                    return f"This endpoint does not support the include parameter for path {path}"
+        return None
+
+    def prefetch_includes(self, queryset):
+        """
+        Prefetch the related objects of the include paths of the request, and of their parent paths
+        (the objects of 'a' are rendered to include 'a.b').
+
+        Args:
+            queryset (QuerySet): The queryset of the primary resources.
+
+        Returns:
+            QuerySet: The queryset with the prefetches.
+        """
+        paths = {'__all__'}
+        for path in get_included_resources(self.request):
+            names = path.split('.')
+            paths.update('.'.join(names[:i]) for i in range(1, len(names) + 1))
+        lookups = [lookup for path in sorted(paths) for lookup in self.prefetch_for_includes.get(path, [])]
+        return queryset.prefetch_related(*lookups) if lookups else queryset
+
+    def get_queryset(self):
+        return self.prefetch_includes(super().get_queryset())
+
+    def initial(self, request, *args, **kwargs):
+        super().initial(request, *args, **kwargs)
+        self.include_error = self.get_include_error(request)
+        if self.include_error:
+            raise ParseError(self.include_error)
+
+    def handle_exception(self, exc):
+        # answered here: the JSON:API exception handler builds the serializer, which rejects the include again
+        if getattr(self, 'include_error', None):
+            return Response({"result": "error", "message": self.include_error, "status_code": status.HTTP_400_BAD_REQUEST}, status=status.HTTP_400_BAD_REQUEST)
+        return super().handle_exception(exc)
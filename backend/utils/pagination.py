@@ -0,0 +1,265 @@
+import hashlib
+import json
+import time
+from collections import OrderedDict
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+from rest_framework.pagination import LimitOffsetPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+def estimate_count(queryset):
+    """
+    Estimate the number of rows of a queryset without counting them.
+
+    PostgreSQL reads the planner statistics (pg_class.reltuples for a whole table,
+    the row estimate of EXPLAIN for a filtered queryset). Other databases estimate
+    an unfiltered table by its highest integer primary key, an index seek.
+
+    Args:
+        queryset (QuerySet): The queryset to estimate.
+
+    Returns:
+        int: The estimated number of rows, or None when no estimate is available.
+    """
+    connection = connections[queryset.db]
+    model = queryset.model
+    unfiltered = not queryset.query.where and not queryset.query.distinct
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            if unfiltered:
+                cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+                row = cursor.fetchone()
+                return max(row[0], 0) if row else None
+            sql, params = queryset.order_by().values('pk').query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            plan = json.loads(plan) if isinstance(plan, str) else plan
+            return plan[0]['Plan']['Plan Rows']
+    if unfiltered and model._meta.pk.get_internal_type() in ('AutoField', 'BigAutoField', 'IntegerField', 'BigIntegerField'):
+        highest = queryset.model._default_manager.using(queryset.db).order_by('-pk').values_list('pk', flat=True).first()
+        return highest or 0
+    return None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator trusting a cheap row estimate instead of an exact COUNT(*) on big tables.
+
+    The exact count is only run when the estimate is below ESTIMATED_COUNT_THRESHOLD,
+    or when no estimate is available. Above it the page count is approximate,
+    which admin changelists and infinite lists tolerate.
+    """
+
+    @cached_property
+    def count(self):
+        estimate = estimate_count(self.object_list) if hasattr(self.object_list, 'query') else None
+        if estimate is not None and estimate >= settings.ESTIMATED_COUNT_THRESHOLD:
+            return estimate
+        return super().count
+
+
+def _version_key(table):
+    return f'list_count_version:{table}'
+
+
+def bump_count_version(*tables):
+    """
+    Invalidate the cached totals of every list reading the given tables, called on writes.
+
+    Args:
+        *tables (str): The database tables written to.
+
+    Returns:
+        None.
+    """
+    for table in tables:
+        try:
+            cache.incr(_version_key(table))
+        except ValueError:
+            # unknown or evicted version: restart from a value no older count was cached under
+            cache.set(_version_key(table), time.time_ns(), None)
+
+
+def _get_tables(queryset):
+    return sorted({queryset.model._meta.db_table} | {join.table_name for join in queryset.query.alias_map.values()})
+
+
+def _count_cache_key(queryset, versions):
+    sql, params = queryset.query.sql_with_params()
+    digest = hashlib.md5(repr((sql, params, sorted(versions.items()))).encode()).hexdigest()
+    return f'list_count:{queryset.model._meta.label_lower}:{digest}'
+
+
+def _get_versions(queryset):
+    keys = [_version_key(table) for table in _get_tables(queryset)]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, time.time_ns(), None)
+            versions[key] = cache.get(key)
+    return versions
+
+
+def get_cached_count(queryset, compute=True):
+    """
+    Count a queryset, reusing the total cached for the same query until one of its tables is written to.
+
+    Args:
+        queryset (QuerySet): The queryset to count.
+        compute (bool): Run the COUNT(*) when no total is cached, otherwise return None.
+
+    Returns:
+        int: The number of rows, or None.
+    """
+    if not isinstance(queryset, QuerySet):
+        return queryset.count() if compute else None
+    key = _count_cache_key(queryset, _get_versions(queryset))
+    count = cache.get(key)
+    if count is None and compute:
+        count = queryset.count()
+        cache.set(key, count, settings.LIST_COUNT_CACHE_SECONDS)
+    return count
+
+
+async def aget_cached_count(queryset, compute=True):
+    """
+    Async version of get_cached_count, for the async-native views.
+    """
+    keys = [_version_key(table) for table in _get_tables(queryset)]
+    versions = await cache.aget_many(keys)
+    for key in keys:
+        if key not in versions:
+            await cache.aadd(key, time.time_ns(), None)
+            versions[key] = await cache.aget(key)
+    key = _count_cache_key(queryset, versions)
+    count = await cache.aget(key)
+    if count is None and compute:
+        count = await queryset.acount()
+        await cache.aset(key, count, settings.LIST_COUNT_CACHE_SECONDS)
+    return count
+
+
+COUNT_MODES = {'true': 'exact', 'exact': 'exact', 'estimate': 'estimate', 'false': 'none', 'none': 'none'}
+
+
+def get_count_mode(query_params):
+    """
+    Read the count query parameter: exact (default), estimate, or false to skip the total.
+
+    Args:
+        query_params (QueryDict): The query parameters of the request.
+
+    Returns:
+        str: 'exact', 'estimate' or 'none'.
+    """
+    return COUNT_MODES.get(str(query_params.get('count', 'exact')).lower(), 'exact')
+
+
+def get_total(queryset, count_mode):
+    """
+    Compute the total of a list in the requested count mode.
+
+    Args:
+        queryset (QuerySet): The listed queryset.
+        count_mode (str): 'exact', 'estimate' or 'none'.
+
+    Returns:
+        int: The total, or None when it is skipped or no estimate is available.
+    """
+    if count_mode == 'none':
+        return None
+    if count_mode == 'estimate':
+        estimate = estimate_count(queryset) if isinstance(queryset, QuerySet) else None
+        # without planner statistics, a total cached by an exact request is the best estimate
+        return estimate if estimate is not None else get_cached_count(queryset, compute=False)
+    return get_cached_count(queryset)
+
+
+async def aget_total(queryset, count_mode):
+    """
+    Async version of get_total, for the async-native views.
+    """
+    if count_mode == 'none':
+        return None
+    if count_mode == 'estimate':
+        estimate = await sync_to_async(estimate_count)(queryset)
+        return estimate if estimate is not None else await aget_cached_count(queryset, compute=False)
+    return await aget_cached_count(queryset)
+
+
+def get_pagination_links(url, limit, offset, count, has_next, limit_param='limit', offset_param='offset'):
+    """
+    Build the JSON:API first / prev / next / last links of a limit / offset page.
+    'last' is only known when the total is.
+
+    Args:
+        url (str): The absolute URL of the request.
+        limit (int): The page size.
+        offset (int): The offset of the page.
+        count (int): The total, or None.
+        has_next (bool): Whether rows follow the page.
+
+    Returns:
+        OrderedDict: The links.
+    """
+    def link(page_offset):
+        page_url = replace_query_param(url, limit_param, limit)
+        if page_offset <= 0:
+            return remove_query_param(page_url, offset_param)
+        return replace_query_param(page_url, offset_param, page_offset)
+
+    last = None
+    if count is not None:
+        last = link(max(count - 1, 0) // limit * limit)
+    return OrderedDict([
+        ('first', link(0)),
+        ('prev', link(offset - limit) if offset > 0 else None),
+        ('next', link(offset + limit) if has_next else None),
+        ('last', last),
+    ])
+
+
+class CachedCountPagination(LimitOffsetPagination):
+    """
+    Limit / offset pagination whose total is optional and cached.
+
+    ?count=exact (default) returns the exact total, cached per query and invalidated
+    by version keys bumped on writes (bump_count_version). ?count=estimate returns the
+    planner estimate, ?count=false skips the total. One extra row is fetched to know
+    whether a next page exists, so the links never need the total.
+    The total and the links are rendered as the JSON:API meta and links members.
+    """
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.limit = self.get_limit(request)
+        if self.limit is None:
+            return None
+        self.offset = self.get_offset(request)
+        self.count_mode = get_count_mode(request.query_params)
+        self.count = get_total(queryset, self.count_mode)
+        page = list(queryset[self.offset:self.offset + self.limit + 1])
+        self.has_next = len(page) > self.limit
+        return page[:self.limit]
+
+    def get_paginated_response(self, data):
+        links = get_pagination_links(
+            self.request.build_absolute_uri(), self.limit, self.offset, self.count, self.has_next,
+            self.limit_query_param, self.offset_query_param,
+        )
+        return Response(OrderedDict([
+            ('results', data),
+            ('meta', {'pagination': get_pagination_meta(self.count, self.count_mode, self.limit, self.offset)}),
+            ('links', links),
+        ]))
+
+
+def get_pagination_meta(count, count_mode, limit, offset):
+    return OrderedDict([('count', count), ('count_mode', count_mode), ('limit', limit), ('offset', offset)])
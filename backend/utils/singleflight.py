@@ -0,0 +1,84 @@
+"""
+Single-flight coalescing of identical concurrent computations within a process.
+
+The first caller of a key (the leader) runs the computation, the callers of the
+same key arriving while it runs (the followers) wait for its result instead of
+running it again. Followers wait at most a budget, then compute on their own,
+so a slow leader never holds them longer than the budget.
+
+Only threads can share a flight: a process serving one request at a time
+(sync WSGI worker) never coalesces, threaded and ASGI workers do.
+"""
+import threading
+from collections import Counter
+
+
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.shared = False
+
+
+class SingleFlight:
+    """
+    Registry of the computations in flight, keyed by what makes them identical.
+
+    Attributes:
+        metrics (Counter): 'leaders' (computations run), 'coalesced' (results shared with a follower),
+            'wait_timeouts' (followers computing on their own after their wait budget),
+            'not_shared' (followers computing on their own because the leader's result could not be shared).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._flights = {}
+        self.metrics = Counter()
+
+    def do(self, key, compute, wait_seconds, shareable=None):
+        """
+        Run a computation, or wait for the identical one in flight and share its result.
+
+        Args:
+            key (hashable): What makes two computations identical.
+            compute (callable): The computation, called without arguments.
+            wait_seconds (float): The longest a follower waits for the leader.
+            shareable (callable): Optional check of the leader's result, a result it rejects
+                (e.g. a server error) is not shared and the followers compute on their own.
+
+        Returns:
+            tuple: The result, and whether it was shared by another caller.
+        """
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+
+        if not leader:
+            if not flight.done.wait(wait_seconds):
+                self._count('wait_timeouts')
+                return compute(), False
+            if not flight.shared:
+                self._count('not_shared')
+                return compute(), False
+            self._count('coalesced')
+            return flight.result, True
+
+        self._count('leaders')
+        try:
+            flight.result = compute()
+            flight.shared = shareable is None or shareable(flight.result)
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.done.set()
+        return flight.result, False
+
+    def _count(self, name):
+        with self._lock:
+            self.metrics[name] += 1
+
+
+# the flights of the API views of this process
+flights = SingleFlight()
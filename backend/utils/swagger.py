@@ -0,0 +1,46 @@
+"""
+drf-yasg inspectors of the API documentation, only imported when the schema is generated.
+"""
+from django.utils.encoding import force_str
+from drf_yasg import openapi
+from drf_yasg.inspectors import FilterInspector, NotHandled, PaginatorInspector
+
+
+def _to_parameter(parameter):
+    schema = parameter.get('schema', {})
+    return openapi.Parameter(
+        name=parameter['name'],
+        in_=parameter['in'],
+        required=parameter.get('required', False),
+        description=force_str(parameter.get('description', '')) or None,
+        type=schema.get('type', openapi.TYPE_STRING),
+        enum=schema.get('enum'),
+    )
+
+
+class OperationParametersInspector(FilterInspector, PaginatorInspector):
+    """
+    Document the query parameters of the filter backends and paginators from their
+    OpenAPI 3 description (get_schema_operation_parameters), which unlike
+    CoreAPICompatInspector does not need coreapi installed.
+    """
+
+    def get_filter_parameters(self, filter_backend):
+        if not hasattr(filter_backend, 'get_schema_operation_parameters'):
+            return NotHandled
+        return [_to_parameter(parameter) for parameter in filter_backend.get_schema_operation_parameters(self.view)]
+
+    def get_paginator_parameters(self, paginator):
+        if not hasattr(paginator, 'get_schema_operation_parameters'):
+            return NotHandled
+        return [_to_parameter(parameter) for parameter in paginator.get_schema_operation_parameters(self.view)]
+
+
+class NoSortSearchInspector(FilterInspector):
+    """
+    Leave the filter backends (sort, search) out of the documentation of a list,
+    whose query parameters are documented by hand.
+    """
+
+    def get_filter_parameters(self, filter_backend):
+        return []
@@ -0,0 +1,448 @@
+from core.models import UserProfile
+from task_manager.models import Task
+from rest_framework.test import APIClient
+from rest_framework.test import APITestCase
+from rest_framework import status
+from rest_framework.authtoken.models import Token
+from django.core.cache import cache, caches
+from django.conf import settings
+from django.test import Client, override_settings
+import os
+import tempfile
+import threading
+from unittest import mock
+import json
+from .db_routing import PrimaryReplicaRouter, use_replica, release_replica, pin_to_primary, is_pinned_to_primary
+from .pagination import EstimatedCountPaginator, estimate_count
+from .importtime import parse_importtime, profile_startup, group_by_package
+from .throttling import BucketStore, get_bucket_store, throttle_token
+from .singleflight import SingleFlight
+from .fields import BatchedPrimaryKeyRelatedField
+from task_manager.serializers import TaskSerializer
+from task_manager.streams import task_event_stream
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from rest_framework.exceptions import ValidationError
+
+
+class ReplicaRoutingTestCase(APITestCase):
+    """
+    Test suite for the primary / replica database routing
+    """
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.router = PrimaryReplicaRouter()
+
+        manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        self.manager_user = manager_user
+        self.manager_token = Token.objects.get(user=manager_user)
+
+    def test_reads_default_to_primary(self):
+        """
+        Success: Test reads and writes go to the primary when no replica is in use
+        """
+        self.assertEqual(self.router.db_for_read(Task), 'default')
+        self.assertEqual(self.router.db_for_write(Task), 'default')
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_reads_use_replica_in_replica_context(self):
+        """
+        Success: Test reads go to the replica only while the replica context is active, writes stay on primary
+        """
+        token = use_replica()
+        try:
+            self.assertEqual(self.router.db_for_read(Task), 'replica_1')
+            self.assertEqual(self.router.db_for_write(Task), 'default')
+        finally:
+            release_replica(token)
+        self.assertEqual(self.router.db_for_read(Task), 'default')
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_use_replica_without_replicas(self):
+        """
+        Edge: Test that no replica context is created when no replica is configured
+        """
+        self.assertIsNone(use_replica())
+        self.assertEqual(self.router.db_for_read(Task), 'default')
+
+    def test_mutation_pins_user_to_primary(self):
+        """
+        Success: Test a successful mutation keeps the user's reads on the primary
+        """
+        self.assertFalse(is_pinned_to_primary(self.manager_user))
+        data = json.dumps({"task_name": "test_task_1"})
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.manager_token.key)
+        response = self.client.post("/tasks/", data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertTrue(is_pinned_to_primary(self.manager_user))
+
+    @override_settings(DATABASE_REPLICAS=['replica_1'])
+    def test_pin_is_shared_by_the_workers(self):
+        """
+        Success: Test the pin is read from the shared cache on the primary, by another cache connection, even in a replica context
+        """
+        pin_to_primary(self.manager_user)
+        # another worker process: its own cache connection, reading the same store
+        other_worker_cache = caches.create_connection('default')
+        token = use_replica()
+        try:
+            self.assertEqual(self.router.db_for_read(cache.cache_model_class), 'default')
+            self.assertTrue(other_worker_cache.get(f'db_routing:primary_pin:{self.manager_user.pk}'))
+        finally:
+            release_replica(token)
+
+    def test_failed_mutation_does_not_pin_user(self):
+        """
+        Edge: Test a rejected mutation does not pin the user to the primary
+        """
+        data = json.dumps({"task_description": "no name"})
+        self.client.credentials(HTTP_AUTHORIZATION='Token ' + self.manager_token.key)
+        response = self.client.post("/tasks/", data, content_type='application/json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(is_pinned_to_primary(self.manager_user))
+
+
+class EstimatedCountPaginatorTestCase(APITestCase):
+    """
+    Test suite for the estimated count paginator
+    """
+    def setUp(self):
+        manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        for i in range(5):
+            Task.objects.create(task_name=f'test_task_{i}', task_creator=manager_user, completed=i < 2)
+        Task.objects.filter(task_name='test_task_0').delete()
+
+    def test_small_tables_are_counted_exactly(self):
+        """
+        Success: Test the exact count is used below the threshold
+        """
+        self.assertEqual(EstimatedCountPaginator(Task.objects.all(), 2).count, 4)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_big_tables_use_the_estimate(self):
+        """
+        Success: Test the estimate replaces COUNT(*) above the threshold
+        """
+        estimate = estimate_count(Task.objects.all())
+        self.assertEqual(estimate, Task.objects.order_by('-pk').first().pk)
+        with self.assertNumQueries(1):
+            self.assertEqual(EstimatedCountPaginator(Task.objects.all(), 2).count, estimate)
+
+    @override_settings(ESTIMATED_COUNT_THRESHOLD=1)
+    def test_filtered_querysets_are_counted_exactly(self):
+        """
+        Edge: Test filtered querysets without an estimate fall back to the exact count
+        """
+        self.assertEqual(EstimatedCountPaginator(Task.objects.filter(completed=True), 2).count, 1)
+
+
+class StartupImportTestCase(APITestCase):
+    """
+    Test suite for the import-time profile of the process startup
+    """
+    def test_parse_importtime(self):
+        """
+        Success: Test the -X importtime report is parsed and grouped by package
+        """
+        output = (
+            "import time: self [us] | cumulative | imported package\n"
+            "import time:       120 |        120 |     rest_framework.settings\n"
+            "import time:        80 |        200 |   rest_framework\n"
+            "import time:        50 |         50 | task_manager\n"
+        )
+        modules = parse_importtime(output)
+        self.assertEqual(modules[0], ('rest_framework.settings', 120, 120, 2))
+        self.assertEqual(group_by_package(modules), [('rest_framework', 200, 2), ('task_manager', 50, 1)])
+
+    def test_api_workers_do_not_import_the_documentation(self):
+        """
+        Success: Test drf-yasg and the docs modules are not imported at startup
+        """
+        modules, _ = profile_startup('wsgi')
+        names = {module for module, _, _, _ in modules}
+        self.assertIn('task_manager.views', names)
+        self.assertFalse({'drf_yasg', 'django_filters', 'core.docs', 'task_manager.docs', 'jobs.docs'} & names)
+
+
+class PathPrefixMiddlewareTestCase(APITestCase):
+    """
+    Test suite for the middleware stack dispatched by URL prefix
+    """
+    def setUp(self):
+        self.admin_user = UserProfile.objects.create_superuser(username='admin_1', email = "admin@wow.com", password='admin_password', role="admin")
+        self.admin_token = Token.objects.get(user=self.admin_user)
+
+    def test_api_routes_skip_the_browser_middleware(self):
+        """
+        Success: Test token authenticated API calls run without sessions, CSRF cookies or frame headers
+        """
+        self.client.force_login(self.admin_user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.admin_token}')
+        response = self.client.get('/tasks/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(hasattr(response.wsgi_request, 'session'))
+        self.assertNotIn('X-Frame-Options', response)
+
+    def test_admin_runs_the_full_stack(self):
+        """
+        Success: Test the admin keeps its session, CSRF protection and frame headers
+        """
+        client = Client(enforce_csrf_checks=True)
+        response = client.get('/admin/login/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response['X-Frame-Options'], 'DENY')
+        self.assertIn('csrftoken', response.cookies)
+        response = client.post('/admin/login/', {'username': 'admin_1', 'password': 'admin_password'})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_api_routes_without_token(self):
+        """
+        Error: Test a session cookie does not authenticate API calls
+        """
+        self.client.force_login(self.admin_user)
+        response = self.client.get('/tasks/')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+class TokenBucketThrottleTestCase(APITestCase):
+    """
+    Test suite for the token bucket throttle
+    """
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        rates = {'user': '3/min', 'anon': '3/min'}
+        settings_override = override_settings(
+            THROTTLE_DB_PATH=os.path.join(self.directory.name, 'throttle.sqlite3'),
+            REST_FRAMEWORK={**settings.REST_FRAMEWORK, 'DEFAULT_THROTTLE_RATES': rates},
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        member_user = UserProfile.objects.create_user(username='member_1', email = "member@wow.com", password='member_password', role="team_member")
+        self.manager_token = Token.objects.get(user=manager_user)
+        self.member_token = Token.objects.get(user=member_user)
+        self.task = Task.objects.create(task_name='test_task', task_creator=manager_user)
+
+    def test_requests_within_the_burst(self):
+        """
+        Success: Test the rate limit headers count down the requests left in the bucket
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.manager_token}')
+        remaining = []
+        for _ in range(3):
+            response = self.client.get('/tasks/')
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual(response['RateLimit-Limit'], '3')
+            remaining.append(response['RateLimit-Remaining'])
+        self.assertEqual(remaining, ['2', '1', '0'])
+
+    def test_empty_bucket_is_throttled(self):
+        """
+        Error: Test the request past the burst gets a 429 with Retry-After, other actions and tokens keep their own bucket
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.manager_token}')
+        for _ in range(3):
+            self.client.get('/tasks/')
+        response = self.client.get('/tasks/')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn(response['Retry-After'], ('19', '20'))
+        self.assertEqual(response['RateLimit-Remaining'], '0')
+
+        self.assertEqual(self.client.get(f'/tasks/{self.task.task_id}/').status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.member_token}')
+        self.assertEqual(self.client.get('/tasks/').status_code, status.HTTP_200_OK)
+
+    def test_async_endpoints_share_the_buckets(self):
+        """
+        Error: Test the async endpoints take their requests from the bucket of the synchronous action they mirror
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.manager_token}')
+        response = self.client.get(f'/async/tasks/{self.task.task_id}/')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response['RateLimit-Limit'], response['RateLimit-Remaining']), ('3', '2'))
+
+        for _ in range(3):
+            self.client.get('/tasks/')
+        response = self.client.get('/async/tasks/?sort_by=due_date')
+        self.assertEqual(response.status_code, status.HTTP_429_TOO_MANY_REQUESTS)
+        self.assertIn(response['Retry-After'], ('19', '20'))
+        self.assertEqual(response['RateLimit-Remaining'], '0')
+        self.assertEqual(response.json()['errors'][0]['code'], 'throttled')
+
+    def test_event_stream_is_throttled(self):
+        """
+        Error: Test opening the event stream past the burst gets a 429 with Retry-After
+        """
+        for _ in range(3):
+            throttle_token(self.member_token.key, 'task-events.stream')
+        sent = []
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/events/tasks/', 'query_string': f'token={self.member_token.key}'.encode(), 'headers': []}
+        async_to_sync(task_event_stream)(scope, None, send)
+        self.assertEqual(sent[0]['status'], status.HTTP_429_TOO_MANY_REQUESTS)
+        headers = dict(sent[0]['headers'])
+        self.assertIn(headers[b'retry-after'], (b'19', b'20'))
+        self.assertEqual(headers[b'ratelimit-remaining'], b'0')
+
+    def test_store_holds_no_token(self):
+        """
+        Edge: Test the buckets are keyed by a digest of the token, in a store only its owner can read
+        """
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.manager_token}')
+        self.client.get('/tasks/')
+        path = settings.THROTTLE_DB_PATH
+        self.assertEqual(os.stat(path).st_mode & 0o777, 0o600)
+        keys = [key for key, in get_bucket_store()._get_connection().execute('SELECT key FROM throttle_bucket')]
+        self.assertEqual(len(keys), 1)
+        self.assertNotIn(self.manager_token.key, keys[0])
+
+    def test_bucket_refills_over_time(self):
+        """
+        Edge: Test an empty bucket takes requests again once refilled, never above its capacity
+        """
+        store = BucketStore(os.path.join(self.directory.name, 'store.sqlite3'))
+        self.assertEqual([store.take('key', 2, 0.01)[0] for _ in range(3)], [True, True, False])
+        connection = store._get_connection()
+        connection.execute("UPDATE throttle_bucket SET updated = updated - 1000")
+        allowed, tokens = store.take('key', 2, 0.01)
+        self.assertTrue(allowed)
+        self.assertAlmostEqual(tokens, 1, places=2)
+
+
+class SingleFlightTestCase(APITestCase):
+    """
+    Test suite for the coalescing of identical concurrent requests
+    """
+    def setUp(self):
+        cache.clear()
+        self.admin_user = UserProfile.objects.create_user(username='admin_1', email = "admin@wow.com", password='admin_password', role="admin")
+        self.other_admin_user = UserProfile.objects.create_user(username='admin_2', email = "admin2@wow.com", password='admin_password', role="admin")
+        self.manager_user = UserProfile.objects.create_user(username='manager_1', email = "manager@wow.com", password='manager_password', role="manager")
+        for i in range(3):
+            Task.objects.create(task_name=f'test_task_{i}', task_creator=self.manager_user)
+
+    def test_followers_share_the_leader_result(self):
+        """
+        Success: Test a computation in flight runs once, its concurrent duplicate waits for the result
+        """
+        single_flight = SingleFlight()
+        started, release = threading.Event(), threading.Event()
+        calls = []
+
+        def compute():
+            calls.append(1)
+            started.set()
+            release.wait(5)
+            return 'result'
+
+        leader = threading.Thread(target=single_flight.do, args=('key', compute, 5))
+        leader.start()
+        started.wait(5)
+        follower_result = []
+        follower = threading.Thread(target=lambda: follower_result.append(single_flight.do('key', compute, 5)))
+        follower.start()
+        # the follower finds the flight of the leader, still blocked, and waits on it
+        follower.join(0.1)
+        release.set()
+        leader.join()
+        follower.join()
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(follower_result, [('result', True)])
+        self.assertEqual(single_flight.metrics['coalesced'], 1)
+
+    def test_wait_budget(self):
+        """
+        Edge: Test a follower computes on its own once its wait budget is spent
+        """
+        single_flight = SingleFlight()
+        release = threading.Event()
+        leader = threading.Thread(target=single_flight.do, args=('key', lambda: release.wait(5), 5))
+        leader.start()
+        while 'key' not in single_flight._flights:
+            pass
+        self.assertEqual(single_flight.do('key', lambda: 'own', 0.01), ('own', False))
+        release.set()
+        leader.join()
+        self.assertEqual(single_flight.metrics['wait_timeouts'], 1)
+
+    def test_requests_are_keyed_by_visibility_scope(self):
+        """
+        Success: Test admins share the flight of an identical list, managers get their own, the shared response is the same
+        """
+        keys = []
+
+        def do(key, compute, wait_seconds, shareable):
+            keys.append(key)
+            return compute(), True
+
+        with mock.patch('utils.mixins.flights.do', side_effect=do):
+            responses = []
+            for user in (self.admin_user, self.other_admin_user, self.manager_user):
+                self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=user)}')
+                responses.append(self.client.get('/tasks/?sort_by=id&limit=2'))
+        self.assertEqual(keys[0], keys[1])
+        self.assertNotEqual(keys[0], keys[2])
+        self.assertEqual(responses[0].status_code, status.HTTP_200_OK)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.get(user=self.admin_user)}')
+        self.assertEqual(json.loads(responses[0].content), json.loads(self.client.get('/tasks/?limit=2&sort_by=id').content))
+
+
+class BatchedPrimaryKeyRelatedFieldTestCase(APITestCase):
+    """
+    Test suite for the related fields validating many primary keys with one query
+    """
+    def setUp(self):
+        self.users = [
+            UserProfile.objects.create_user(username=f'member_{i}', email=f"member_{i}@wow.com", password='member_password', role="team_member")
+            for i in range(5)
+        ]
+        self.ids = [user.id for user in self.users]
+        self.field = BatchedPrimaryKeyRelatedField(queryset=UserProfile.objects.all(), many=True)
+
+    def test_one_query_for_many_ids(self):
+        """
+        Success: Test the objects of every id are loaded with one query, in the submitted order
+        """
+        with CaptureQueriesContext(connection) as queries:
+            users = self.field.run_validation([self.ids[3], str(self.ids[0]), self.ids[3]])
+        self.assertEqual(users, [self.users[3], self.users[0], self.users[3]])
+        self.assertEqual(len(queries.captured_queries), 1)
+
+    def test_missing_and_invalid_ids(self):
+        """
+        Error: Test every missing id is reported by the one query, and values of the wrong type before any query
+        """
+        missing = max(self.ids) + 1
+        with CaptureQueriesContext(connection) as queries:
+            with self.assertRaises(ValidationError) as raised:
+                self.field.run_validation([missing + 1, self.ids[0], missing])
+        self.assertEqual(str(raised.exception.detail[0]), f'Invalid pks {[missing, missing + 1]} - objects do not exist.')
+        self.assertEqual(len(queries.captured_queries), 1)
+        for value in (['one'], [True], 'one', [{'id': 1}]):
+            with CaptureQueriesContext(connection) as queries:
+                with self.assertRaises(ValidationError):
+                    self.field.run_validation(value)
+            self.assertEqual(len(queries.captured_queries), 0)
+
+    def test_list_serializer_prefetches_all_items(self):
+        """
+        Success: Test a list of tasks checks the assignees of all its items with one query
+        """
+        tasks = [{'task_name': f'task_{i}', 'task_assignee': self.ids[i:i + 2]} for i in range(4)]
+        with CaptureQueriesContext(connection) as queries:
+            serializer = TaskSerializer(data=tasks, many=True)
+            self.assertTrue(serializer.is_valid(), serializer.errors)
+        self.assertEqual(len(queries.captured_queries), 1)
+        self.assertEqual([task['task_assignee'] for task in serializer.validated_data], [self.users[i:i + 2] for i in range(4)])
+
+        tasks.append({'task_name': 'task_4', 'task_assignee': [max(self.ids) + 1]})
+        serializer = TaskSerializer(data=tasks, many=True)
+        self.assertFalse(serializer.is_valid())
+        self.assertIn('task_assignee', serializer.errors[4])
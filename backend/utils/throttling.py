@@ -0,0 +1,256 @@
+"""
+Token bucket rate limiting shared by every worker of a host.
+
+Each (token, view action) pair has a bucket holding up to `capacity` requests,
+refilled continuously at `capacity / period`. The buckets live in a SQLite file
+(THROTTLE_DB_PATH, in a directory of the user in the temporary directory by
+default), so every worker process enforces the same limit, and one request costs
+a single UPSERT. A bucket missing from the store is full, so rows are pruned once
+full again. The buckets are keyed by a hash of the token, never the token, and
+the store is only readable by its owner. The views outside of DRF (the async
+views and the event stream) take their requests with throttle_token, from the
+same buckets.
+"""
+import hashlib
+import math
+import os
+import sqlite3
+import threading
+import time
+from django.conf import settings
+from rest_framework.settings import api_settings
+from rest_framework.throttling import BaseThrottle
+
+# refill of the stored bucket: the tokens it held plus the tokens earned since its last request
+_REFILL = 'min(:capacity, tokens + (:now - updated) * :rate)'
+
+_CREATE_TABLE = '''
+CREATE TABLE IF NOT EXISTS throttle_bucket (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated REAL NOT NULL,
+    allowed INTEGER NOT NULL,
+    capacity REAL NOT NULL,
+    rate REAL NOT NULL
+) WITHOUT ROWID
+'''
+
+_TAKE = f'''
+INSERT INTO throttle_bucket (key, tokens, updated, allowed, capacity, rate)
+VALUES (:key, :capacity - 1, :now, 1, :capacity, :rate)
+ON CONFLICT (key) DO UPDATE SET
+    tokens = CASE WHEN {_REFILL} >= 1 THEN {_REFILL} - 1 ELSE {_REFILL} END,
+    allowed = {_REFILL} >= 1,
+    updated = :now,
+    capacity = :capacity,
+    rate = :rate
+RETURNING tokens, allowed
+'''
+
+_PRUNE = 'DELETE FROM throttle_bucket WHERE tokens + (? - updated) * rate >= capacity'
+
+# requests of a process between two prunes of the full buckets
+PRUNE_EVERY = 10000
+
+
+class BucketStore:
+    """
+    SQLite store of the token buckets, with one connection per thread and process.
+
+    Args:
+        path (str): The SQLite file, shared by the workers of the host.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._local = threading.local()
+        self._requests = 0
+
+    def _create_file(self):
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, mode=0o700, exist_ok=True)
+        # owner only, the WAL and shared memory files of SQLite get the same mode
+        os.close(os.open(self.path, os.O_CREAT | os.O_RDWR, 0o600))
+        os.chmod(self.path, 0o600)
+
+    def _get_connection(self):
+        connection = getattr(self._local, 'connection', None)
+        # a forked worker must not reuse the connection of its parent
+        if connection is None or self._local.pid != os.getpid():
+            self._create_file()
+            connection = sqlite3.connect(self.path, timeout=1, isolation_level=None, check_same_thread=False)
+            connection.execute('PRAGMA journal_mode=WAL')
+            # losing the buckets in a power cut is harmless, never wait for the disk
+            connection.execute('PRAGMA synchronous=OFF')
+            connection.execute(_CREATE_TABLE)
+            self._local.connection, self._local.pid = connection, os.getpid()
+        return connection
+
+    def take(self, key, capacity, rate):
+        """
+        Take one token from a bucket, refilled first for the time elapsed since its last request.
+
+        Args:
+            key (str): The bucket.
+            capacity (int): The maximum number of tokens of the bucket.
+            rate (float): The tokens earned per second.
+
+        Returns:
+            tuple: Whether a token was taken, and the tokens left in the bucket.
+        """
+        connection = self._get_connection()
+        now = time.time()
+        tokens, allowed = connection.execute(_TAKE, {'key': key, 'capacity': capacity, 'rate': rate, 'now': now}).fetchone()
+        self._requests += 1
+        if self._requests % PRUNE_EVERY == 0:
+            connection.execute(_PRUNE, (now,))
+        return bool(allowed), tokens
+
+    def clear(self):
+        """
+        Empty every bucket of the store.
+        """
+        self._get_connection().execute('DELETE FROM throttle_bucket')
+
+
+_stores = {}
+
+
+def get_bucket_store():
+    """
+    Get the bucket store of THROTTLE_DB_PATH, opened once per process.
+
+    Returns:
+        BucketStore: The store.
+    """
+    path = settings.THROTTLE_DB_PATH
+    if path not in _stores:
+        _stores[path] = BucketStore(path)
+    return _stores[path]
+
+
+# DRF's period names, sec / min / hour / day, by first letter
+_DURATIONS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+
+def parse_rate(rate):
+    """
+    Parse a rate.
+
+    Args:
+        rate (str): The rate, "<requests>/<period>", e.g. "120/min".
+
+    Returns:
+        tuple: The capacity of the bucket and its refill rate per second.
+    """
+    num_requests, period = rate.split('/')
+    capacity = int(num_requests)
+    return capacity, capacity / _DURATIONS[period[0]]
+
+
+def get_token_ident(key):
+    # one bucket per token, under a digest: the store must not hold usable credentials
+    return f'token:{hashlib.sha256(key.encode()).hexdigest()}'
+
+
+def take_request(bucket, rate):
+    """
+    Take one request from a bucket of the store.
+
+    Args:
+        bucket (str): The key of the bucket.
+        rate (str): The rate of the bucket, "<requests>/<period>".
+
+    Returns:
+        dict: Whether the request is allowed, the seconds to wait before the next one, and the limit, remaining
+            and reset of the rate limit headers; None if the store is locked past its timeout.
+    """
+    capacity, refill_rate = parse_rate(rate)
+    try:
+        allowed, tokens = get_bucket_store().take(bucket, capacity, refill_rate)
+    except sqlite3.OperationalError:
+        # a store locked past its timeout must not take the API down with it: fail open
+        return None
+    return {
+        'allowed': allowed,
+        'wait': 0 if allowed else (1 - tokens) / refill_rate,
+        'limit': capacity,
+        'remaining': max(int(tokens), 0),
+        'reset': (capacity - tokens) / refill_rate,
+    }
+
+
+def throttle_token(key, endpoint):
+    """
+    Take one request of an API token from its bucket for an endpoint, for the views outside of DRF.
+
+    Args:
+        key (str): The token key.
+        endpoint (str): The endpoint, "<basename>.<action>" to share the bucket of a DRF view action.
+
+    Returns:
+        dict: The state of the bucket (see take_request), or None if the request is not limited.
+    """
+    rate = api_settings.DEFAULT_THROTTLE_RATES.get('user')
+    if rate is None:
+        return None
+    return take_request(f'{get_token_ident(key)}:{endpoint}', rate)
+
+
+def get_rate_limit_headers(rate_limit):
+    """
+    Build the RateLimit-Limit, RateLimit-Remaining and RateLimit-Reset (seconds until the bucket is full) headers.
+
+    Args:
+        rate_limit (dict): The state of the bucket (see take_request).
+
+    Returns:
+        dict: The headers.
+    """
+    return {
+        'RateLimit-Limit': str(rate_limit['limit']),
+        'RateLimit-Remaining': str(rate_limit['remaining']),
+        'RateLimit-Reset': str(math.ceil(rate_limit['reset'])),
+    }
+
+
+class TokenBucketThrottle(BaseThrottle):
+    """
+    Throttle every action of a view per authentication token, anonymous requests per client address.
+
+    The rates are the 'user' and 'anon' DEFAULT_THROTTLE_RATES, "<requests>/<period>":
+    a bucket holds <requests> requests, the burst, and refills over <period>.
+    A view can set its own rates per action with a throttle_rates dict.
+    The state of the bucket is kept on the request for the rate limit headers
+    (see utils.mixins.RateLimitHeadersMixin).
+    """
+
+    def get_rate(self, request, view):
+        scope = 'user' if request.user and request.user.is_authenticated else 'anon'
+        rate = getattr(view, 'throttle_rates', {}).get(getattr(view, 'action', None))
+        return rate or api_settings.DEFAULT_THROTTLE_RATES.get(scope)
+
+    def get_cache_key(self, request, view):
+        if request.auth is not None and hasattr(request.auth, 'key'):
+            ident = get_token_ident(request.auth.key)
+        elif request.user and request.user.is_authenticated:
+            ident = f'user:{request.user.pk}'
+        else:
+            ident = f'anon:{self.get_ident(request)}'
+        action = getattr(view, 'action', None) or request.method.lower()
+        return f'{ident}:{getattr(view, "basename", None) or view.__class__.__name__}.{action}'
+
+    def allow_request(self, request, view):
+        rate = self.get_rate(request, view)
+        if rate is None:
+            return True
+        rate_limit = take_request(self.get_cache_key(request, view), rate)
+        if rate_limit is None:
+            return True
+        self.wait_seconds = rate_limit['wait']
+        request._request.rate_limit = rate_limit
+        return rate_limit['allowed']
+
+    def wait(self):
+        return getattr(self, 'wait_seconds', None)